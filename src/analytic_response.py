@@ -0,0 +1,191 @@
+import numpy as np
+
+# Step response conventions shared with control.step_info
+RISE_TIME_LIMITS = (0.1, 0.9)
+SETTLING_TIME_THRESHOLD = 0.02
+
+
+def _polyval(coeffs, x):
+    """
+    Evaluate one polynomial per row at the points in the same row of x (Horner's scheme).
+    """
+    value = np.zeros(x.shape, dtype=np.result_type(coeffs, x))
+    for j in range(coeffs.shape[1]):
+        value = value * x + coeffs[:, j, None]
+    return value
+
+
+class _ModalResponse:
+    """
+    Step response of a batch of stable closed loops written as y(t) = yss + Re(sum r_i exp(p_i t)).
+    """
+
+    def __init__(self, poles, residues, yss):
+        self.poles = poles
+        self.residues = residues
+        self.yss = yss
+
+    def value(self, t):
+        """
+        Output at times t, shape (N,) or (N, K).
+        """
+        t = t[..., None]
+        modes = self.residues[:, None, :] if t.ndim == 3 else self.residues
+        poles = self.poles[:, None, :] if t.ndim == 3 else self.poles
+        return self.yss.reshape((-1,) + (1,) * (t.ndim - 2)) + (modes * np.exp(poles * t)).real.sum(axis=-1)
+
+    def slope(self, t):
+        """
+        Output derivative at times t, shape (N,).
+        """
+        return (self.residues * self.poles * np.exp(self.poles * t[:, None])).real.sum(axis=-1)
+
+
+def _bisect(f, lo, hi, iterations):
+    """
+    Vectorized bisection for a sign change of f between lo and hi.
+    """
+    f_lo = f(lo)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        f_mid = f(mid)
+        left = np.sign(f_mid) == np.sign(f_lo)
+        lo = np.where(left, mid, lo)
+        f_lo = np.where(left, f_mid, f_lo)
+        hi = np.where(left, hi, mid)
+    return 0.5 * (lo + hi)
+
+
+def analytic_step_metrics(num_cl, den_cl, points_per_mode=128, iterations=40):
+    """
+    Compute step response metrics of a batch of closed loops from their poles and residues.
+
+    For a stable loop with distinct poles the step response is y(t) = T(0) + sum r_i exp(p_i t), with
+    residues r_i = N(p_i) / (p_i D'(p_i)). The response is sampled on a short grid covering each mode's
+    own decay, which brackets the 10 % and 90 % crossings, the peak and the last exit from the 2 % band;
+    each bracket is then refined by bisection on the closed form. Loops that are unstable or have
+    repeated poles are not handled and are flagged so the caller can simulate them instead.
+
+    Parameters:
+        num_cl (np.ndarray): (N, m) closed-loop numerator coefficients, highest power first.
+        den_cl (np.ndarray): (N, m) closed-loop denominator coefficients, highest power first.
+        points_per_mode (int): Samples of the coarse grid spent on each mode. Default is 128.
+        iterations (int): Bisection iterations for each refined metric. Default is 40.
+
+    Returns:
+        tuple: Rise time, steady state value, overshoot and settling time arrays, and a boolean array
+        marking the loops whose metrics were computed.
+    """
+    num_cl = np.atleast_2d(np.asarray(num_cl, dtype=float))
+    den_cl = np.atleast_2d(np.asarray(den_cl, dtype=float))
+    n_pop, order = den_cl.shape
+    n = order - 1
+
+    rise_time = np.full(n_pop, np.nan)
+    ess = np.full(n_pop, np.nan)
+    overshoot = np.full(n_pop, np.nan)
+    settling_time = np.full(n_pop, np.nan)
+    solved = np.zeros(n_pop, dtype=bool)
+    if n == 0 or n_pop == 0:
+        return rise_time, ess, overshoot, settling_time, solved
+
+    lead = den_cl[:, 0]
+    valid = np.abs(lead) > 1e-12
+    lead = np.where(valid, lead, 1.0)
+    den_n = den_cl / lead[:, None]
+    num_n = num_cl / lead[:, None]
+    valid &= np.isfinite(den_n).all(axis=1) & np.isfinite(num_n).all(axis=1)
+    den_n[~valid] = 0.0
+    den_n[~valid, 0] = 1.0
+    den_n[~valid, -1] = 1.0
+    num_n[~valid] = 0.0
+
+    companion = np.zeros((n_pop, n, n))
+    companion[:, 0, :] = -den_n[:, 1:]
+    companion[:, np.arange(1, n), np.arange(n - 1)] = 1.0
+    poles = np.linalg.eigvals(companion)
+
+    # Only stable loops with well separated poles have a simple partial fraction expansion
+    valid &= poles.real.max(axis=1) < -1e-9
+    scale = np.maximum(np.abs(poles).max(axis=1), 1.0)
+    if n > 1:
+        gaps = np.where(np.eye(n, dtype=bool), np.inf, np.abs(poles[:, :, None] - poles[:, None, :]))
+        valid &= gaps.min(axis=(1, 2)) > 1e-6 * scale
+
+    derivative = den_n[:, :-1] * np.arange(n, 0, -1)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        residues = _polyval(num_n, poles) / (poles * _polyval(derivative, poles))
+        yss = num_n[:, -1] / den_n[:, -1]
+    valid &= np.isfinite(residues).all(axis=1) & np.isfinite(yss) & (yss != 0)
+
+    # Nearly repeated poles give huge residues that cancel each other; leave those to the simulation
+    with np.errstate(invalid="ignore"):
+        valid &= np.abs(residues).sum(axis=1) < 1e4 * np.abs(yss)
+
+    rows = np.flatnonzero(valid)
+    if rows.size == 0:
+        return rise_time, ess, overshoot, settling_time, solved
+
+    poles = poles[rows]
+    residues = residues[rows]
+    yss = yss[rows]
+    response = _ModalResponse(poles, residues, yss)
+    band = SETTLING_TIME_THRESHOLD * np.abs(yss)
+
+    # Each mode is sampled until its envelope is far below the settling band, since small overshoots
+    # can peak late: once on a grid denser near the start and once over its first few oscillations
+    decay = -poles.real
+    with np.errstate(divide="ignore"):
+        mode_end = np.maximum(np.log(n * np.abs(residues) / (1e-3 * band[:, None])) / decay, 1e-9)
+        settle_end = np.maximum((np.log(n * np.abs(residues) / band[:, None]) / decay).max(axis=1), 1e-9)
+        periods = np.minimum(2 * np.pi / np.abs(poles.imag), mode_end / 3)
+    grid = np.linspace(0.0, 1.0, points_per_mode)
+    t = np.concatenate([mode_end[:, :, None] * grid**2, 3 * periods[:, :, None] * grid], axis=1)
+    t = np.sort(t.reshape(rows.size, -1), axis=1)
+    y = response.value(t)
+    samples = np.arange(rows.size)
+    last = t.shape[1] - 1
+
+    sgn = np.sign(yss)
+
+    def first_crossing(level):
+        above = sgn[:, None] * (y - level[:, None]) >= 0
+        k = above.argmax(axis=1)
+        found = above.any(axis=1)
+        lo = t[samples, np.maximum(k - 1, 0)]
+        hi = t[samples, k]
+        refined = _bisect(lambda s: sgn * (response.value(s) - level), lo, hi, iterations)
+        return np.where(k == 0, 0.0, refined), found
+
+    t_lower, found_lower = first_crossing(RISE_TIME_LIMITS[0] * yss)
+    t_upper, found_upper = first_crossing(RISE_TIME_LIMITS[1] * yss)
+    reached = found_lower & found_upper
+
+    # Last exit from the settling band: resample densely from the last coarse sample outside the band
+    # to the time the modal envelope guarantees the response stays inside, then refine by bisection
+    outside = np.abs(y - yss[:, None]) >= band[:, None]
+    k = last - outside[:, ::-1].argmax(axis=1)
+    window = t[samples, k, None] + np.maximum(settle_end - t[samples, k], 0)[:, None] * np.linspace(0.0, 1.0, 4 * points_per_mode)
+    outside_window = np.abs(response.value(window) - yss[:, None]) >= band[:, None]
+    j = window.shape[1] - 1 - outside_window[:, ::-1].argmax(axis=1)
+    lo = window[samples, j]
+    hi = window[samples, np.minimum(j + 1, window.shape[1] - 1)]
+    refined = _bisect(lambda s: np.abs(response.value(s) - yss) - band, lo, hi, iterations)
+    settle = np.where(outside.any(axis=1), refined, 0.0)
+
+    # Peak: refine the extremum around the largest sample with a root of the derivative
+    k = (sgn[:, None] * y).argmax(axis=1)
+    lo = t[samples, np.maximum(k - 1, 0)]
+    hi = t[samples, np.minimum(k + 1, last)]
+    interior = np.sign(response.slope(lo)) != np.sign(response.slope(hi))
+    t_peak = _bisect(response.slope, lo, hi, iterations)
+    y_peak = np.maximum(sgn * y[samples, k], np.where(interior, sgn * response.value(t_peak), -np.inf))
+    dy_os = np.abs(y_peak) - np.abs(yss)
+
+    rise_time[rows] = np.where(reached, t_upper - t_lower, np.nan)
+    ess[rows] = np.where(reached, yss, np.nan)
+    overshoot[rows] = np.where(reached, np.where(dy_os > 0, np.abs(100. * dy_os / yss), 0), np.nan)
+    settling_time[rows] = np.where(reached, settle, np.nan)
+    solved[rows] = True
+
+    return rise_time, ess, overshoot, settling_time, solved
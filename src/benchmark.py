@@ -0,0 +1,633 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import warnings
+
+import control
+import numpy as np
+
+from calc_fitness import evaluate_fitness, evaluate_population, step_metrics
+from genetic_algorithm import GeneticAlgorithm
+from islands import IslandModel
+from parallel import ParallelEvaluator
+from surrogate import Surrogate
+from system_simulation import SystemDynamics
+from tuners import TUNERS
+from uncertainty import perturbed_plants
+from utils import decode_chromosomes, generate_gen
+from ziegler_nichols import ultimate_gain, ziegler_nichols_tuning
+
+# Plants used to check and benchmark the fitness engines, with the gain range sampled for each
+TEST_PLANTS = [
+    ([20], [1, 32, 140, 0], 100),
+    ([1], [1, 1], 5),
+    ([5], [1, 6, 11, 6], 5),
+    ([1], [1, 3, 3, 1], 5),
+    ([2, 1], [1, 4, 6, 4, 1], 5),
+    ([1, 2], [1, 5, 10, 10, 5, 1], 5),
+]
+
+
+def benchmark_workers(num, den, n_candidates=20000, worker_counts=None, repeat=3, seed=0):
+    """
+    Time the evaluation of one batch of random gains against the number of worker processes.
+
+    Parameters:
+    num (list): Numerator coefficients of the system transfer function.
+    den (list): Denominator coefficients of the system transfer function.
+    n_candidates (int): Number of candidates in the batch.
+    worker_counts (list): Worker counts to try. Default is powers of two up to the CPU count.
+    repeat (int): Number of timed repetitions; the best one is kept.
+    seed (int): Seed for the random gains.
+
+    Returns:
+    list: One dictionary per worker count with the best time and the speedup over serial evaluation.
+    """
+    if worker_counts is None:
+        cpus = os.cpu_count() or 1
+        worker_counts = sorted({2**i for i in range(cpus.bit_length()) if 2**i <= cpus} | {cpus})
+
+    gains = np.random.default_rng(seed).uniform(0, 100, (n_candidates, 3))
+
+    def best_of(fn):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(gains)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    serial_time = best_of(lambda g: evaluate_population(num, den, g))
+    rows = [{"workers": 0, "seconds": serial_time, "speedup": 1.0}]
+
+    for workers in worker_counts:
+        with ParallelEvaluator(num, den, workers) as evaluator:
+            evaluator(gains[:workers])      # start the pool outside the timed region
+            seconds = best_of(evaluator)
+        rows.append({"workers": workers, "seconds": seconds, "speedup": serial_time / seconds})
+
+    return rows
+
+
+def check_analytic(plants=TEST_PLANTS, n_candidates=50, n_points=200001, seed=0):
+    """
+    Compare the analytic metrics backend against control.step_info on a dense time grid.
+
+    The reference grid is much finer than step_info's default, so the comparison measures the error of
+    the analytic metrics rather than the sampling error of the reference.
+
+    Parameters:
+    plants (list): (num, den, gain upper bound) triples.
+    n_candidates (int): Number of random gains per plant.
+    n_points (int): Number of samples of the reference simulation.
+    seed (int): Seed for the random gains.
+
+    Returns:
+    list: One dictionary per plant with the analytic and simulation timings and the median and
+    maximum relative error of each metric over the stable candidates.
+    """
+    rng = np.random.default_rng(seed)
+    keys = ["RiseTime", "SteadyStateValue", "Overshoot", "SettlingTime"]
+    rows = []
+    for num, den, upper in plants:
+        system = SystemDynamics(num, den)
+        gains = rng.uniform(0, upper, (n_candidates, 3))
+        num_cl, den_cl = system.closed_loop_polynomials(gains)
+
+        start = time.perf_counter()
+        analytic = np.array(step_metrics(num_cl, den_cl, backend="analytic"))
+        analytic_time = time.perf_counter() - start
+        start = time.perf_counter()
+        step_metrics(num_cl, den_cl, backend="simulation")
+        simulation_time = time.perf_counter() - start
+
+        errors = []
+        for i, (kp, ki, kd) in enumerate(gains):
+            tf_sys_pid = system.closed_loop(kp, ki, kd)
+            if np.any(tf_sys_pid.poles().real >= 0):
+                continue
+            t_final = 1.5 * max(analytic[3, i], 1.0)
+            info = control.step_info(tf_sys_pid, T=np.linspace(0, t_final, n_points))
+            reference = np.array([info[key] for key in keys])
+            errors.append(np.abs(analytic[:, i] - reference) / np.maximum(np.abs(reference), 1))
+
+        errors = np.array(errors)
+        rows.append({
+            "plant": f"{num}/{den}",
+            "stable": len(errors),
+            "analytic_seconds": analytic_time,
+            "simulation_seconds": simulation_time,
+            "median_error": dict(zip(keys, np.median(errors, axis=0))),
+            "max_error": dict(zip(keys, errors.max(axis=0))),
+        })
+    return rows
+
+
+def benchmark_islands(num, den, island_counts=(1, 2, 4), seeds=range(5), topology="ring", population_size=50,
+                      n_bit=5, target=85, migration_interval=20, max_seconds=60):
+    """
+    Time-to-target of the island model against the number of islands.
+
+    Parameters:
+    num (list): Numerator coefficients of the system transfer function.
+    den (list): Denominator coefficients of the system transfer function.
+    island_counts (list): Numbers of islands to try.
+    seeds (list): Seeds of the repeated runs; the medians over them are reported.
+    topology (str): Migration topology, "ring" or "full".
+    population_size (int): Population of each island.
+    n_bit (int): Bits per gain.
+    target (float): Fitness target.
+    migration_interval (int): Generations between two migrations.
+    max_seconds (float): Time budget of each run.
+
+    Returns:
+    list: One dictionary per island count with the median time and generations to target, the total
+    evaluations, the share of runs that reached the target and the speedup over one island.
+    """
+    system = SystemDynamics(num, den)
+    rows = []
+    for n_islands in island_counts:
+        runs = []
+        for seed in seeds:
+            model = IslandModel(system, n_islands, 3, n_bit, 100, 0, population_size, target,
+                                migration_interval=migration_interval, topology=topology, seed=seed,
+                                max_seconds=max_seconds)
+            model()
+            runs.append((model.seconds, max(island["generations"] for island in model.islands),
+                         sum(island["evaluations"] for island in model.islands), model.stop_reason == "target"))
+        seconds, generations, evaluations, reached = np.array(runs).T
+        rows.append({"islands": n_islands, "seconds": float(np.median(seconds)),
+                     "generations": float(np.median(generations)), "evaluations": float(np.median(evaluations)),
+                     "reached": float(reached.mean())})
+
+    for row in rows:
+        row["speedup"] = rows[0]["seconds"] / row["seconds"]
+    return rows
+
+
+def benchmark_tuners(num, den, tuners=("ga5", "ga10", "de", "cmaes"), seeds=range(5), population_size=20,
+                     target=85, max_evaluations=20000):
+    """
+    Evaluations-to-target of the Genetic Algorithm against the real-coded tuners.
+
+    Parameters:
+    num (list): Numerator coefficients of the system transfer function.
+    den (list): Denominator coefficients of the system transfer function.
+    tuners (list): Tuners to compare: "ga5" and "ga10" for the Genetic Algorithm with 5 or 10 bits per
+        gain, or a key of tuners.TUNERS.
+    seeds (list): Seeds of the repeated runs; the medians over them are reported.
+    population_size (int): Population of every tuner.
+    target (float): Fitness target.
+    max_evaluations (int): Evaluation budget of each run.
+
+    Returns:
+    list: One dictionary per tuner with the median evaluations, simulations and seconds to stop, the
+    median final fitness and the share of runs that reached the target.
+    """
+    system = SystemDynamics(num, den)
+    rows = []
+    for name in tuners:
+        runs = []
+        for seed in seeds:
+            options = {"seed": seed, "observers": [], "profile": True, "max_evaluations": max_evaluations}
+            if name.startswith("ga"):
+                tuner = GeneticAlgorithm(system, 3, int(name[2:]), 100, 0, population_size, target, **options)
+            else:
+                tuner = TUNERS[name](system, 3, 100, 0, population_size, target, **options)
+            start = time.perf_counter()
+            tuner()
+            seconds = time.perf_counter() - start
+            runs.append((tuner.evaluations, tuner.profiler.counters.get("simulations", 0), seconds,
+                         tuner.history.last["fitness"], tuner.stop_reason == "target"))
+        evaluations, simulations, seconds, fitness, reached = np.array(runs).T
+        rows.append({"tuner": name, "evaluations": float(np.median(evaluations)),
+                     "simulations": float(np.median(simulations)), "seconds": float(np.median(seconds)),
+                     "fitness": float(np.median(fitness)), "reached": float(reached.mean())})
+    return rows
+
+
+def benchmark_surrogate(num, den, models=("none", "knn", "rbf"), proposals=16, seeds=range(5), population_size=20,
+                        target=90, max_evaluations=20000):
+    """
+    Simulations-to-target of the steady state Genetic Algorithm with and without a surrogate.
+
+    Parameters:
+    num (list): Numerator coefficients of the system transfer function.
+    den (list): Denominator coefficients of the system transfer function.
+    models (list): "none" for the plain Genetic Algorithm, or a surrogate.SURROGATE_MODELS key.
+    proposals (int): Pairs of children proposed per generation with a surrogate.
+    seeds (list): Seeds of the repeated runs; the medians over them are reported.
+    population_size (int): Population of every run.
+    target (float): Fitness target.
+    max_evaluations (int): Evaluation budget of each run.
+
+    Returns:
+    list: One dictionary per model with the median simulations and seconds to stop, the simulations saved
+    (the median simulations of the "none" model minus those of the model, NaN when "none" is not run), the
+    share of runs that reached the target and the mean rank correlation of the surrogate predictions.
+    """
+    system = SystemDynamics(num, den)
+    rows = []
+    for model in models:
+        runs = []
+        for seed in seeds:
+            surrogate = None if model == "none" else Surrogate(proposals, model=model)
+            ga = GeneticAlgorithm(system, 3, 10, 100, 0, population_size, target, seed=seed, surrogate=surrogate,
+                                  observers=[], profile=True, max_evaluations=max_evaluations)
+            start = time.perf_counter()
+            ga()
+            seconds = time.perf_counter() - start
+            correlation = surrogate.rank_correlation() if surrogate is not None else np.nan
+            runs.append((ga.profiler.counters.get("simulations", 0), seconds, ga.stop_reason == "target",
+                         correlation))
+        simulations, seconds, reached, correlation = np.array(runs).T
+        rows.append({"model": model, "simulations": float(np.median(simulations)),
+                     "seconds": float(np.median(seconds)), "reached": float(reached.mean()),
+                     "rank_correlation": float(np.nanmean(correlation)) if model != "none" else float("nan")})
+
+    # Simulations saved are those the surrogate spares a run to the target, not the children it screens out
+    baseline = next((row["simulations"] for row in rows if row["model"] == "none"), float("nan"))
+    for row in rows:
+        row["saved"] = baseline - row["simulations"]
+    return rows
+
+
+# Default parameter matrix of the benchmark suite
+SUITE_ORDERS = [2, 3, 4, 5, 6, 7, 8]
+SUITE_POPULATIONS = [20, 100]
+SUITE_N_BITS = [5, 10]
+
+# Generation cap of the convergence benchmark, so an unreachable target cannot hang the suite
+MAX_GENERATIONS = 2000
+
+
+def benchmark_robust(num, den, scenario_counts=(10, 50), population_size=50, spread=0.2, repeat=3, seed=0):
+    """
+    Time the robust fitness of one population against the number of perturbed plants.
+
+    Parameters:
+    num (list): Numerator coefficients of the nominal transfer function.
+    den (list): Denominator coefficients of the nominal transfer function.
+    scenario_counts (list): Numbers of Monte Carlo scenarios to try.
+    population_size (int): Number of candidates scored.
+    spread (float): Relative variation of the gain and time constants of the scenarios.
+    repeat (int): Number of timed repetitions; the best one is kept.
+    seed (int): Seed for the random gains and scenarios.
+
+    Returns:
+    list: One dictionary per scenario count with the batched time, the time of scoring the plants one
+    by one, and both relative to the nominal evaluation.
+    """
+    gains = np.random.default_rng(seed).uniform(0, 100, (population_size, 3))
+    nominal = _time(lambda: evaluate_population(num, den, gains, prescreen=True), repeat)["seconds"]
+    rows = []
+    for count in scenario_counts:
+        scenarios = perturbed_plants(num, den, spread, count, seed=seed)
+        batched = _time(lambda: evaluate_population(num, den, gains, scenarios=scenarios), repeat)["seconds"]
+        plants = [(num, den), *scenarios]
+        looped = _time(lambda: [evaluate_population(*plant, gains, prescreen=True) for plant in plants], repeat)["seconds"]
+        rows.append({"scenarios": count, "nominal_seconds": nominal, "batched_seconds": batched,
+                     "looped_seconds": looped, "batched_slowdown": batched / nominal,
+                     "looped_slowdown": looped / nominal})
+    return rows
+
+def suite_plant(order):
+    """
+    Plant of the benchmark suite for a given order: real poles at -1, ..., -order and unit DC gain.
+
+    Parameters:
+    order (int): Order of the plant.
+
+    Returns:
+    tuple: Numerator and denominator coefficients.
+    """
+    den = np.poly(-np.arange(1, order + 1)).round().tolist()
+    return [den[-1]], den
+
+
+def _time(fn, repeat, setup=None):
+    """
+    Time fn over several repetitions, running setup untimed before each one.
+
+    Returns:
+    dict: Best and median time in seconds, and the value returned by the last call.
+    """
+    times = []
+    for _ in range(repeat):
+        args = setup() if setup is not None else ()
+        start = time.perf_counter()
+        value = fn(*args)
+        times.append(time.perf_counter() - start)
+    return {"seconds": min(times), "median_seconds": float(np.median(times)), "value": value}
+
+
+def _genetic_algorithm(num, den, n_bit, population_size, seed, target=75):
+    """
+    Genetic Algorithm on the range [0, 100] without fitness cache, so every generation is measured in full.
+    """
+    return GeneticAlgorithm(SystemDynamics(num, den), 3, n_bit, 100, 0, population_size, target,
+                            cache_size=0, seed=seed, observers=[])
+
+
+def _converge(ga, max_generations):
+    """
+    Evolve until the target is reached or the generation cap is hit.
+
+    Returns:
+    dict: Number of generations, best fitness and whether the target was reached.
+    """
+    population = ga.create_population()
+    for generation in range(1, max_generations + 1):
+        population = ga.steady_state_step(population, 0.5)
+        best, looping = ga.termination(population)
+        if not looping:
+            break
+    return {"generations": generation, "fitness": best["fitness"], "converged": not looping}
+
+
+def run_suite(orders=SUITE_ORDERS, populations=SUITE_POPULATIONS, n_bits=SUITE_N_BITS, repeat=3,
+              benchmarks=None, seed=0, target=75, max_generations=MAX_GENERATIONS):
+    """
+    Time the fitness, Genetic Algorithm and Ziegler-Nichols hot paths over a matrix of plant orders,
+    population sizes and chromosome resolutions.
+
+    Each benchmark only spans the axes it depends on: generate_gen does not depend on the plant and
+    evaluate_fitness does not depend on the encoding. Every case is seeded, so two runs time the same work.
+
+    Parameters:
+    orders (list): Plant orders, see suite_plant.
+    populations (list): Population sizes, which are also the batch sizes of the fitness benchmarks.
+    n_bits (list): Bits per gain.
+    repeat (int): Timed repetitions per case; the best and the median are reported.
+    benchmarks (list): Names of the benchmarks to run. Default is all of them.
+    seed (int): Seed for the random gains and Genetic Algorithm runs.
+    target (float): Minimum fitness target of the convergence benchmark.
+    max_generations (int): Generation cap of the convergence benchmark.
+
+    Returns:
+    dict: Machine information and one result per case, keyed by "benchmark/parameter=value/...".
+    """
+    rng = np.random.default_rng(seed)
+
+    def gen_batch(population_size, n_bit):
+        levels = rng.integers(0, 2**n_bit, (population_size, 3))
+        return 100 * levels / (2**n_bit - 1)
+
+    # Each case returns the timed function and a setup building its arguments outside the timed region
+    def generate_gen_case(order, population_size, n_bit):
+        return lambda: [generate_gen(3, n_bit, 100, 0) for _ in range(population_size)], None
+
+    def evaluate_fitness_case(order, population_size, n_bit):
+        num, den = suite_plant(order)
+        return (lambda gens: [evaluate_fitness(num, den, gen) for gen in gens],
+                lambda: (gen_batch(population_size, 10).tolist(),))
+
+    def decode_evaluate_case(order, population_size, n_bit):
+        # The path the Genetic Algorithm scores offspring with: one decode and one batched evaluation
+        num, den = suite_plant(order)
+        return (lambda bits: evaluate_population(num, den, decode_chromosomes(bits, 3, n_bit, 100, 0)),
+                lambda: (rng.integers(0, 2, (population_size, 3 * n_bit), dtype=np.uint8),))
+
+    def evaluate_population_case(order, population_size, n_bit):
+        num, den = suite_plant(order)
+        return lambda gains: evaluate_population(num, den, gains), lambda: (gen_batch(population_size, 10),)
+
+    def ga_generation_case(order, population_size, n_bit):
+        def setup():
+            ga = _genetic_algorithm(*suite_plant(order), n_bit, population_size, seed)
+            return ga, ga.create_population()
+        return lambda ga, population: ga.steady_state_step(population, 0.5), setup
+
+    def ga_convergence_case(order, population_size, n_bit):
+        return (lambda ga: _converge(ga, max_generations),
+                lambda: (_genetic_algorithm(*suite_plant(order), n_bit, population_size, seed, target),))
+
+    def ziegler_nichols_case(order, population_size, n_bit):
+        num, den = suite_plant(order)
+        return lambda: ziegler_nichols_tuning(SystemDynamics(num, den)), None
+
+    cases = {
+        "generate_gen": (("population", "n_bit"), generate_gen_case),
+        "evaluate_fitness": (("order", "population"), evaluate_fitness_case),
+        "decode_evaluate": (("order", "population", "n_bit"), decode_evaluate_case),
+        "evaluate_population": (("order", "population"), evaluate_population_case),
+        "ga_generation": (("order", "population", "n_bit"), ga_generation_case),
+        "ga_convergence": (("order", "population", "n_bit"), ga_convergence_case),
+        "ziegler_nichols_tuning": (("order",), ziegler_nichols_case),
+    }
+    if benchmarks is not None:
+        unknown = set(benchmarks) - set(cases)
+        if unknown:
+            raise ValueError(f"Unknown benchmarks: {sorted(unknown)}. Choose from {sorted(cases)}")
+        cases = {name: cases[name] for name in benchmarks}
+
+    results = {}
+    for name, (axes, run) in cases.items():
+        values = {"order": orders, "population": populations, "n_bit": n_bits}
+        for combination in itertools.product(*(values[axis] for axis in axes)):
+            params = dict(zip(axes, combination))
+            if name == "ziegler_nichols_tuning" and ultimate_gain(*suite_plant(params["order"])) is None:
+                continue        # no ultimate gain, Ziegler-Nichols does not apply
+            key = "/".join([name] + [f"{axis}={value}" for axis, value in params.items()])
+
+            # Unstable loops overflow in python-control
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                fn, setup = run(params.get("order"), params.get("population"), params.get("n_bit"))
+                timing = _time(fn, repeat, setup)
+            result = dict(params, seconds=timing["seconds"], median_seconds=timing["median_seconds"])
+            if name == "ga_convergence":
+                result.update(timing["value"])
+            results[key] = result
+            print(f"{key:<60} {timing['seconds']:>10.4f} s", file=sys.stderr)
+
+    return {
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "control": control.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare_results(baseline, current, threshold=0.1):
+    """
+    Compare two benchmark suite results case by case.
+
+    Parameters:
+    baseline (dict): Reference result of run_suite, usually loaded from a JSON file.
+    current (dict): New result of run_suite.
+    threshold (float): Relative slowdown above which a case is flagged as a regression. Default is 0.1.
+
+    Returns:
+    list: One dictionary per case present in both results with both times, their ratio and whether it
+    regressed, slowest ratio first.
+    """
+    rows = []
+    for key, result in current["results"].items():
+        if key not in baseline["results"]:
+            continue
+        reference = baseline["results"][key]["seconds"]
+        ratio = result["seconds"] / reference if reference > 0 else np.inf
+        rows.append({"case": key, "baseline": reference, "current": result["seconds"],
+                     "ratio": ratio, "regression": ratio > 1 + threshold})
+    return sorted(rows, key=lambda row: -row["ratio"])
+
+
+def _print_comparison(rows, threshold):
+    """
+    Print a comparison table and return the number of regressions.
+    """
+    print(f"{'case':<60} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['case']:<60} {row['baseline']:>10.4f} {row['current']:>10.4f} {row['ratio']:>7.2f}{flag}")
+    regressions = sum(row["regression"] for row in rows)
+    print(f"{regressions} of {len(rows)} cases slower by more than {threshold:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PID fitness evaluation.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    workers = subparsers.add_parser("workers", help="Speedup of the process pool against worker count.")
+    workers.add_argument("--candidates", type=int, default=20000, help="Number of candidates per batch.")
+    workers.add_argument("--workers", type=int, nargs="*", help="Worker counts to benchmark.")
+    workers.add_argument("--repeat", type=int, default=3, help="Timed repetitions per configuration.")
+
+    analytic = subparsers.add_parser("analytic", help="Accuracy of the analytic metrics against step_info.")
+    analytic.add_argument("--candidates", type=int, default=50, help="Number of candidates per plant.")
+
+    islands = subparsers.add_parser("islands", help="Time-to-target of the island model against island count.")
+    islands.add_argument("--islands", type=int, nargs="+", default=[1, 2, 4], help="Island counts to try.")
+    islands.add_argument("--seeds", type=int, default=5, help="Number of seeded runs per island count.")
+    islands.add_argument("--topology", choices=["ring", "full"], default="ring", help="Migration topology.")
+    islands.add_argument("--population", type=int, default=50, help="Population of each island.")
+    islands.add_argument("--target", type=float, default=85, help="Fitness target.")
+
+    tuners = subparsers.add_parser("tuners", help="Evaluations-to-target of the GA, DE and CMA-ES tuners.")
+    tuners.add_argument("--tuners", nargs="+", default=["ga5", "ga10", "de", "cmaes"], help="Tuners to compare.")
+    tuners.add_argument("--seeds", type=int, default=5, help="Number of seeded runs per tuner.")
+    tuners.add_argument("--population", type=int, default=20, help="Population of every tuner.")
+    tuners.add_argument("--target", type=float, default=85, help="Fitness target.")
+    tuners.add_argument("--max-evaluations", type=int, default=20000, help="Evaluation budget of each run.")
+
+    surrogate = subparsers.add_parser("surrogate", help="Simulations-to-target of the GA with and without a surrogate.")
+    surrogate.add_argument("--models", nargs="+", default=["none", "knn", "rbf"], help="Surrogate models to compare.")
+    surrogate.add_argument("--proposals", type=int, default=16, help="Pairs of children proposed per generation.")
+    surrogate.add_argument("--seeds", type=int, default=5, help="Number of seeded runs per model.")
+    surrogate.add_argument("--population", type=int, default=20, help="Population of every run.")
+    surrogate.add_argument("--target", type=float, default=90, help="Fitness target.")
+
+    robust = subparsers.add_parser("robust", help="Cost of the robust fitness against the number of scenarios.")
+    robust.add_argument("--scenarios", type=int, nargs="+", default=[10, 50], help="Scenario counts to try.")
+    robust.add_argument("--population", type=int, default=50, help="Number of candidates scored.")
+    robust.add_argument("--spread", type=float, default=0.2, help="Relative variation of the plant parameters.")
+    robust.add_argument("--repeat", type=int, default=3, help="Timed repetitions per configuration.")
+
+    suite = subparsers.add_parser("suite", help="Time the hot paths over plant orders, population sizes and n_bit.")
+    suite.add_argument("--output", default="benchmark.json", help="JSON file receiving the results.")
+    suite.add_argument("--orders", type=int, nargs="+", default=SUITE_ORDERS, help="Plant orders.")
+    suite.add_argument("--populations", type=int, nargs="+", default=SUITE_POPULATIONS, help="Population sizes.")
+    suite.add_argument("--n-bits", type=int, nargs="+", default=SUITE_N_BITS, help="Bits per gain.")
+    suite.add_argument("--benchmarks", nargs="+", help="Benchmarks to run. Default is all of them.")
+    suite.add_argument("--repeat", type=int, default=3, help="Timed repetitions per case.")
+    suite.add_argument("--target", type=float, default=75, help="Fitness target of the convergence benchmark.")
+    suite.add_argument("--baseline", help="Baseline JSON to compare the new results against.")
+    suite.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown flagged as a regression.")
+
+    compare = subparsers.add_parser("compare", help="Flag regressions between two suite results.")
+    compare.add_argument("baseline", help="Baseline JSON.")
+    compare.add_argument("current", help="New JSON.")
+    compare.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown flagged as a regression.")
+
+    args = parser.parse_args()
+
+    if args.command in ("suite", "compare"):
+        if args.command == "suite":
+            current = run_suite(args.orders, args.populations, args.n_bits, args.repeat, args.benchmarks,
+                                target=args.target)
+            with open(args.output, "w") as f:
+                json.dump(current, f, indent=2)
+            print(f"Results written to {args.output}")
+            baseline_path = args.baseline
+        else:
+            with open(args.current) as f:
+                current = json.load(f)
+            baseline_path = args.baseline
+
+        if baseline_path is not None:
+            with open(baseline_path) as f:
+                baseline = json.load(f)
+            if _print_comparison(compare_results(baseline, current, args.threshold), args.threshold):
+                sys.exit(1)
+
+    elif args.command == "islands":
+        rows = benchmark_islands([20], [1, 32, 140, 0], args.islands, range(args.seeds), args.topology,
+                                 args.population, target=args.target)
+
+        print(f"{'islands':>8} {'seconds':>10} {'speedup':>8} {'generations':>12} {'evaluations':>12} {'reached':>8}")
+        for row in rows:
+            print(f"{row['islands']:>8} {row['seconds']:>10.3f} {row['speedup']:>8.2f} {row['generations']:>12.0f} "
+                  f"{row['evaluations']:>12.0f} {row['reached']:>8.0%}")
+
+    elif args.command == "tuners":
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            rows = benchmark_tuners([20], [1, 32, 140, 0], args.tuners, range(args.seeds), args.population,
+                                    args.target, args.max_evaluations)
+
+        print(f"{'tuner':>8} {'evaluations':>12} {'simulations':>12} {'seconds':>10} {'fitness':>8} {'reached':>8}")
+        for row in rows:
+            print(f"{row['tuner']:>8} {row['evaluations']:>12.0f} {row['simulations']:>12.0f} {row['seconds']:>10.3f} "
+                  f"{row['fitness']:>8.2f} {row['reached']:>8.0%}")
+
+    elif args.command == "surrogate":
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            rows = benchmark_surrogate([20], [1, 32, 140, 0], args.models, args.proposals, range(args.seeds),
+                                       args.population, args.target)
+
+        print(f"{'model':>8} {'simulations':>12} {'saved':>8} {'seconds':>10} {'reached':>8} {'rank corr':>10}")
+        for row in rows:
+            print(f"{row['model']:>8} {row['simulations']:>12.0f} {row['saved']:>8.0f} {row['seconds']:>10.3f} "
+                  f"{row['reached']:>8.0%} {row['rank_correlation']:>10.2f}")
+
+    elif args.command == "robust":
+        rows = benchmark_robust([20], [1, 32, 140, 0], args.scenarios, args.population, args.spread, args.repeat)
+
+        print(f"{'scenarios':>10} {'batched s':>10} {'x nominal':>10} {'looped s':>10} {'x nominal':>10}")
+        for row in rows:
+            print(f"{row['scenarios']:>10} {row['batched_seconds']:>10.3f} {row['batched_slowdown']:>10.1f} "
+                  f"{row['looped_seconds']:>10.3f} {row['looped_slowdown']:>10.1f}")
+
+    elif args.command == "workers":
+        num = [20]
+        den = [1, 32, 140, 0]
+        rows = benchmark_workers(num, den, args.candidates, args.workers, args.repeat)
+
+        print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+        for row in rows:
+            label = "serial" if row["workers"] == 0 else row["workers"]
+            print(f"{label:>8} {row['seconds']:>10.3f} {row['speedup']:>8.2f}")
+
+    elif args.command == "analytic":
+        for row in check_analytic(n_candidates=args.candidates):
+            print(f"{row['plant']}: {row['stable']} stable loops, analytic {row['analytic_seconds']:.3f} s, "
+                  f"simulation {row['simulation_seconds']:.3f} s")
+            for key in row["max_error"]:
+                print(f"    {key:<17} median {row['median_error'][key]:.2e}  max {row['max_error'][key]:.2e}")
+
+
+if __name__ == "__main__":
+    main()
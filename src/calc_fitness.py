@@ -1,8 +1,35 @@
 import numpy as np
+from scipy.linalg import expm
 from control import TransferFunction
-import control
+from analytic_response import analytic_step_metrics, RISE_TIME_LIMITS, SETTLING_TIME_THRESHOLD
+from stability import routh_stable, UNSTABLE_FITNESS
+from profiling import NULL_PROFILER
+from margins import plant_response, loop_margins, margin_violation
+from step_analysis import StepAnalysis, CRITERIA
+from utils import decode_chromosome
 
-def evaluate_fitness(num, den, gen):
+# Bump whenever a change to the metrics or the fitness formula makes stored fitness values stale
+FITNESS_VERSION = 3
+
+# Ways of combining the fitness of a controller over several plants
+AGGREGATES = ("worst", "mean")
+
+# Largest difference between evaluate_population and evaluate_fitness expected on well damped stable loops
+FITNESS_TOLERANCE = 1.0
+
+# Largest amount by which the default evaluate_population may exceed fitness_upper_bound, from rounding
+FITNESS_BOUND_SLACK = 1e-9
+
+# Upper bound on the number of floats held by one simulation chunk
+_CHUNK_ELEMENTS = 2**22
+
+# Minimum samples per period of the fastest closed-loop mode in the full simulation
+_POINTS_PER_PERIOD = 20
+
+# Default minimum and maximum number of steps of the full simulation
+_FULL_STEPS = (1000, 100000)
+
+def evaluate_fitness(num, den, gen, backend="control", prescreen=False, profiler=None, criterion="step"):
     """
     Calculate the fitness of a PID controller.
 
@@ -10,37 +37,494 @@ def evaluate_fitness(num, den, gen):
         num (list): Numerator coefficients of the system transfer function.
         den (list): Denominator coefficients of the system transfer function.
         gen (list): PID parameters.
+        backend (str): Step response metrics backend. "control" simulates with control.step_info,
+            "analytic" uses the closed-loop poles and residues. Default is "control".
+        prescreen (bool): Return UNSTABLE_FITNESS for unstable closed loops without simulating them.
+            Default is False.
+        profiler (Profiler): Records the simulation time and counts simulations and failures. Default is None.
+        criterion (str): "step" combines the step_info metrics, "iae", "ise" or "itae" scores the integral
+            of the error instead. Only the "control" backend supports the integral criteria. Default is "step".
 
     Returns:
         float: Fitness value.
     """
-    tf_sys = TransferFunction(num, den)
+    profiler = profiler or NULL_PROFILER
+    if criterion not in ("step",) + CRITERIA:
+        raise ValueError(f"Unknown criterion: {criterion}. Choose from {('step',) + CRITERIA}")
+    if criterion != "step" and backend != "control":
+        raise ValueError("Integral criteria need the control backend")
+    if backend == "analytic":
+        return float(evaluate_population(num, den, [gen], backend="analytic", prescreen=prescreen,
+                                         profiler=profiler)[0])
+    if backend != "control":
+        raise ValueError(f"Unknown metrics backend: {backend}")
+    if prescreen and not stability_mask(num, den, [gen])[0]:
+        return UNSTABLE_FITNESS
+
     kp, ki, kd = gen[0], gen[1], gen[2]
-    tf_pid = TransferFunction([kd, kp, ki], [1, 0])
-    tf_mul = tf_sys * tf_pid
-    tf_sys_pid = tf_mul.feedback()
+    num_cl, den_cl = closed_loop_polynomials(num, den, [[kp, ki, kd]])
+    tf_sys_pid = TransferFunction(num_cl[0], den_cl[0])
 
     try:
-        result = control.step_info(tf_sys_pid)
-        ess = result["SteadyStateValue"]
-        rise_time = result["RiseTime"]
-        settling_time = result["SettlingTime"]
-        overshoot = result["Overshoot"]
+        with profiler.phase("simulation"):
+            analysis = StepAnalysis.simulate(tf_sys_pid)
+        fitness = fitness_from_analysis(analysis, criterion)
+        profiler.record_simulations([fitness])
+        return fitness
 
+    except Exception:
+        # A failed simulation scores 0, the profiler counts it under failed_simulations
+        profiler.record_simulations([0])
+        return 0
+
+def fitness_from_metrics(rise_time, ess, overshoot, settling_time):
+    """
+    Combine step response metrics into a fitness value.
+
+    Works element-wise, so the metrics may be scalars or arrays of the same shape.
+
+    Parameters:
+        rise_time (float or array): Rise time.
+        ess (float or array): Steady state value.
+        overshoot (float or array): Overshoot in percent.
+        settling_time (float or array): Settling time.
+
+    Returns:
+        float or array: Fitness value.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
         fitness_1 = 1/(rise_time + 1) * 100
         fitness_2 = 1/(ess + 0.1) * 100
-        fitness_3 = 1/(overshoot + 1) * 100 if ess != 0 else 100
-        fitness_4 = 1/(settling_time + 0.01) * 100 if settling_time > 10 else 100
+        fitness_3 = np.where(ess != 0, 1/(overshoot + 1) * 100, 100)
+        fitness_4 = np.where(settling_time > 10, 1/(settling_time + 0.01) * 100, 100)
+
+    return (fitness_1 + fitness_2 + fitness_3 + fitness_4) / 4
+
+def fitness_from_analysis(analysis, criterion="step"):
+    """
+    Fitness of an analysed step response.
+
+    Parameters:
+        analysis (StepAnalysis): The step response.
+        criterion (str): "step" combines the step_info metrics like fitness_from_metrics, "iae", "ise" or
+            "itae" gives 100 / (1 + criterion). Default is "step".
+
+    Returns:
+        float: Fitness value.
+    """
+    if criterion == "step":
+        return float(fitness_from_metrics(analysis.rise_time, analysis.steady_state, analysis.overshoot,
+                                          analysis.settling_time))
+    if criterion not in CRITERIA:
+        raise ValueError(f"Unknown criterion: {criterion}. Choose from {('step',) + CRITERIA}")
+    return 100 / (1 + analysis.criterion(criterion))
+
+def _as_poly(coeffs):
+    """
+    Flatten polynomial coefficients (plain lists or TransferFunction.num/den) into a 1-D array.
+    """
+    poly = np.atleast_1d(np.squeeze(np.asarray(coeffs, dtype=float)))
+    nonzero = np.flatnonzero(poly)
+    return poly[nonzero[0]:] if nonzero.size else poly[-1:]
+
+def closed_loop_polynomials(num, den, gains):
+    """
+    Build the unity feedback closed-loop polynomials of the system with a batch of PID controllers.
+
+    Parameters:
+        num (list): Numerator coefficients of the system transfer function.
+        den (list): Denominator coefficients of the system transfer function.
+        gains (array): (N, 3) array of Kp, Ki, Kd values.
+
+    Returns:
+        tuple: (N, m) closed-loop numerator and denominator coefficients, highest power first.
+    """
+    num = _as_poly(num)
+    den = _as_poly(den)
+    gains = np.atleast_2d(np.asarray(gains, dtype=float))
+
+    # PID numerator kd*s^2 + kp*s + ki over s
+    pid = gains[:, [2, 0, 1]]
+    num_ol = np.zeros((len(gains), num.size + 2))
+    for i, c in enumerate(num):
+        num_ol[:, i:i + 3] += c * pid
+    den_ol = np.append(den, 0.0)
+
+    order = max(num_ol.shape[1], den_ol.size)
+    num_cl = np.zeros((len(gains), order))
+    num_cl[:, order - num_ol.shape[1]:] = num_ol
+    den_cl = num_cl.copy()
+    den_cl[:, order - den_ol.size:] += den_ol
+
+    return num_cl, den_cl
+
+def _companion(num_cl, den_cl):
+    """
+    Controllable canonical form of a batch of closed loops.
+
+    Returns:
+        tuple: Steady state value (NaN where undefined), (N, n, n) state matrices and the (N, n) output
+        and (N,) feedthrough coefficients.
+    """
+    n_pop, order = den_cl.shape
+    n = order - 1
+    lead = den_cl[:, 0]
+    valid = np.abs(lead) > 1e-12
+    lead = np.where(valid, lead, 1.0)
+    a = den_cl[:, 1:] / lead[:, None]
+    b = num_cl / lead[:, None]
+    valid &= np.isfinite(a).all(axis=1) & np.isfinite(b).all(axis=1)
+    a[~valid] = 0.0
+    b[~valid] = 0.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dc = np.where(valid, num_cl[:, -1] / den_cl[:, -1], np.nan)
+    ess = np.where(np.isfinite(dc), dc, np.nan)
+
+    d = b[:, 0]
+    c = b[:, 1:] - a * d[:, None]
+    A = np.zeros((n_pop, n, n))
+    A[:, 0, :] = -a
+    A[:, np.arange(1, n), np.arange(n - 1)] = 1.0
+    return ess, A, c, d
+
+def _step_response(A, c, d, dt, n_samples):
+    """
+    Sample the unit step response of a batch of state-space loops, n_samples points dt apart.
+
+    Each loop is discretized exactly (zero order hold) and the sample grid is filled by doubling
+    x[k + s] = Ad^s x[k] + x[s], so the whole batch takes a handful of array operations.
+
+    Returns:
+        np.ndarray: (N, n_samples) outputs.
+    """
+    n_rows, n = c.shape
+    aug = np.zeros((n_rows, n + 1, n + 1))
+    aug[:, :n, :n] = A
+    aug[:, 0, n] = 1.0
+    phi = expm(aug * dt[:, None, None])
+
+    x = np.zeros((n_rows, n_samples, n))
+    x[:, 1] = phi[:, :n, n]
+    power = phi[:, :n, :n]
+    filled = 2
+    with np.errstate(over="ignore", invalid="ignore"):
+        while filled < n_samples:
+            m = min(filled - 1, n_samples - filled)
+            x[:, filled:filled + m] = (np.einsum("pij,pkj->pki", power, x[:, 1:m + 1])
+                                       + x[:, filled - 1, None])
+            filled += m
+            power = power @ power
+
+        return np.einsum("pkj,pj->pk", x, c) + d[:, None]
+
+def _time_grid(poles, n_steps, max_steps):
+    """
+    Sample grid of the full simulation: like control.step_info, 7 times the slowest time constant with a
+    step small enough to resolve the fastest pole, in at least n_steps and at most max_steps steps.
+
+    Returns:
+        tuple: (N,) numbers of steps and time steps.
+    """
+    growth = poles.real.max(axis=1)
+    fastest = np.abs(poles).max(axis=1)
+    t_final = np.clip(7.0 / np.maximum(np.abs(growth), 1e-12), 1e-6, 1e4)
+    dt = np.minimum(t_final / n_steps, 2 * np.pi / (_POINTS_PER_PERIOD * np.maximum(fastest, 1e-12)))
+    steps = np.minimum(np.ceil(t_final / dt), max_steps).astype(int)
+    return steps, t_final / steps
+
+def _step_metrics(num_cl, den_cl, n_steps, max_steps):
+    """
+    Simulate the step response of a batch of closed loops and extract the step_info metrics.
+
+    Every closed loop is put in controllable canonical form and discretized exactly (zero order hold).
+    Like control.step_info, each loop is simulated over 7 times its slowest time constant with a step
+    small enough to resolve its fastest pole, so its metrics never depend on the rest of the batch.
+    Loops needing a similar number of samples are simulated together, filling the sample grid by
+    doubling x[k + s] = Ad^s x[k] + x[s], so a whole chunk takes a handful of array operations.
+
+    Returns:
+        tuple: Rise time, steady state value, overshoot and settling time arrays, NaN where undefined.
+    """
+    n_pop, order = den_cl.shape
+    n = order - 1
+    ess, A, c, d = _companion(num_cl, den_cl)
+    defined = np.where(np.isfinite(ess), 0.0, np.nan)
+    if n == 0:
+        # Static gain: the output jumps straight to its final value
+        return defined.copy(), ess, defined.copy(), defined.copy()
 
-        fitness = (fitness_1 + fitness_2 + fitness_3 + fitness_4) / 4
+    rise_time = np.full(n_pop, np.nan)
+    overshoot = np.full(n_pop, np.nan)
+    settling_time = np.full(n_pop, np.nan)
+
+    steps, dt = _time_grid(np.linalg.eigvals(A), n_steps, max_steps)
+
+    todo = np.flatnonzero(np.isfinite(ess))
+    todo = todo[np.argsort(steps[todo], kind="stable")]
+    start = 0
+    while start < todo.size:
+        # Rows are sorted by length, so the chunk length is set by its last row
+        chunk = max(1, _CHUNK_ELEMENTS // ((steps[todo[start]] + 1) * n))
+        while chunk > 1 and chunk * (steps[todo[min(start + chunk, todo.size) - 1]] + 1) * n > _CHUNK_ELEMENTS:
+            chunk //= 2
+        rows = todo[start:start + chunk]
+        start += rows.size
+        n_samples = steps[rows].max() + 1
+
+        y = _step_response(A[rows], c[rows], d[rows], dt[rows], n_samples)
+        with np.errstate(over="ignore", invalid="ignore"):
+            inside = np.arange(n_samples) <= steps[rows, None]
+            inf_value = ess[rows, None]
+            sgn = np.sign(inf_value)
+
+            lower = inside & (sgn * (y - RISE_TIME_LIMITS[0] * inf_value) >= 0)
+            upper = inside & (sgn * (y - RISE_TIME_LIMITS[1] * inf_value) >= 0)
+            reached = lower.any(axis=1) & upper.any(axis=1)
+            rise = (upper.argmax(axis=1) - lower.argmax(axis=1)) * dt[rows]
+            rise_time[rows] = np.where(reached, rise, np.nan)
+
+            outside = inside & (np.abs(y / inf_value - 1) >= SETTLING_TIME_THRESHOLD)
+            settled = np.where(outside.any(axis=1), n_samples - outside[:, ::-1].argmax(axis=1), 0)
+            # A response still outside the band at the end of the horizon settles no sooner than that
+            settling_time[rows] = np.minimum(settled, steps[rows]) * dt[rows]
+
+            y_os = np.where(inside & ~np.isnan(y), sgn * y, -np.inf).max(axis=1)
+            dy_os = np.abs(y_os) - np.abs(inf_value[:, 0])
+            overshoot[rows] = np.where(dy_os > 0, np.abs(100. * dy_os / inf_value[:, 0]), 0)
+
+        # Responses that never reach the rise time limits have no metrics, like step_info raising
+        ess[rows[~reached]] = np.nan
+
+    return rise_time, ess, overshoot, settling_time
+
+def stability_mask(num, den, gains_matrix):
+    """
+    Check which PID gains stabilize the unity feedback loop around the system.
+
+    Parameters:
+        num (list): Numerator coefficients of the system transfer function.
+        den (list): Denominator coefficients of the system transfer function.
+        gains_matrix (array): (N, 3) array of Kp, Ki, Kd values.
+
+    Returns:
+        np.ndarray: (N,) boolean array, True for stabilizing gains.
+    """
+    _, den_cl = closed_loop_polynomials(num, den, gains_matrix)
+    return routh_stable(den_cl)
+
+def step_metrics(num_cl, den_cl, backend="simulation", n_steps=1000, max_steps=100000):
+    """
+    Compute the step response metrics of a batch of closed loops.
+
+    Parameters:
+        num_cl (np.ndarray): (N, m) closed-loop numerator coefficients, highest power first.
+        den_cl (np.ndarray): (N, m) closed-loop denominator coefficients, highest power first.
+        backend (str): "simulation" steps the state-space model, "analytic" uses poles and residues and
+            falls back to simulation for unstable loops or repeated poles. Default is "simulation".
+        n_steps (int): Minimum number of simulation steps per closed loop. Default is 1000.
+        max_steps (int): Maximum number of simulation steps per closed loop. Default is 100000.
+
+    Returns:
+        tuple: Rise time, steady state value, overshoot and settling time arrays, NaN where undefined.
+    """
+    if backend == "simulation":
+        return _step_metrics(num_cl, den_cl, n_steps, max_steps)
+    if backend != "analytic":
+        raise ValueError(f"Unknown metrics backend: {backend}")
+
+    *metrics, solved = analytic_step_metrics(num_cl, den_cl)
+    if not solved.all():
+        rest = np.flatnonzero(~solved)
+        simulated = _step_metrics(num_cl[rest], den_cl[rest], n_steps, max_steps)
+        for metric, values in zip(metrics, simulated):
+            metric[rest] = values
+    return tuple(metrics)
+
+def evaluate_population(num, den, gains_matrix, backend="simulation", n_steps=1000, max_steps=100000,
+                        prescreen=False, profiler=None, scenarios=None, aggregate="worst", min_gain_margin=None,
+                        min_phase_margin=None, max_sensitivity=None, margin_penalty=None):
+    """
+    Calculate the fitness of a whole population of PID controllers in one vectorized pass.
+
+    Uses the same metrics and fitness formula as evaluate_fitness, but simulates all closed loops
+    together with NumPy state-space stepping instead of calling python-control once per individual.
+    The two sample the response on different time grids, so their fitness values are not identical:
+    on well damped stable loops they agree within FITNESS_TOLERANCE points. Loops with a pole close to
+    the imaginary axis are simulated over a long horizon, where the coarser grid of either side can
+    shift the rise time enough to change the fitness by several points.
+
+    Parameters:
+        num (list): Numerator coefficients of the system transfer function.
+        den (list): Denominator coefficients of the system transfer function.
+        gains_matrix (array): (N, 3) array of Kp, Ki, Kd values.
+        backend (str): Step response metrics backend, "simulation" or "analytic". Default is "simulation".
+        n_steps (int): Minimum number of simulation steps per closed loop. Default is 1000.
+        max_steps (int): Maximum number of simulation steps per closed loop. Default is 100000.
+        prescreen (bool): Give unstable closed loops UNSTABLE_FITNESS without simulating them, using a
+            batched Routh-Hurwitz test. Default is False.
+        profiler (Profiler): Records the simulation time and counts simulations and failures. Default is None.
+        scenarios (sequence): Perturbed plants as (num, den) pairs, see uncertainty.perturbed_plants. Each
+            controller is then scored on the nominal plant and every scenario, and the scores are combined
+            by aggregate. Default is None, for the nominal plant only.
+        aggregate (str): "worst" keeps the lowest fitness over the plants, "mean" their average. Only used
+            with scenarios. Default is "worst".
+        min_gain_margin (float): Smallest acceptable gain margin, as a ratio. Default is None, for no limit.
+        min_phase_margin (float): Smallest acceptable phase margin, in degrees. Default is None, for no limit.
+        max_sensitivity (float): Largest acceptable peak sensitivity Ms. Default is None, for no limit.
+        margin_penalty (float): Without it the margin limits are hard constraints, and violating
+            controllers get UNSTABLE_FITNESS without being simulated. With it, their fitness is divided by
+            1 + margin_penalty * violation, see margins.margin_violation. The margins are those of the
+            nominal plant. Default is None.
+
+    Returns:
+        np.ndarray: (N,) array of fitness values, 0 where the step response could not be analysed.
+    """
+    profiler = profiler or NULL_PROFILER
+    limits = (min_gain_margin, min_phase_margin, max_sensitivity)
+    if any(limit is not None for limit in limits):
+        gains_matrix = np.atleast_2d(np.asarray(gains_matrix, dtype=float))
+        plant = (tuple(_as_poly(num).tolist()), tuple(_as_poly(den).tolist()))
+        frequencies, response = plant_response(*plant)
+        violation = margin_violation(*loop_margins(frequencies, response, gains_matrix, *plant), *limits)
+        options = dict(backend=backend, n_steps=n_steps, max_steps=max_steps, prescreen=prescreen,
+                       profiler=profiler, scenarios=scenarios, aggregate=aggregate)
+        if margin_penalty is not None:
+            return evaluate_population(num, den, gains_matrix, **options) / (1 + margin_penalty * violation)
+
+        feasible = violation == 0
+        fitness = np.full(len(gains_matrix), UNSTABLE_FITNESS)
+        if feasible.any():
+            fitness[feasible] = evaluate_population(num, den, gains_matrix[feasible], **options)
         return fitness
 
-    except BaseException as e:
-        print(f"Kp: {kp} - Ki: {ki} - Kd: {kd}")
-        print(tf_sys_pid)
-        print(e)
-        return 0        
-    
+    if scenarios:
+        return _robust_fitness([(num, den), *scenarios], gains_matrix, aggregate, backend, n_steps, max_steps,
+                               profiler)
+
+    num_cl, den_cl = closed_loop_polynomials(num, den, gains_matrix)
+    if prescreen:
+        stable = routh_stable(den_cl)
+        fitness = np.full(len(den_cl), UNSTABLE_FITNESS)
+        if stable.any():
+            fitness[stable] = _fitness(num_cl[stable], den_cl[stable], backend, n_steps, max_steps, profiler)
+        return fitness
+
+    return _fitness(num_cl, den_cl, backend, n_steps, max_steps, profiler)
+
+def _robust_fitness(plants, gains_matrix, aggregate, backend, n_steps, max_steps, profiler):
+    """
+    Fitness of a batch of controllers aggregated over several plants.
+
+    The closed loops of every plant and controller are built together, and the plants of the same order
+    are simulated in one batch. A controller that destabilizes any plant scores UNSTABLE_FITNESS on it,
+    without simulation.
+    """
+    if aggregate not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate: {aggregate}. Choose from {AGGREGATES}")
+    gains_matrix = np.asarray(gains_matrix, dtype=float)
+    n = len(gains_matrix)
+    fitness = np.full((len(plants), n), UNSTABLE_FITNESS)
+
+    # Plants whose closed loops have the same number of coefficients share a batch
+    groups = {}
+    for index, (num, den) in enumerate(plants):
+        num_cl, den_cl = closed_loop_polynomials(num, den, gains_matrix)
+        groups.setdefault(den_cl.shape[1], []).append((index, num_cl, den_cl))
+
+    for group in groups.values():
+        rows = np.concatenate([np.arange(index * n, (index + 1) * n) for index, _, _ in group])
+        num_cl = np.concatenate([num_cl for _, num_cl, _ in group])
+        den_cl = np.concatenate([den_cl for _, _, den_cl in group])
+        stable = routh_stable(den_cl)
+        if stable.any():
+            fitness.flat[rows[stable]] = _fitness(num_cl[stable], den_cl[stable], backend, n_steps, max_steps,
+                                                  profiler)
+
+    return fitness.min(axis=0) if aggregate == "worst" else fitness.mean(axis=0)
+
+def _fitness(num_cl, den_cl, backend, n_steps, max_steps, profiler):
+    """
+    Fitness of a batch of closed loops, 0 where the step response could not be analysed.
+    """
+    with profiler.phase("simulation"):
+        rise_time, ess, overshoot, settling_time = step_metrics(num_cl, den_cl, backend, n_steps, max_steps)
+    fitness = fitness_from_metrics(rise_time, ess, overshoot, settling_time)
+    fitness = np.where(np.isfinite(fitness), fitness, 0.0)
+    profiler.record_simulations(fitness)
+    return fitness
+
+def fitness_upper_bound(num, den, gains_matrix, n_steps=100, horizon=0.25, points_per_period=8):
+    """
+    Cheap optimistic estimate of the fitness of a batch of PID controllers, from a coarse simulation of
+    the first part of each step response.
+
+    Every fitness term decreases with its metric, and a truncated response gives lower bounds on them:
+    the overshoot and the last time outside the settling band seen so far can only grow, and a response
+    that has not crossed 90 % of its final value yet rises at least until the end of the horizon or its
+    first turn. The steady state value is exact, from the closed-loop DC gain. The coarse samples are a
+    subset of those of evaluate_population with its default steps, so the bound holds for the fitness
+    it measures up to FITNESS_BOUND_SLACK, on the assumption that the response turns at most once
+    between two coarse samples, which points_per_period ensures for all but stiff loops. FitnessScreen
+    counts the exceptions.
+
+    Parameters:
+        num (list): Numerator coefficients of the system transfer function.
+        den (list): Denominator coefficients of the system transfer function.
+        gains_matrix (array): (N, 3) array of Kp, Ki, Kd values.
+        n_steps (int): Number of simulation steps per closed loop. Default is 100.
+        horizon (float): Simulated fraction of the horizon used by evaluate_population. Default is 0.25.
+        points_per_period (float): Minimum samples per period of the fastest closed-loop mode. Default is 8.
+
+    Returns:
+        np.ndarray: (N,) fitness bounds, inf for unstable loops, which the bound does not cover.
+    """
+    num_cl, den_cl = closed_loop_polynomials(num, den, gains_matrix)
+    bound = np.full(len(den_cl), np.inf)
+    ess, A, c, d = _companion(num_cl, den_cl)
+    rows = np.flatnonzero(routh_stable(den_cl) & np.isfinite(ess))
+    if den_cl.shape[1] < 2 or not rows.size:
+        return bound
+
+    poles = np.linalg.eigvals(A[rows])
+    growth = poles.real.max(axis=1)
+    fastest = np.abs(poles).max(axis=1)
+    t_final = horizon * np.clip(7.0 / np.maximum(np.abs(growth), 1e-12), 1e-6, 1e4)
+    # A few samples per period of the fastest mode keep the early crossings visible; loops with fast
+    # modes and slow tails then see less than the whole horizon, which only loosens their bound
+    dt = np.minimum(t_final / n_steps, 2 * np.pi / (points_per_period * np.maximum(fastest, 1e-12)))
+    # Every coarse sample is also a sample of the full simulation, so the metrics seen so far bound those
+    # evaluate_population measures even where its own grid is too coarse to resolve the fastest mode
+    _, full_dt = _time_grid(poles, *_FULL_STEPS)
+    dt = np.maximum(np.floor(dt / full_dt), 1) * full_dt
+    y = _step_response(A[rows], c[rows], d[rows], dt, n_steps + 1)
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        inf_value = ess[rows, None]
+        sgn = np.sign(inf_value)
+        lower = sgn * (y - RISE_TIME_LIMITS[0] * inf_value) >= 0
+        upper = sgn * (y - RISE_TIME_LIMITS[1] * inf_value) >= 0
+        k_lower = np.where(lower.any(axis=1), lower.argmax(axis=1), n_steps + 1)
+        k_upper = np.where(upper.any(axis=1), upper.argmax(axis=1), n_steps + 1)
+        # A brief excursion past 90 % can fall between two samples, but not before the response first
+        # turns down: the crossing is no earlier than the first sampled local maximum either
+        peak = np.zeros_like(lower)
+        peak[:, 1:-1] = (y[:, 1:-1] * sgn >= y[:, :-2] * sgn) & (y[:, 1:-1] * sgn > y[:, 2:] * sgn)
+        k_upper = np.minimum(k_upper, np.where(peak.any(axis=1), peak.argmax(axis=1), n_steps + 1))
+        # The 90 % crossing happens after the sample before k_upper, the 10 % one no later than k_lower
+        rise = np.where(k_lower <= n_steps, (np.minimum(k_upper, n_steps + 1) - 1 - k_lower) * dt, 0.0)
+
+        outside = np.abs(y / inf_value - 1) >= SETTLING_TIME_THRESHOLD
+        settling = np.where(outside.any(axis=1), (n_steps - outside[:, ::-1].argmax(axis=1)) * dt, 0.0)
+
+        y_os = np.where(np.isnan(y), -np.inf, sgn * y).max(axis=1)
+        dy_os = np.abs(y_os) - np.abs(inf_value[:, 0])
+        overshoot = np.where(dy_os > 0, np.abs(100. * dy_os / inf_value[:, 0]), 0)
+
+    fitness = fitness_from_metrics(np.maximum(rise, 0.0), ess[rows], overshoot, settling)
+    bound[rows] = np.where(np.isnan(fitness), np.inf, fitness)
+    return bound
+
 def evaluate_mutation_fitness(mutant, num, den, n_var, n_bit, lb, ub):
     """
     Calculate the fitness of a mutated PID controller.
@@ -57,13 +541,6 @@ def evaluate_mutation_fitness(mutant, num, den, n_var, n_bit, lb, ub):
     Returns:
         tuple: Fitness value and generated genes.
     """
-    gen = []
-    chromosome = mutant["chromosome"]
-    for i in range(n_var):
-        kr = chromosome[n_bit * i: n_bit * (i + 1)]
-        x = np.dot(kr, [2**(n_bit - j - 1) for j in range(n_bit)])
-        x = x / ((2**n_bit) - 1)
-        gen.append(lb + (ub - lb) * x)
-
+    gen = decode_chromosome(mutant["chromosome"], n_var, n_bit, ub, lb)
     fitness = evaluate_fitness(num, den, gen)
     return fitness, gen
\ No newline at end of file
@@ -0,0 +1,190 @@
+import json
+import time
+
+
+class Observer:
+    """
+    Receiver of the progress events of a GeneticAlgorithm run. Every method does nothing by default, so an
+    observer only overrides the events it consumes; a bare Observer is a silent sink.
+
+    Events receive the GeneticAlgorithm and the best individual, a dictionary with its "gen" (Kp, Ki, Kd),
+    "fitness" and "chromosome".
+    """
+
+    def on_start(self, ga):
+        """
+        Called before the initial population is created.
+
+        Parameters:
+        ga (GeneticAlgorithm): The running algorithm.
+        """
+
+    def on_generation(self, ga, generation, best):
+        """
+        Called after every generation.
+
+        Parameters:
+        ga (GeneticAlgorithm): The running algorithm.
+        generation (int): Generation number, starting at 0.
+        best (dict): The best individual of the population.
+        """
+
+    def on_improvement(self, ga, generation, best):
+        """
+        Called after a generation that raised the best fitness, right after on_generation.
+
+        Parameters:
+        ga (GeneticAlgorithm): The running algorithm.
+        generation (int): Generation number, starting at 0.
+        best (dict): The new best individual.
+        """
+
+    def on_finish(self, ga, best):
+        """
+        Called once when the run ends.
+
+        Parameters:
+        ga (GeneticAlgorithm): The finished algorithm.
+        best (dict): The best individual found.
+        """
+
+
+class SilentObserver(Observer):
+    """
+    Observer discarding every event.
+    """
+
+
+class ConsoleObserver(Observer):
+    """
+    Prints the progress of a run, at most once per interval, plus the final result and run statistics.
+
+    Attributes:
+    interval (float): Minimum number of seconds between two generation reports. 0 prints every generation.
+    """
+
+    def __init__(self, interval=1.0):
+        """
+        Parameters:
+        interval (float): Minimum number of seconds between two generation reports. 0 prints every
+            generation. Default is 1.0.
+        """
+        self.interval = interval
+        self._last = None
+
+    def on_start(self, ga):
+        if ga.precomputed:
+            print(f"* Fitness table: {ga.precomputed} genotypes precomputed")
+        print("Create the population")
+        self._last = None
+
+    def on_generation(self, ga, generation, best):
+        now = time.monotonic()
+        if self._last is not None and now - self._last < self.interval:
+            return
+        self._last = now
+        self.display(best, generation)
+
+    def on_finish(self, ga, best):
+        self.display(best, len(ga.history) - 1)
+        print(f"* Stopped   : {ga.stop_reason}")
+        analysis = ga.analysis
+        print(f"* Response  : rise {analysis.rise_time:.4g} - overshoot {analysis.overshoot:.4g}% - "
+              f"settling {analysis.settling_time:.4g} - IAE {analysis.iae:.4g}")
+        last = ga.history.last
+        (gain_margin,), (phase_margin,), (sensitivity,) = ga.system.margins([[last["kp"], last["ki"], last["kd"]]])
+        print(f"* Margins   : gain {gain_margin:.4g} - phase {phase_margin:.4g} deg - Ms {sensitivity:.4g}")
+
+        if ga.cache is not None:
+            stats = ga.cache.stats()
+            print(f"* Fitness cache: {stats['hits']} hits - {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate)")
+        if ga.store is not None:
+            stored = ga.store.stats()
+            print(f"* Fitness table: {stored['hits']} hits - {stored['filled']}/{stored['size']} genotypes stored")
+        if ga.screen is not None:
+            screened = ga.screen.stats()
+            print(f"* Fitness screen: {screened['rejected']}/{screened['screened']} rejected - "
+                  f"{screened['error_rate']:.1%} of {screened['audited']} audited wrongly rejected")
+        if ga.surrogate is not None:
+            surrogate = ga.surrogate.stats()
+            print(f"* Surrogate : {surrogate['screened_out']}/{surrogate['proposed']} children screened out - "
+                  f"rank correlation {surrogate['rank_correlation']:.2f}")
+        if ga.stability_screen:
+            print(f"* Stability screen: {ga.unstable_skipped} unstable candidates skipped")
+        if ga.profiler.enabled:
+            print(f"* Profile: {ga.profiler.summary()}")
+
+    @staticmethod
+    def display(best, generation):
+        """
+        Display the optimization results for a generation.
+
+        Parameters:
+        best (dict): The best individual in the generation.
+        generation (int): The generation number.
+        """
+        print("##### Optimizing PID using Genetic Algorithm #####")
+        print(f"* Generation: {generation}")
+        print(f"* KP        : {best['gen'][0]}")
+        print(f"* KI        : {best['gen'][1]}")
+        print(f"* KD        : {best['gen'][2]}")
+        print(f"* Fitness   : {best['fitness']}")
+
+
+class JsonlTraceObserver(Observer):
+    """
+    Writes the events of a run as JSON lines, buffered in memory and flushed in blocks.
+
+    Each line holds the event name, the elapsed seconds, the generation and the best gains and fitness.
+
+    Attributes:
+    path (str): The trace file, appended to.
+    buffer_size (int): Number of records kept in memory before writing them.
+    every (int): Only every n-th generation event is recorded; improvements and the finish are always recorded.
+    """
+
+    def __init__(self, path, buffer_size=1024, every=1):
+        """
+        Parameters:
+        path (str): The trace file, appended to.
+        buffer_size (int): Number of records kept in memory before writing them. Default is 1024.
+        every (int): Record one generation event out of every. 0 records improvements and the finish
+            only. Default is 1.
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self.every = every
+        self._buffer = []
+        self._start = None
+
+    def _record(self, event, generation, best):
+        kp, ki, kd = (float(gain) for gain in best["gen"])
+        self._buffer.append({"event": event, "seconds": time.perf_counter() - self._start,
+                             "generation": generation, "kp": kp, "ki": ki, "kd": kd,
+                             "fitness": float(best["fitness"])})
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def on_start(self, ga):
+        self._start = time.perf_counter()
+
+    def on_generation(self, ga, generation, best):
+        if self.every and generation % self.every == 0:
+            self._record("generation", generation, best)
+
+    def on_improvement(self, ga, generation, best):
+        self._record("improvement", generation, best)
+
+    def on_finish(self, ga, best):
+        self._record("finish", len(ga.history) - 1, best)
+        self.flush()
+
+    def flush(self):
+        """
+        Append the buffered records to the trace file.
+        """
+        if not self._buffer:
+            return
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in self._buffer))
+        self._buffer.clear()
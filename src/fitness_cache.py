@@ -0,0 +1,111 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+class FitnessCache:
+    """
+    Bounded memo of fitness values keyed on the exact genotype.
+
+    Keys combine the plant, the gene bounds and the packed chromosome, so one cache can be shared by
+    several GeneticAlgorithm runs. When the cache is full the least recently used entry is evicted.
+
+    Attributes:
+    maxsize (int): Maximum number of cached entries. 0 disables caching.
+    hits (int): Number of lookups answered from the cache.
+    misses (int): Number of lookups that required a fitness evaluation.
+    """
+
+    def __init__(self, maxsize=100000):
+        """
+        Initialize an empty cache.
+
+        Parameters:
+        maxsize (int): Maximum number of cached entries. 0 disables caching. Default is 100000.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def context(num, den, n_var, n_bit, ra, rb, fitness_options=None):
+        """
+        Build the part of the key shared by every genotype of a run.
+
+        Parameters:
+        num (list): Numerator coefficients of the system transfer function.
+        den (list): Denominator coefficients of the system transfer function.
+        n_var (int): Number of variables (genes).
+        n_bit (int): Number of bits per variable.
+        ra (float): The lower bound of the range.
+        rb (float): The upper bound of the range.
+        fitness_options (dict): Options changing how fitness is computed. Default is None.
+
+        Returns:
+        tuple: Hashable description of the plant, the encoding and the fitness options.
+        """
+        num = tuple(np.ravel(np.asarray(num, dtype=float)).tolist())
+        den = tuple(np.ravel(np.asarray(den, dtype=float)).tolist())
+        options = tuple(sorted((fitness_options or {}).items()))
+        return num, den, n_var, n_bit, float(ra), float(rb), options
+
+    def get(self, key):
+        """
+        Look up a fitness value and mark it as recently used.
+
+        Parameters:
+        key (tuple): The (context, packed chromosome) key.
+
+        Returns:
+        float or None: The cached fitness, or None on a miss.
+        """
+        fitness = self._entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return fitness
+
+    def put(self, key, fitness):
+        """
+        Store a fitness value, evicting the least recently used entry if the cache is full.
+
+        Parameters:
+        key (tuple): The (context, packed chromosome) key.
+        fitness (float): The fitness value.
+        """
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = fitness
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Drop every entry and reset the counters.
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        Report the cache counters.
+
+        Returns:
+        dict: Hits, misses, hit rate, current size and size limit.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from calc_fitness import FITNESS_VERSION
+
+
+class FitnessStore:
+    """
+    On-disk fitness table shared by every run and process tuning the same plant and encoding.
+
+    The table is a memory-mapped .npy array with one float64 entry per possible chromosome, indexed
+    directly by the chromosome's packed integer value; NaN marks genotypes not computed yet. Its file
+    name is a hash of the plant, the encoding, the fitness options and FITNESS_VERSION, so a change to
+    any of them starts a new table instead of reusing stale values. Fitness is deterministic, so
+    processes filling the same entries concurrently write identical values and need no locking.
+
+    Attributes:
+    path (str): Location of the table.
+    n_bits (int): Chromosome length; the table has 2**n_bits entries.
+    hits (int): Number of lookups answered from the table.
+    misses (int): Number of lookups that found no value.
+    """
+
+    def __init__(self, directory, num, den, n_var, n_bit, ra, rb, fitness_options=None, max_bits=26):
+        """
+        Open the table for a plant and encoding, creating it if needed.
+
+        Parameters:
+        directory (str): Directory holding the tables.
+        num (list): Numerator coefficients of the system transfer function.
+        den (list): Denominator coefficients of the system transfer function.
+        n_var (int): Number of variables (genes).
+        n_bit (int): Number of bits per variable.
+        ra (float): The lower bound of the range.
+        rb (float): The upper bound of the range.
+        fitness_options (dict): Options changing how fitness is computed. Default is None.
+        max_bits (int): Largest chromosome length accepted, bounding the table size. Default is 26
+            (512 MiB).
+        """
+        self.n_bits = n_var * n_bit
+        if self.n_bits > max_bits:
+            raise ValueError(f"A {self.n_bits} bit chromosome needs a table of 2**{self.n_bits} entries, "
+                             f"above the {max_bits} bit limit")
+
+        description = {
+            "num": np.ravel(np.asarray(num, dtype=float)).tolist(),
+            "den": np.ravel(np.asarray(den, dtype=float)).tolist(),
+            "n_var": n_var,
+            "n_bit": n_bit,
+            "ra": float(ra),
+            "rb": float(rb),
+            "fitness_options": dict(sorted((fitness_options or {}).items())),
+            "fitness_version": FITNESS_VERSION,
+        }
+        encoded = json.dumps(description, sort_keys=True)
+        digest = hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"fitness_{digest}.npy")
+        if not os.path.exists(self.path):
+            self._create(description)
+
+        self.table = np.load(self.path, mmap_mode="r+")
+        self.hits = 0
+        self.misses = 0
+
+    def _create(self, description):
+        # Build the table under a temporary name and publish it with a hard link, which fails instead of
+        # replacing a table another process published first: both processes then share that one file, and
+        # neither keeps writing into an unlinked copy. Concurrent processes never see a partially
+        # initialized file either way
+        directory = os.path.dirname(self.path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npy")
+        os.close(fd)
+        try:
+            os.chmod(tmp_path, 0o644)
+            table = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64, shape=(2**self.n_bits,))
+            table[:] = np.nan
+            table.flush()
+            del table
+            try:
+                os.link(tmp_path, self.path)
+            except FileExistsError:
+                return
+            with open(self.path[:-4] + ".json", "w") as f:
+                json.dump(description, f, indent=2)
+        finally:
+            os.unlink(tmp_path)
+
+    def lookup(self, keys):
+        """
+        Read the fitness of a batch of packed chromosomes.
+
+        Parameters:
+        keys (array): Packed chromosome integers.
+
+        Returns:
+        np.ndarray: Fitness values, NaN for genotypes not computed yet.
+        """
+        values = self.table[np.asarray(keys, dtype=np.int64)]
+        found = np.count_nonzero(~np.isnan(values))
+        self.hits += found
+        self.misses += values.size - found
+        return values
+
+    def store(self, keys, fitness):
+        """
+        Write the fitness of a batch of packed chromosomes.
+
+        Parameters:
+        keys (array): Packed chromosome integers.
+        fitness (array): Fitness values.
+        """
+        self.table[np.asarray(keys, dtype=np.int64)] = fitness
+
+    def missing(self):
+        """
+        Packed chromosomes whose fitness has not been computed yet.
+
+        Returns:
+        np.ndarray: The missing keys.
+        """
+        return np.flatnonzero(np.isnan(self.table))
+
+    def precompute(self, evaluate, decode, batch_size=65536):
+        """
+        Fill every missing entry of the table.
+
+        Parameters:
+        evaluate (callable): Function mapping an (N, n_var) gains matrix to N fitness values.
+        decode (callable): Function mapping an (N, n_bits) bit matrix to its gains matrix.
+        batch_size (int): Number of genotypes evaluated per call. Default is 65536.
+
+        Returns:
+        int: Number of entries computed.
+        """
+        missing = self.missing()
+        shifts = np.arange(self.n_bits - 1, -1, -1, dtype=np.int64)
+        for start in range(0, missing.size, batch_size):
+            keys = missing[start:start + batch_size]
+            bits = ((keys[:, None] >> shifts) & 1).astype(np.uint8)
+            self.store(keys, evaluate(decode(bits)))
+        self.flush()
+        return int(missing.size)
+
+    def flush(self):
+        """
+        Write pending changes to disk.
+        """
+        self.table.flush()
+
+    def stats(self):
+        """
+        Report the table counters.
+
+        Returns:
+        dict: Hits, misses, filled entries and table size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "filled": int(np.count_nonzero(~np.isnan(self.table))),
+            "size": int(self.table.size),
+        }
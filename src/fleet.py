@@ -0,0 +1,201 @@
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from system_simulation import SystemDynamics
+from genetic_algorithm import GeneticAlgorithm
+from ziegler_nichols import ziegler_nichols_tuning
+
+# Genetic Algorithm settings used for every plant unless the plant definition overrides them
+DEFAULT_CONFIG = {
+    "n_var": 3,
+    "n_bit": 5,
+    "ra": 100,
+    "rb": 0,
+    "population_size": 100,
+    "minimum_target": 83,
+    "mutation_rate": 0.5,
+    "seed": 0,
+    "max_generations": 100000,
+    "max_seconds": None,
+    "stagnation": None,
+}
+
+# Settings passed to GeneticAlgorithm as budgets, None meaning no limit
+_BUDGETS = ("max_generations", "max_seconds", "stagnation")
+
+
+def _coefficients(value):
+    """
+    Parse polynomial coefficients given as a list or a space separated string.
+    """
+    if isinstance(value, str):
+        return [float(c) for c in value.split()]
+    return [float(c) for c in value]
+
+
+def read_plants(path):
+    """
+    Stream plant definitions from a JSONL or CSV file, one plant at a time.
+
+    Each JSONL line is an object with "num" and "den" coefficient lists and optionally "name", "kpu"
+    (ultimate gain for Ziegler-Nichols, found from the plant when missing) and any DEFAULT_CONFIG key. CSV files have a header with the
+    same columns, coefficients being space separated.
+
+    Parameters:
+    path (str): Path of the .jsonl or .csv file.
+
+    Yields:
+    dict: A plant definition, with "index" set to its position in the file.
+    """
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            rows = (row for row in csv.DictReader(f))
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+
+        for index, row in enumerate(rows):
+            plant = {key: value for key, value in row.items() if value not in ("", None)}
+            plant["index"] = index
+            plant.setdefault("name", f"plant_{index}")
+            plant["num"] = _coefficients(plant["num"])
+            plant["den"] = _coefficients(plant["den"])
+            if "kpu" in plant:
+                plant["kpu"] = float(plant["kpu"])
+            yield plant
+
+
+def resolve_config(plant, config=None):
+    """
+    Merge the Genetic Algorithm settings of a plant with the run configuration and the defaults.
+
+    Parameters:
+    plant (dict): Plant definition as produced by read_plants.
+    config (dict): Settings overriding DEFAULT_CONFIG. Values in the plant definition take precedence.
+
+    Returns:
+    dict: Every DEFAULT_CONFIG key, with its value converted to int or float.
+    """
+    unknown = set(config or {}) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown settings: {sorted(unknown)}. Choose from {sorted(DEFAULT_CONFIG)}")
+    settings = dict(DEFAULT_CONFIG, **(config or {}))
+    settings.update({key: plant[key] for key in DEFAULT_CONFIG if key in plant})
+    for key in ("n_var", "n_bit", "population_size", "seed", "max_generations", "stagnation"):
+        settings[key] = None if settings[key] is None else int(settings[key])
+    for key in ("ra", "rb", "minimum_target", "mutation_rate", "max_seconds"):
+        settings[key] = None if settings[key] is None else float(settings[key])
+    return settings
+
+
+def tune_plant(plant, config=None, observers=None):
+    """
+    Tune one plant with the Genetic Algorithm and Ziegler-Nichols.
+
+    Parameters:
+    plant (dict): Plant definition as produced by read_plants.
+    config (dict): Genetic Algorithm settings overriding DEFAULT_CONFIG. Values in the plant
+        definition take precedence.
+    observers (list): Observers of the Genetic Algorithm run. Default is None, to run silently.
+
+    Returns:
+    dict: The plant name, index and coefficients, the GA and Ziegler-Nichols gains (None when a
+    method could not run) and the tuning time in seconds.
+    """
+    settings = resolve_config(plant, config)
+
+    start = time.perf_counter()
+    system = SystemDynamics(plant["num"], plant["den"])
+    result = {"index": plant["index"], "name": plant["name"], "num": plant["num"], "den": plant["den"]}
+
+    ga_tuner = GeneticAlgorithm(system, settings["n_var"], settings["n_bit"], settings["ra"], settings["rb"],
+                                settings["population_size"], settings["minimum_target"],
+                                seed=settings["seed"] + plant["index"], observers=observers or [],
+                                **{key: settings[key] for key in _BUDGETS})
+    kp, ki, kd = ga_tuner(settings["mutation_rate"])
+    result["ga"] = {"kp": kp, "ki": ki, "kd": kd, "fitness": ga_tuner.history.last["fitness"],
+                    "generations": len(ga_tuner.history), "stop_reason": ga_tuner.stop_reason}
+
+    result["zn"] = None
+    try:
+        kp, ki, kd = ziegler_nichols_tuning(system, plant.get("kpu"))
+        result["zn"] = {"kp": kp, "ki": ki, "kd": kd}
+    except ValueError as e:
+        result["zn_error"] = str(e)
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_fleet(input_path, output_path, workers=None, config=None):
+    """
+    Tune every plant of a file on a bounded pool of processes, writing results as they finish.
+
+    Plants are read lazily and at most two tasks per worker are in flight, so memory use does not
+    depend on the number of plants. Each result is appended to the output as one JSON line and
+    flushed immediately; lines are in completion order and carry the plant's input index.
+
+    Parameters:
+    input_path (str): Plant definitions, .jsonl or .csv.
+    output_path (str): Output .jsonl file.
+    workers (int): Number of worker processes. Default is the number of CPUs.
+    config (dict): Genetic Algorithm settings overriding DEFAULT_CONFIG.
+
+    Returns:
+    int: Number of plants tuned.
+    """
+    workers = workers or os.cpu_count() or 1
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(output_path, "w") as out:
+        pending = set()
+
+        def drain(block_until):
+            nonlocal pending, done
+            finished, pending = wait(pending, return_when=block_until)
+            for future in finished:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"index": future.plant["index"], "name": future.plant["name"], "error": repr(e)}
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                done += 1
+
+        for plant in read_plants(input_path):
+            if len(pending) >= 2 * workers:
+                drain(FIRST_COMPLETED)
+            future = pool.submit(tune_plant, plant, config)
+            future.plant = {"index": plant["index"], "name": plant["name"]}
+            pending.add(future)
+
+        while pending:
+            drain(FIRST_COMPLETED)
+
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune PID controllers for a fleet of plants.")
+    parser.add_argument("input", help="Plant definitions (.jsonl or .csv).")
+    parser.add_argument("output", help="Results file (.jsonl), written as plants finish.")
+    parser.add_argument("--workers", type=int, help="Number of worker processes. Default is the CPU count.")
+    parser.add_argument("--population", type=int, dest="population_size", help="GA population size.")
+    parser.add_argument("--n-bit", type=int, dest="n_bit", help="Bits per gain.")
+    parser.add_argument("--target", type=float, dest="minimum_target", help="GA minimum fitness target.")
+    parser.add_argument("--seed", type=int, help="Base seed; plant i uses seed + i.")
+    parser.add_argument("--max-generations", type=int, dest="max_generations", help="GA generation budget per plant.")
+    parser.add_argument("--max-seconds", type=float, dest="max_seconds", help="GA time budget per plant.")
+    parser.add_argument("--stagnation", type=int, help="Stop a plant after this many generations without improvement.")
+    args = parser.parse_args()
+
+    config = {key: value for key, value in vars(args).items()
+              if key in DEFAULT_CONFIG and value is not None}
+    count = run_fleet(args.input, args.output, args.workers, config)
+    print(f"Tuned {count} plants into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
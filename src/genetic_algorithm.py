@@ -1,18 +1,22 @@
 from typing import Any
+import json
+import tempfile
+from functools import partial
 import os
-from utils import generate_gen
-from calc_fitness import evaluate_fitness, evaluate_mutation_fitness
-from system_simulation import SystemDynamics
-
-import control
-from control import TransferFunction
-from tqdm import tqdm
-from random import random
+from fitness_cache import FitnessCache
+from fitness_store import FitnessStore
+from utils import decode_chromosomes
+from population import Population
+from tuners import Tuner
+from uncertainty import scenario_options
+from margins import margin_options
+from operators import SELECTIONS, CROSSOVERS, flip_mutation
+
 import numpy as np 
-import copy
+import time
 import matplotlib.pyplot as plt
 
-class GeneticAlgorithm:
+class GeneticAlgorithm(Tuner):
     """
     Class implementing a Genetic Algorithm for PID controller optimization.
     
@@ -24,8 +28,31 @@ class GeneticAlgorithm:
     rb (float): The upper bound of the range.
     population_size (int): Size of the population.
     target (float): Minimum fitness target for termination.
+    cache (FitnessCache): Memo of already evaluated genotypes.
+    workers (int): Number of worker processes used for large evaluation batches.
+    mode (str): "steady_state" or "generational" evolution.
+    elitism (int): Number of fittest individuals kept unchanged by each generational step.
+    fitness_options (dict): Keyword arguments passed to evaluate_population.
+    stability_screen (bool): Whether unstable candidates are rejected before simulation.
+    unstable_skipped (int): Number of candidates rejected by the stability screen.
+    store (FitnessStore): Persistent fitness table shared across runs, or None.
+    screen (FitnessScreen): Coarse first stage of the evaluation of the children, or None.
+    surrogate (Surrogate): Learned model choosing which children are simulated, or None.
+    profiler (Profiler): Phase times, counters and latency histograms of the run, or a NullProfiler.
+    observers (list): Receivers of the start, generation, improvement and finish events.
+    history (History): Best gains and fitness of every generation.
+    generation (int): Number of generations evolved, including those of a resumed checkpoint.
+    evaluations (int): Number of individuals evaluated. Cache and table hits count too, so the count does
+        not depend on the cache and is reproduced by a resumed run.
+    stop_reason (str): Why the last run stopped: "target", "generations", "evaluations", "time" or "stagnation".
     """
-    def __init__(self, system, n_var, n_bit, ra, rb, population_size, minimum_target = 75) -> None:
+    def __init__(self, system, n_var, n_bit, ra, rb, population_size, minimum_target = 75, cache_size=100000, cache=None, workers=1, parallel_threshold=64, seed=None,
+                 mode="steady_state", selection=None, crossover=None, elitism=2, tournament_size=2, crossover_points=2,
+                 fitness_backend="simulation", stability_screen=True, scenarios=None, aggregate="worst",
+                 margins=None, store_dir=None, precompute=False, screen=None, surrogate=None, profile=False, profiler=None,
+                 observers=None,
+                 history=None, max_generations=None, max_evaluations=None, max_seconds=None, stagnation=None,
+                 checkpoint_path=None, checkpoint_interval=60.0, resume=True) -> None:
         """
         Initialize the GeneticAlgorithm with the given parameters.
         
@@ -37,170 +64,470 @@ class GeneticAlgorithm:
         rb (float): The upper bound of the range.
         population_size (int): Size of the population.
         minimum_target (float): Minimum fitness target for termination. Default is 75.
+        cache_size (int): Maximum number of genotypes kept in the fitness cache. 0 disables it. Default is 100000.
+        cache (FitnessCache): Existing cache to share between runs. Overrides cache_size when given.
+        workers (int): Number of worker processes for fitness evaluation. 1 evaluates in this process,
+            None uses every CPU. Results do not depend on this value. Default is 1.
+        parallel_threshold (int): Smallest batch sent to the worker pool; smaller batches are
+            evaluated in this process. Default is 64.
+        seed (int): Seed for the random number generator, for reproducible runs. Default is None.
+        mode (str): "steady_state" breeds two children from the two fittest individuals per generation
+            and replaces the two least fit. "generational" breeds a whole new population per generation,
+            scored in one bulk evaluation. Default is "steady_state".
+        selection (str or callable): Parent selection, one of "fittest", "tournament", "roulette", or a
+            function (population, n, rng) -> indices. Default is "fittest" in steady state mode and
+            "tournament" in generational mode.
+        crossover (str or callable): Crossover, one of "midpoint", "uniform", "k_point", or a function
+            (bits, rng) -> bits pairing consecutive rows. Default is "midpoint" in steady state mode and
+            "k_point" in generational mode.
+        elitism (int): Number of fittest individuals carried over unchanged in generational mode. Default is 2.
+        tournament_size (int): Individuals per tournament for tournament selection. Default is 2.
+        crossover_points (int): Number of cut points for k point crossover. Default is 2.
+        fitness_backend (str): Step response metrics backend, "simulation" or "analytic". Default is "simulation".
+        stability_screen (bool): Give candidates that destabilize the loop UNSTABLE_FITNESS without
+            simulating them, using a batched Routh-Hurwitz test. Default is True.
+        scenarios (sequence): Perturbed plants as (num, den) pairs, see uncertainty.perturbed_plants. Each
+            candidate is then scored on the nominal plant and every scenario. The stability screen and the
+            fitness screen still only look at the nominal plant. Default is None, for the nominal plant only.
+        aggregate (str): How the scores over the plants combine, "worst" (their minimum) or "mean". The
+            fitness screen bound only holds for "worst". Default is "worst".
+        margins (dict): Frequency domain limits on the nominal loop, any of min_gain_margin (ratio),
+            min_phase_margin (degrees) and max_sensitivity (Ms), checked for the whole batch against the cached
+            plant frequency response. Candidates violating them get UNSTABLE_FITNESS without simulation, or with
+            margin_penalty set, a fitness divided by 1 + margin_penalty * violation. Default is None.
+        store_dir (str): Directory of persistent fitness tables shared by runs and processes tuning the
+            same plant and encoding. Default is None, for no persistent table.
+        precompute (bool): Fill the whole persistent table before evolving, so the run never simulates.
+            Only sensible for small n_bit. Default is False.
+        screen (FitnessScreen): Bound the fitness of the children with a coarse short simulation first, and
+            simulate in full only those that could stay in the population. Screened children keep their bound
+            as fitness and stay out of the cache and table. Only used in steady state mode, since every child
+            enters the next population in generational mode. Default is None, to simulate every child in full.
+        surrogate (Surrogate): Breed surrogate.proposals pairs of children per generation and simulate only the
+            pair the surrogate predicts fittest, once its archive of evaluated gains is large enough. Only used in
+            steady state mode, and not together with screen, whose bounds are not exact fitness values.
+            Default is None, to breed and simulate one pair.
+        profile (bool): Record the wall time of each phase, evaluation and failure counts and per-generation
+            latency histograms in self.profiler. Default is False.
+        profiler (Profiler): Existing profiler to record into, for example to aggregate several runs.
+            Enables profiling when given.
+        observers (list): Observers notified of the progress of the run, see events.Observer. An empty list
+            runs silently. Default is a ConsoleObserver printing at most one generation per second.
+        history (History): Recorder of the best individual of each generation, for example one saving
+            the full history to a directory. Default is an in-memory History of bounded size.
+        max_generations (int): Stop after this many generations. Default is None, for no limit.
+        max_evaluations (int): Stop once this many individuals were evaluated, cache hits included. Checked
+            after each generation, so the last generation may exceed it. Default is None, for no limit.
+        max_seconds (float): Stop once the run has lasted this long, resumed sessions included.
+            Default is None, for no limit.
+        stagnation (int): Stop after this many generations without improvement of the best fitness.
+            Default is None, for no limit.
+        checkpoint_path (str): File (.npz) where the population, RNG state, counters and history are saved
+            every checkpoint_interval seconds and when the run stops. Default is None, for no checkpoints.
+        checkpoint_interval (float): Minimum number of seconds between two checkpoints. Default is 60.
+        resume (bool): Continue from checkpoint_path when it exists, reproducing the uninterrupted run
+            exactly. Default is True.
         """
-        self.num = system.system.num
-        self.den = system.system.den
+        if ra == rb:
+            raise ValueError("The gene range is empty: ra and rb must differ")
+        self.system = system
+        self.num = system.num
+        self.den = system.den
         self.n_var = n_var
         self.n_bit = n_bit
         self.ra = ra 
         self.rb = rb
         self.population_size = population_size
-        self.target = minimum_target
+        self.fitness_options = {"backend": fitness_backend, **scenario_options(scenarios, aggregate),
+                                **margin_options(margins)}
+        self.stability_screen = stability_screen
+        self.unstable_skipped = 0
+        self.cache = cache if cache is not None else FitnessCache(cache_size)
+        options = dict(self.fitness_options, prescreen=stability_screen)
+        self._cache_context = FitnessCache.context(self.num, self.den, n_var, n_bit, ra, rb, options)
+        self.store = None
+        if store_dir is not None:
+            self.store = FitnessStore(store_dir, self.num, self.den, n_var, n_bit, ra, rb, options)
+        self.precompute = precompute
+        self.screen = screen
+        if screen is not None and surrogate is not None:
+            raise ValueError("A fitness screen and a surrogate cannot be combined")
+        self.surrogate = surrogate
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self._evaluator = None
+        self.rng = np.random.default_rng(seed)
+        self.precomputed = 0
+
+        if mode not in ("steady_state", "generational"):
+            raise ValueError(f"Unknown evolution mode: {mode}")
+        self.mode = mode
+        self.elitism = elitism
+        generational = mode == "generational"
+        self._select = self._operator(SELECTIONS, selection or ("tournament" if generational else "fittest"),
+                                      tournament={"size": tournament_size})
+        self._crossover = self._operator(CROSSOVERS, crossover or ("k_point" if generational else "midpoint"),
+                                         k_point={"k": crossover_points})
+
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self._init_tuner(minimum_target, observers, history, profile, profiler, max_generations,
+                         max_evaluations, max_seconds, stagnation)
+
+    # Views of the history, kept for scripts written against the former lists. They hold every generation
+    # while the History can provide them, that is with a directory or within its first chunk; past that, an
+    # in-memory History only keeps the downsampled stream, and the lists hold the last value of each bucket
+    @property
+    def kp_list(self):
+        return self._history_list("kp")
+
+    @property
+    def ki_list(self):
+        return self._history_list("ki")
+
+    @property
+    def kd_list(self):
+        return self._history_list("kd")
+
+    @property
+    def fitness_list(self):
+        return self._history_list("fitness")
+
+    def _history_list(self, column):
+        """
+        One column of the history as a list, downsampled when the full resolution is no longer kept.
+        """
+        if self.history.complete:
+            return self.history.values(column).tolist()
+        return self.history.downsampled()["last"][:, self.history.COLUMNS.index(column)].tolist()
+
+    @staticmethod
+    def _operator(registry, operator, **options):
+        """
+        Resolve an operator name to its function, binding its options. Callables are used as given.
+        """
+        if callable(operator):
+            return operator
+        if operator not in registry:
+            raise ValueError(f"Unknown operator: {operator}. Choose from {sorted(registry)}")
+        return partial(registry[operator], **options.get(operator, {}))
+
+    def precompute_store(self):
+        """
+        Evaluate every genotype missing from the persistent fitness table.
 
-        # Lists to store the generation and the parameters
-        self.kp_list = []
-        self.ki_list = []
-        self.kd_list = []
-        self.fitness_list = []
+        Returns:
+        int: Number of genotypes evaluated.
+        """
+        decode = partial(decode_chromosomes, n_var=self.n_var, n_bit=self.n_bit, ra=self.ra, rb=self.rb)
+        return self.store.precompute(self._evaluate_gains, decode)
 
     def create_population(self):
         """
         Create the initial population.
 
         Returns:
-        list: A list of dictionaries, each representing an individual in the population with its genes, fitness, and chromosome.
-        """
-        print("Create the population")
-        population = []
-        for _ in tqdm(range(self.population_size)):
-            gen, chromosome = generate_gen(self.n_var, self.n_bit, self.ra, self.rb)
-            fitness = evaluate_fitness(self.num, self.den, gen)
-            population.append(
-                {
-                    "gen": gen,
-                    "fitness": fitness,
-                    "chromosome": chromosome
-                }
-            )
+        Population: The evaluated population, holding the chromosomes, genes and fitness of every individual.
+        """
+        population = Population.random(self.population_size, self.n_var, self.n_bit, self.ra, self.rb, self.rng)
+        self.evaluate(population)
         return population
-    
-    def selection(self, population):
+
+    def evaluate(self, population, threshold=None):
         """
-        Select two parents based on their fitness.
+        Evaluate a batch of individuals in place, simulating only the genotypes missing from the fitness cache.
 
         Parameters:
-        population (list): The current population.
+        population (Population): The individuals to evaluate.
+        threshold (float): Fitness an individual must reach to enter the population, used by the screen.
+            Default is None, to evaluate every individual in full.
 
         Returns:
-        tuple: A tuple containing the two selected parents.
+        np.ndarray: The fitness of each individual.
         """
-        population_cp = copy.deepcopy(population)
-        fitness = []
-        for pop in population_cp:
-            fitness.append(pop["fitness"])
-        index = np.argmax(fitness)
-        parent1 = population_cp[index]
-
-        population_cp[index] = {}
-        fitness[index] = 0
-
-        index = np.argmax(fitness)
-        parent2 = population_cp[index]
+        with self.profiler.phase("evaluation"):
+            return self._evaluate(population, threshold)
 
-        return parent1, parent2
-
-    def crossover(self, parent1, parent2):
+    def _evaluate(self, population, threshold=None):
+        """
+        Body of evaluate, timed as the evaluation phase.
+        """
+        packed = population.keys()
+        keys = [(self._cache_context, key) for key in packed]
+        self.evaluations += len(keys)
+        self.profiler.count("evaluations", len(keys))
+
+        # Simulate each missing genotype once, even if it appears several times in the batch
+        missing = {}
+        for i, key in enumerate(keys):
+            fitness = self.cache.get(key)
+            if fitness is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                population.fitness[i] = fitness
+        self.profiler.count("cache_hits", len(keys) - sum(len(rows) for rows in missing.values()))
+
+        if missing and self.store is not None:
+            first = [rows[0] for rows in missing.values()]
+            stored = self.store.lookup([packed[i] for i in first])
+            for key, fitness in zip(list(missing), stored):
+                if not np.isnan(fitness):
+                    self.cache.put(key, fitness)
+                    population.fitness[missing.pop(key)] = fitness
+                    self.profiler.count("store_hits")
+
+        if missing:
+            first = [rows[0] for rows in missing.values()]
+            if self.screen is not None and threshold is not None:
+                computed, exact = self.screen.evaluate(self.num, self.den, population.gains[first], threshold,
+                                                       self._evaluate_gains, self.rng)
+                self.profiler.count("screen_rejected", int(np.count_nonzero(~exact)))
+            else:
+                computed = self._evaluate_gains(population.gains[first])
+                exact = np.ones(len(first), dtype=bool)
+
+            # Bounds of screened individuals are not their fitness, so they are not remembered
+            for (key, rows), fitness, known in zip(missing.items(), computed, exact):
+                if known:
+                    self.cache.put(key, fitness)
+                population.fitness[rows] = fitness
+            if self.store is not None and exact.any():
+                self.store.store([packed[i] for i, known in zip(first, exact) if known], computed[exact])
+
+        return population.fitness
+
+    def selection(self, population, n=2):
         """
-        Perform crossover between two parents to produce two children.
+        Select parents based on their fitness, with the configured selection operator.
 
         Parameters:
-        parent1 (dict): The first parent.
-        parent2 (dict): The second parent.
+        population (Population): The current population.
+        n (int): Number of parents to select. Default is 2.
 
         Returns:
-        tuple: A tuple containing the two children.
+        Population: The selected parents.
         """
-        child1 = copy.deepcopy(parent1)
-        child2 = copy.deepcopy(parent2)
+        return population[self._select(population, n, self.rng)]
 
-        slice_index = len(parent1["chromosome"]) // 2
+    def crossover(self, parents):
+        """
+        Perform crossover between consecutive pairs of parents, with the configured crossover operator.
 
-        child1["chromosome"][:slice_index] = parent2["chromosome"][:slice_index]
-        child2["chromosome"][:slice_index] = parent1["chromosome"][:slice_index]
+        Parameters:
+        parents (Population): The parents, paired as rows (0, 1), (2, 3), ...
 
-        return child1, child2
+        Returns:
+        Population: The unevaluated children, two per pair of parents.
+        """
+        bits = self._crossover(parents.bits, self.rng)
+        return Population.from_bits(bits, self.n_var, self.n_bit, self.ra, self.rb)
     
-    def mutation(self, child, mutation_rate):
+    def mutation(self, children, mutation_rate):
         """
-        Perform mutation on a child.
+        Perform mutation on a batch of children.
 
         Parameters:
-        child (dict): The child to be mutated.
+        children (Population): The children to be mutated.
         mutation_rate (float): The mutation rate.
 
         Returns:
-        dict: The mutated child.
+        Population: The unevaluated mutants.
         """
-        mutant = child
-        mutator = {
-            0: 1, 
-            1: 0
-        }
-        chromosome = child["chromosome"]
-        for i in range(len(chromosome)):
-            if random() < mutation_rate:
-                chromosome[i] = mutator[chromosome[i]]
-
-        mutant["chromosome"] = chromosome
-
-        return mutant
+        bits = flip_mutation(children.bits, mutation_rate, self.rng)
+        return Population.from_bits(bits, self.n_var, self.n_bit, self.ra, self.rb)
     
     def regeneration(self, children, population):
         """
         Replace the least fit individuals in the population with the children.
 
         Parameters:
-        children (list): The children to be added to the population.
-        population (list): The current population.
+        children (Population): The children to be added to the population.
+        population (Population): The current population.
 
         Returns:
-        list: The new population.
+        Population: The new population.
         """
-        fitness = []
-        for pop in population:
-            fitness.append(pop["fitness"])
-
-        for i in range(len(children)):
-            index = np.argmin(fitness)
-            population[index] = children[i]
-            fitness[index] = np.inf
+        population[population.worst(len(children))] = children
 
         return population
     
+    def steady_state_step(self, population, mutation_rate):
+        """
+        Breed two children and let them replace the two least fit individuals.
+
+        Parameters:
+        population (Population): The current population.
+        mutation_rate (float): The mutation rate.
+
+        Returns:
+        Population: The new population.
+        """
+        profiler = self.profiler
+        surrogate = self.surrogate
+        proposals = surrogate.proposals if surrogate is not None and surrogate.ready else 1
+        with profiler.phase("selection"):
+            parents = self.selection(population)
+            n_children = len(parents)
+            if proposals > 1:
+                parents = parents[np.tile(np.arange(n_children), proposals)]
+
+        with profiler.phase("crossover"):
+            children = self.crossover(parents)
+
+        with profiler.phase("mutation"):
+            mutants = self.mutation(children, mutation_rate)
+
+        # Of all the proposed children, only those the surrogate ranks first are simulated
+        if proposals > 1:
+            with profiler.phase("surrogate"):
+                mutants = mutants[surrogate.select(self._unit_gains(mutants.gains), n_children)]
+
+        # Both children are scored in a single batched simulation, skipping genotypes already seen
+        self.evaluate(mutants, self._entry_threshold(population, len(mutants)))
+        if surrogate is not None:
+            surrogate.add(self._unit_gains(mutants.gains), mutants.fitness)
+
+        with profiler.phase("regeneration"):
+            return self.regeneration(mutants, population)
+
+    def generational_step(self, population, mutation_rate):
+        """
+        Breed a whole new population, keeping the fittest individuals as elite.
+
+        Parameters:
+        population (Population): The current population.
+        mutation_rate (float): The mutation rate.
+
+        Returns:
+        Population: The new population.
+        """
+        n_elite = min(self.elitism, len(population))
+        n_offspring = len(population) - n_elite
+
+        profiler = self.profiler
+        with profiler.phase("selection"):
+            parents = self.selection(population, n_offspring + n_offspring % 2)
+
+        with profiler.phase("crossover"):
+            children = self.crossover(parents)
+
+        with profiler.phase("mutation"):
+            offspring = self.mutation(children, mutation_rate)[:n_offspring]
+
+        # The whole offspring batch is scored in one bulk evaluation
+        self.evaluate(offspring)
+
+        with profiler.phase("regeneration"):
+            return Population.concatenate([population[population.best(n_elite)], offspring])
+
+    def _unit_gains(self, gains):
+        """
+        Gains scaled to the unit cube, so the surrogate weighs every gain the same.
+        """
+        return (gains - self.ra) / (self.rb - self.ra)
+
+    def _entry_threshold(self, population, replaced):
+        """
+        Fitness a child must reach to stay in the population, for the screen: that of the least fit individual
+        surviving the replacement of the `replaced` least fit ones.
+        """
+        if self.screen is None or replaced >= len(population):
+            return None
+        return float(np.partition(population.fitness, replaced)[replaced])
+
     def termination(self, population):
         """
         Check if the termination condition is met.
 
         Parameters:
-        population (list): The current population.
+        population (Population): The current population.
 
         Returns:
         tuple: A tuple containing the best individual and a boolean indicating whether to continue or terminate.
         """
-        best, _ = self.selection(population)
+        best = population.individual(population.best(1)[0])
 
-        if best["fitness"] > self.target:
-            loop = False
-        else: 
-            loop = True
+        self._record_best(best["fitness"])
+        self.stop_reason = self._stop_reason(best["fitness"], self.generation + 1)
+        loop = self.stop_reason is None
 
         return best, loop
-    
-    def display_out(self, pop, generation):
+
+    def _checkpoint_meta(self):
         """
-        Display the optimization results for the current generation.
+        Description of the run a checkpoint belongs to, compared on resume.
+        """
+        return json.loads(json.dumps({"context": self._cache_context, "mode": self.mode,
+                                      "population_size": self.population_size}))
+
+    def save_checkpoint(self, population, path=None):
+        """
+        Save the population, RNG state, counters and history, replacing the previous checkpoint atomically.
 
         Parameters:
-        pop (dict): The best individual in the current generation.
-        generation (int): The current generation number.
+        population (Population): The current population.
+        path (str): Checkpoint file. Default is checkpoint_path.
+        """
+        path = path or self.checkpoint_path
+        history_scalars, history_arrays = self.history.state()
+        self.history.flush()
+        state = {
+            "run": self._checkpoint_meta(),
+            "rng": self.rng.bit_generator.state,
+            "generation": self.generation,
+            "evaluations": self.evaluations,
+            "unstable_skipped": self.unstable_skipped,
+            "best_fitness": self._best_fitness,
+            "stagnant": self._stagnant,
+            "elapsed": self.elapsed(),
+            "stop_reason": self.stop_reason,
+            "history": history_scalars,
+        }
+        arrays = {f"history_{name}": value for name, value in history_arrays.items()}
+        if self.surrogate is not None:
+            state["surrogate"], surrogate_arrays = self.surrogate.state()
+            arrays.update({f"surrogate_{name}": value for name, value in surrogate_arrays.items()})
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, state=json.dumps(state), bits=population.bits, gains=population.gains,
+                     fitness=population.fitness, **arrays)
+        os.replace(tmp_path, path)
+
+    def load_checkpoint(self, path=None):
         """
-        print("##### Optimizing PID using Genetic Algorithm #####")
-        print(f"* Generation: {generation}")
-        print(f"* KP        : {pop['gen'][0]}")
-        print(f"* KI        : {pop['gen'][1]}")
-        print(f"* KD        : {pop['gen'][2]}")
-        print(f"* Fitness   : {pop['fitness']}")
+        Restore the state saved by save_checkpoint.
 
+        Parameters:
+        path (str): Checkpoint file. Default is checkpoint_path.
+
+        Returns:
+        Population: The checkpointed population.
+        """
+        path = path or self.checkpoint_path
+        with np.load(path) as data:
+            state = json.loads(str(data["state"]))
+            if state["run"] != self._checkpoint_meta():
+                raise ValueError(f"Checkpoint {path} was saved by a run with a different plant or configuration")
+            population = Population(data["bits"], data["gains"], data["fitness"])
+            history_arrays = {name[len("history_"):]: data[name] for name in data.files if name.startswith("history_")}
+            surrogate_arrays = {name[len("surrogate_"):]: data[name] for name in data.files
+                                if name.startswith("surrogate_")}
+
+        self.rng.bit_generator.state = state["rng"]
+        self.generation = state["generation"]
+        self.evaluations = state["evaluations"]
+        self.unstable_skipped = state["unstable_skipped"]
+        self._best_fitness = state["best_fitness"]
+        self._stagnant = state["stagnant"]
+        self._elapsed = state["elapsed"]
+        self.history.restore(state["history"], history_arrays)
+        if self.surrogate is not None and "surrogate" in state:
+            self.surrogate.restore(state["surrogate"], surrogate_arrays)
+        return population
+    
     def get_PID(self, num, den, pop):
         """
         Get the PID parameters from the best individual and display the step response.
@@ -210,7 +537,6 @@ class GeneticAlgorithm:
         den (list): Denominator coefficients of the transfer function.
         pop (dict): The best individual containing the PID parameters.
         """
-        tf_sys = TransferFunction(num, den)
         best_gen_pid = pop["gen"]
         kp, ki, kd = best_gen_pid[0], best_gen_pid[1], best_gen_pid[2]
 
@@ -226,89 +552,109 @@ class GeneticAlgorithm:
         Returns:
         Any: The result of the optimization.
         """
-        population = self.create_population()
+        try:
+            best = self._run(mutation_rate)
+        finally:
+            self.close()
 
-        looping = True
-        generation = 0
+        if self.store is not None:
+            self.store.flush()
+        self.history.flush()
+        for observer in self.observers:
+            observer.on_finish(self, best)
 
-        while looping:
+        return self.get_PID(self.num, self.den, best)
 
-            parent1, parent2 = self.selection(population)
+    def _run(self, mutation_rate):
+        """
+        Evolve the population until the termination condition is met.
 
-            child1, child2 = self.crossover(parent1, parent2)
+        Parameters:
+        mutation_rate (float): The mutation rate.
 
-            mutation1 = self.mutation(child1, mutation_rate)
-            mutation2 = self.mutation(child2, mutation_rate)
+        Returns:
+        dict: The best individual.
+        """
+        profiler = self.profiler
+        observers = self.observers
+        with profiler.phase("init"):
+            if self.store is not None and self.precompute:
+                self.precomputed = self.precompute_store()
+
+            for observer in observers:
+                observer.on_start(self)
+            self._started = time.perf_counter()
+            if self.resume and self.checkpoint_path is not None and os.path.exists(self.checkpoint_path):
+                population = self.load_checkpoint()
+            else:
+                self._reset_run()
+                self.history.reset()
+                self._started = time.perf_counter()
+                population = self.create_population()
+                if self.surrogate is not None:
+                    self.surrogate.reset()
+                    self.surrogate.add(self._unit_gains(population.gains), population.fitness)
+
+        # A resumed run may already meet the target or exhaust the budgets given this time
+        if self.generation > 0:
+            best = population.individual(population.best(1)[0])
+            self.stop_reason = self._stop_reason(best["fitness"], self.generation)
+            if self.stop_reason is not None:
+                return best
 
-            fitness_mutation1, gen1 = evaluate_mutation_fitness(mutation1, self.num, self.den, self.n_var, self.n_bit, self.ra, self.rb)
-            fitness_mutation2, gen2 = evaluate_mutation_fitness(mutation2, self.num, self.den, self.n_var, self.n_bit, self.ra, self.rb)
+        looping = True
+        last_checkpoint = time.perf_counter()
 
-            mutation1["gen"] = gen1
-            mutation2["gen"] = gen2 
-            mutation1["fitness"] = fitness_mutation1
-            mutation2["fitness"] = fitness_mutation2
+        while looping:
+            start = time.perf_counter()
+            generation = self.generation
 
-            population = self.regeneration([mutation1, mutation2], population)
-            best, looping = self.termination(population)
-            self.display_out(best, generation)
+            if self.mode == "generational":
+                population = self.generational_step(population, mutation_rate)
+            else:
+                population = self.steady_state_step(population, mutation_rate)
+            with profiler.phase("termination"):
+                best, looping = self.termination(population)
 
-            # Store the generation and the parameters
-            self.kp_list.append(best["gen"][0])
-            self.ki_list.append(best["gen"][1])
-            self.kd_list.append(best["gen"][2])
-            self.fitness_list.append(best["fitness"])
+            with profiler.phase("report"):
+                self._report(generation, best)
 
-            generation += 1
+            self.generation += 1
+            if self.checkpoint_path is not None and (not looping or
+                                                     time.perf_counter() - last_checkpoint >= self.checkpoint_interval):
+                with profiler.phase("checkpoint"):
+                    self.save_checkpoint(population)
+                last_checkpoint = time.perf_counter()
 
-        return self.get_PID(self.num, self.den, best)
+            profiler.observe("generation_seconds", time.perf_counter() - start)
+            profiler.count("generations")
+
+        return best
 
     def plot_evolution(self):
         """
         Plot the evolution of the PID coefficients and fitness over generations
         and save each plot as a separate file in the results directory.
+
+        The plots are drawn from the downsampled history: the line follows the last value of each bucket
+        and the shaded band spans its minimum and maximum, so long runs plot as fast as short ones.
         """
         results_dir = '../results'
         if not os.path.exists(results_dir):
             os.makedirs(results_dir)
 
-        generations = range(len(self.kp_list))
-
-        # Plot Kp evolution
-        plt.figure()
-        plt.plot(generations, self.kp_list, label='Kp', color='r')
-        plt.xlabel('Generation')
-        plt.ylabel('Kp')
-        plt.title('Evolution of Kp')
-        plt.grid(True)
-        plt.savefig(os.path.join(results_dir, 'Kp_evolution.png'))
-        plt.close()
-
-        # Plot Ki evolution
-        plt.figure()
-        plt.plot(generations, self.ki_list, label='Ki', color='g')
-        plt.xlabel('Generation')
-        plt.ylabel('Ki')
-        plt.title('Evolution of Ki')
-        plt.grid(True)
-        plt.savefig(os.path.join(results_dir, 'Ki_evolution.png'))
-        plt.close()
-
-        # Plot Kd evolution
-        plt.figure()
-        plt.plot(generations, self.kd_list, label='Kd', color='b')
-        plt.xlabel('Generation')
-        plt.ylabel('Kd')
-        plt.title('Evolution of Kd')
-        plt.grid(True)
-        plt.savefig(os.path.join(results_dir, 'Kd_evolution.png'))
-        plt.close()
-
-        # Plot fitness evolution
-        plt.figure()
-        plt.plot(generations, self.fitness_list, label='Fitness', color='m')
-        plt.xlabel('Generation')
-        plt.ylabel('Fitness')
-        plt.title('Evolution of Fitness')
-        plt.grid(True)
-        plt.savefig(os.path.join(results_dir, 'Fitness_evolution.png'))
-        plt.close()
\ No newline at end of file
+        stream = self.history.downsampled()
+        generations = stream["generation"]
+
+        for column, (name, color) in enumerate([('Kp', 'r'), ('Ki', 'g'), ('Kd', 'b'), ('Fitness', 'm')]):
+            plt.figure()
+            plt.plot(generations, stream["last"][:, column], label=name, color=color)
+            if self.history.stride > 1:
+                plt.fill_between(generations, stream["min"][:, column], stream["max"][:, column],
+                                 color=color, alpha=0.2, linewidth=0)
+            plt.xlabel('Generation')
+            plt.ylabel(name)
+            plt.title(f'Evolution of {name}')
+            plt.grid(True)
+            plt.savefig(os.path.join(results_dir, f'{name}_evolution.png'))
+            plt.close()
@@ -0,0 +1,260 @@
+import glob
+import os
+
+import numpy as np
+
+
+class History:
+    """
+    Bounded record of the best Kp, Ki, Kd and fitness of every generation.
+
+    Rows are written into a preallocated NumPy chunk. When the chunk is full it is saved as a .npy file if
+    a directory was given, and reused. Alongside, every row is folded into a fixed number of buckets
+    holding the minimum, maximum and last value of each column: when the buckets run out, neighbours are
+    merged and each bucket covers twice as many generations. Memory is therefore bounded by chunk_size
+    and max_points whatever the number of generations, and plots drawn from the buckets cost the same
+    after a thousand or a million generations.
+
+    Attributes:
+    chunk_size (int): Number of rows per chunk.
+    max_points (int): Number of buckets of the downsampled stream.
+    directory (str): Directory receiving the full-resolution chunks, or None to keep only the current one.
+    stride (int): Number of generations per bucket.
+    """
+
+    COLUMNS = ("kp", "ki", "kd", "fitness")
+
+    def __init__(self, chunk_size=4096, max_points=2048, directory=None):
+        """
+        Initialize an empty history.
+
+        Parameters:
+        chunk_size (int): Number of rows per chunk. Default is 4096.
+        max_points (int): Number of buckets of the downsampled stream, rounded up to an even number.
+            Default is 2048.
+        directory (str): Directory receiving the full-resolution history as history_NNNNNN.npy chunks.
+            Default is None, to keep only the downsampled stream and the current chunk.
+        """
+        self.chunk_size = chunk_size
+        self.max_points = max_points + max_points % 2
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+        width = len(self.COLUMNS)
+        self._chunk = np.empty((chunk_size, width))
+        self._start = np.empty(self.max_points, dtype=np.int64)
+        self._counts = np.zeros(self.max_points, dtype=np.int64)
+        self._min = np.empty((self.max_points, width))
+        self._max = np.empty((self.max_points, width))
+        self._last = np.empty((self.max_points, width))
+        self._clear()
+
+    def _clear(self):
+        """
+        Empty the current chunk and the downsampled stream.
+        """
+        self._size = 0
+        self._chunks = 0
+        self.count = 0
+        self._buckets = 0
+        self.stride = 1
+
+    def reset(self):
+        """
+        Start a new history, deleting the chunk files of an earlier run from the directory so that load
+        and values never mix two runs. A resumed run restores its checkpointed history instead.
+        """
+        self._clear()
+        if self.directory is not None:
+            for path in glob.glob(os.path.join(self.directory, "history_*.npy")):
+                os.remove(path)
+
+    def __len__(self):
+        return self.count
+
+    def append(self, kp, ki, kd, fitness):
+        """
+        Record the best individual of one generation.
+
+        Parameters:
+        kp (float): Proportional gain.
+        ki (float): Integral gain.
+        kd (float): Derivative gain.
+        fitness (float): Fitness.
+        """
+        if self._size == self.chunk_size:
+            self._write()
+            self._chunks += 1
+            self._size = 0
+
+        row = self._chunk[self._size]
+        row[:] = (kp, ki, kd, fitness)
+        self._size += 1
+        self._fold(self.count, row)
+        self.count += 1
+
+    def _fold(self, generation, row):
+        """
+        Add one row to the downsampled stream.
+        """
+        b = self._buckets - 1
+        if b < 0 or self._counts[b] == self.stride:
+            if self._buckets == self.max_points:
+                self._merge()
+            b = self._buckets
+            self._buckets += 1
+            self._start[b] = generation
+            self._counts[b] = 0
+            self._min[b] = row
+            self._max[b] = row
+        else:
+            np.minimum(self._min[b], row, out=self._min[b])
+            np.maximum(self._max[b], row, out=self._max[b])
+        self._last[b] = row
+        self._counts[b] += 1
+
+    def _merge(self):
+        """
+        Merge neighbouring buckets, halving their number and doubling the stride.
+        """
+        n = self._buckets // 2
+        self._min[:n] = np.minimum(self._min[0:2 * n:2], self._min[1:2 * n:2])
+        self._max[:n] = np.maximum(self._max[0:2 * n:2], self._max[1:2 * n:2])
+        self._last[:n] = self._last[1:2 * n:2]
+        self._counts[:n] = self._counts[0:2 * n:2] + self._counts[1:2 * n:2]
+        self._start[:n] = self._start[0:2 * n:2]
+        self._buckets = n
+        self.stride *= 2
+
+    def _write(self):
+        """
+        Save the current chunk, partial or full, to its file in the history directory.
+        """
+        if self.directory is not None:
+            np.save(self._path(self._chunks), self._chunk[:self._size])
+
+    def _path(self, index):
+        return os.path.join(self.directory, f"history_{index:06d}.npy")
+
+    def flush(self):
+        """
+        Save the rows of the current chunk, so the directory holds the whole history. Does nothing
+        without a directory.
+        """
+        self._write()
+
+    @property
+    def complete(self):
+        """
+        bool: Whether values can return every generation, which takes a directory once the first chunk is full.
+        """
+        return self.directory is not None or not self._chunks
+
+    @property
+    def last(self):
+        """
+        dict: The row of the last generation, by column name, or None for an empty history.
+        """
+        if self.count == 0:
+            return None
+        return dict(zip(self.COLUMNS, self._chunk[self._size - 1].tolist()))
+
+    def values(self, column=None):
+        """
+        Full-resolution history, read back from the chunk files when older chunks were saved.
+
+        Parameters:
+        column (str): One of COLUMNS. Default is None, for every column.
+
+        Returns:
+        np.ndarray: (generations, 4) array, or (generations,) for a single column.
+        """
+        if not self.complete:
+            raise ValueError(f"Only the last chunk of {self.chunk_size} generations is kept; create the History "
+                             "with a directory to keep every generation, or use downsampled")
+        if not self._chunks:
+            rows = self._chunk[:self._size].copy()
+        else:
+            self.flush()
+            rows = np.concatenate([np.load(self._path(k), mmap_mode="r") for k in range(self._chunks + 1)])
+        return rows if column is None else rows[:, self.COLUMNS.index(column)]
+
+    def downsampled(self):
+        """
+        The downsampled stream, at most max_points buckets.
+
+        Returns:
+        dict: "generation", the last generation of each bucket, and "last", "min" and "max", the
+        (buckets, 4) last, minimum and maximum values of each column over the bucket.
+        """
+        n = self._buckets
+        return {
+            "generation": self._start[:n] + self._counts[:n] - 1,
+            "last": self._last[:n].copy(),
+            "min": self._min[:n].copy(),
+            "max": self._max[:n].copy(),
+        }
+
+    def save(self, path):
+        """
+        Save the downsampled stream as a compressed .npz file.
+
+        Parameters:
+        path (str): Output file.
+        """
+        np.savez_compressed(path, stride=self.stride, count=self.count, columns=np.array(self.COLUMNS),
+                            **self.downsampled())
+
+    def state(self):
+        """
+        Snapshot of the history for a checkpoint. Chunks already saved to the directory are not included.
+
+        Returns:
+        tuple: Dictionary of scalar fields and dictionary of arrays.
+        """
+        n = self._buckets
+        scalars = {"chunk_size": self.chunk_size, "max_points": self.max_points, "count": self.count,
+                   "chunks": self._chunks, "stride": self.stride}
+        arrays = {"chunk": self._chunk[:self._size].copy(), "start": self._start[:n].copy(),
+                  "counts": self._counts[:n].copy(), "min": self._min[:n].copy(), "max": self._max[:n].copy(),
+                  "last": self._last[:n].copy()}
+        return scalars, arrays
+
+    def restore(self, scalars, arrays):
+        """
+        Restore a snapshot taken by state. The chunk files it refers to must still be in the directory.
+
+        Parameters:
+        scalars (dict): Scalar fields of the snapshot.
+        arrays (dict): Arrays of the snapshot.
+        """
+        if scalars["chunk_size"] != self.chunk_size or scalars["max_points"] != self.max_points:
+            raise ValueError("The checkpointed history has a different chunk size or number of points")
+        self.count = scalars["count"]
+        self._chunks = scalars["chunks"]
+        self.stride = scalars["stride"]
+        self._size = len(arrays["chunk"])
+        self._chunk[:self._size] = arrays["chunk"]
+        n = self._buckets = len(arrays["start"])
+        self._start[:n] = arrays["start"]
+        self._counts[:n] = arrays["counts"]
+        self._min[:n] = arrays["min"]
+        self._max[:n] = arrays["max"]
+        self._last[:n] = arrays["last"]
+
+    @staticmethod
+    def load(directory):
+        """
+        Read the full-resolution history saved in a directory.
+
+        Parameters:
+        directory (str): The history directory.
+
+        Returns:
+        np.ndarray: (generations, 4) array of Kp, Ki, Kd and fitness.
+        """
+        files = sorted(glob.glob(os.path.join(directory, "history_*.npy")))
+        if not files:
+            return np.empty((0, len(History.COLUMNS)))
+        return np.concatenate([np.load(path, mmap_mode="r") for path in files])
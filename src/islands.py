@@ -0,0 +1,260 @@
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from genetic_algorithm import GeneticAlgorithm
+from population import Population
+from system_simulation import SystemDynamics
+from utils import decode_chromosomes
+
+TOPOLOGIES = ("ring", "full")
+
+# Columns of the per-island status table: best fitness, generations, evaluations, seconds, stop reason
+_STATUS = 5
+
+# Reasons for an island to stop on its own, coded in the last status column; 0 means it is still evolving
+_ISLAND_STOPS = (None, "target", "generations", "evaluations", "time", "stagnation")
+
+
+def _layout(n_islands, migrants, length):
+    """
+    Byte offsets of the arrays sharing one block of memory, each aligned on 8 bytes.
+    """
+    shapes = [("migrant_bits", (n_islands, migrants, length), np.uint8),
+              ("final_bits", (n_islands, length), np.uint8),
+              ("migrant_fitness", (n_islands, migrants), np.float64),
+              ("status", (n_islands, _STATUS), np.float64)]
+    layout, offset = [], 0
+    for name, shape, dtype in shapes:
+        layout.append((name, shape, dtype, offset))
+        offset += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8
+    return layout, offset
+
+
+def _buffers(shm, layout):
+    return {name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            for name, shape, dtype, offset in layout}
+
+
+def migration_sources(index, n_islands, topology):
+    """
+    Islands sending their migrants to an island.
+
+    Parameters:
+    index (int): The receiving island.
+    n_islands (int): Number of islands.
+    topology (str): "ring", where island i receives from island i - 1, or "full", where every island
+        receives from every other one.
+
+    Returns:
+    list: Indices of the sending islands.
+    """
+    if n_islands == 1:
+        return []
+    if topology == "ring":
+        return [(index - 1) % n_islands]
+    if topology == "full":
+        return [j for j in range(n_islands) if j != index]
+    raise ValueError(f"Unknown topology: {topology}. Choose from {TOPOLOGIES}")
+
+
+def _island(index, settings, shm, layout, barrier):
+    """
+    Evolve one island, exchanging migrants with the others at every migration point.
+    """
+    buffers = _buffers(shm, layout)
+    try:
+        _evolve_island(index, settings, buffers, barrier)
+    except BaseException:
+        buffers["status"][index] = np.nan
+        barrier.abort()
+        raise
+    finally:
+        del buffers
+
+
+def _evolve_island(index, settings, buffers, barrier):
+    start = time.perf_counter()
+    n_islands = settings["n_islands"]
+    migrants = settings["migrants"]
+    seed = settings["seed"]
+    ga = GeneticAlgorithm(SystemDynamics(settings["num"], settings["den"]), settings["n_var"], settings["n_bit"],
+                          settings["ra"], settings["rb"], settings["population_size"], settings["minimum_target"],
+                          seed=None if seed is None else seed + index, observers=[], **settings["options"])
+    step = ga.generational_step if ga.mode == "generational" else ga.steady_state_step
+    sources = migration_sources(index, n_islands, settings["topology"])
+    status = buffers["status"]
+
+    population = ga.create_population()
+    generations = 0
+    while True:
+        # An island whose own budgets ran out only takes part in the migrations until the others stop
+        for _ in range(settings["migration_interval"] if ga.stop_reason is None else 0):
+            population = step(population, settings["mutation_rate"])
+            _, looping = ga.termination(population)
+            generations += 1
+            if not looping or generations == settings["max_generations"]:
+                break
+
+        # Publish the best individuals, then decide together whether to stop
+        top = population.best(migrants)
+        buffers["migrant_bits"][index] = population.bits[top]
+        buffers["migrant_fitness"][index] = population.fitness[top]
+        status[index] = (population.fitness[top[0]], generations, ga.evaluations, time.perf_counter() - start,
+                         _ISLAND_STOPS.index(ga.stop_reason))
+        barrier.wait()
+
+        if _stop_reason(status, settings) is not None:
+            buffers["final_bits"][index] = population.bits[top[0]]
+            return
+
+        bits = buffers["migrant_bits"][sources].reshape(-1, population.bits.shape[1]).copy()
+        fitness = buffers["migrant_fitness"][sources].ravel().copy()
+        barrier.wait()      # every island has read its migrants before they are overwritten
+
+        # The fittest immigrants replace the least fit residents, keeping at least half of the population
+        order = np.argsort(-fitness, kind="stable")[:len(population) // 2]
+        immigrants = Population(bits[order], decode_chromosomes(bits[order], ga.n_var, ga.n_bit, ga.ra, ga.rb),
+                                fitness[order])
+        population[population.worst(len(immigrants))] = immigrants
+
+
+def _stop_reason(status, settings):
+    """
+    Stop criterion shared by every island, computed from the status table.
+    """
+    if status[:, 0].max() > settings["minimum_target"]:
+        return "target"
+    if settings["max_generations"] is not None and status[:, 1].max() >= settings["max_generations"]:
+        return "generations"
+    if settings["max_seconds"] is not None and status[:, 3].max() >= settings["max_seconds"]:
+        return "time"
+    # Budgets given through the GeneticAlgorithm options apply to each island
+    if status[:, 4].all():
+        return _ISLAND_STOPS[int(status[int(np.argmax(status[:, 0])), 4])]
+    return None
+
+
+class IslandModel:
+    """
+    Island model Genetic Algorithm: several populations evolve in separate processes and periodically
+    send their fittest individuals to their neighbours.
+
+    Every island is a GeneticAlgorithm seeded with seed + island index. After each migration interval the
+    islands publish their fittest chromosomes and best fitness in a shared memory block and meet at a
+    barrier; they then stop together if any island reached the target or a budget ran out, or else copy
+    the migrants of their neighbours over their least fit individuals. Because islands only interact at
+    the barriers, a run is reproducible for a given seed whatever the process scheduling.
+
+    Attributes:
+    n_islands (int): Number of islands and processes.
+    topology (str): "ring" or "full".
+    migration_interval (int): Generations between two migrations.
+    migrants (int): Individuals sent by each island at every migration.
+    stop_reason (str): Why the last run stopped: "target", "generations" or "time", or the reason of the
+        fittest island when every island ran out of the budgets given through ga_options.
+    seconds (float): Wall time of the last run.
+    islands (list): Best fitness, generations, evaluations, seconds and own stop reason of each island in the
+        last run.
+    """
+
+    def __init__(self, system, n_islands, n_var, n_bit, ra, rb, population_size, minimum_target=75,
+                 migration_interval=20, migrants=2, topology="ring", seed=None, max_generations=None,
+                 max_seconds=None, **ga_options):
+        """
+        Parameters:
+        system (SystemDynamics): The system to be controlled.
+        n_islands (int): Number of islands, each evolved in its own process.
+        n_var (int): Number of variables (genes).
+        n_bit (int): Number of bits per variable.
+        ra (float): The lower bound of the range.
+        rb (float): The upper bound of the range.
+        population_size (int): Size of the population of each island.
+        minimum_target (float): Minimum fitness target for termination. Default is 75.
+        migration_interval (int): Generations between two migrations. Default is 20.
+        migrants (int): Individuals sent by each island at every migration. Default is 2.
+        topology (str): "ring" sends migrants to the next island, "full" to every other island. Default is "ring".
+        seed (int): Seed of island 0; island i uses seed + i. Default is None.
+        max_generations (int): Stop once an island has evolved this many generations. Default is None.
+        max_seconds (float): Stop at the first migration point after this many seconds. Default is None.
+        **ga_options: Further GeneticAlgorithm arguments, such as mode or fitness_backend, used by every island.
+            Budgets such as max_evaluations or stagnation apply to each island: an island that runs out of
+            them stops evolving, and the run stops once every island has.
+        """
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"Unknown topology: {topology}. Choose from {TOPOLOGIES}")
+        if not 0 < migrants <= population_size:
+            raise ValueError("migrants must be between 1 and the population size")
+        self.num = system.num.tolist()
+        self.den = system.den.tolist()
+        self.n_islands = n_islands
+        self.n_var = n_var
+        self.n_bit = n_bit
+        self.ra = ra
+        self.rb = rb
+        self.population_size = population_size
+        self.target = minimum_target
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.topology = topology
+        self.seed = seed
+        self.max_generations = max_generations
+        self.max_seconds = max_seconds
+        self.ga_options = ga_options
+        self.stop_reason = None
+        self.seconds = None
+        self.islands = []
+
+    def __call__(self, mutation_rate=0.5):
+        """
+        Evolve the islands until one of them reaches the target or a budget runs out.
+
+        Parameters:
+        mutation_rate (float): The mutation rate. Default is 0.5.
+
+        Returns:
+        tuple: Kp, Ki and Kd of the fittest individual over all islands.
+        """
+        settings = {
+            "num": self.num, "den": self.den, "n_var": self.n_var, "n_bit": self.n_bit, "ra": self.ra,
+            "rb": self.rb, "population_size": self.population_size, "minimum_target": self.target,
+            "n_islands": self.n_islands, "migrants": self.migrants, "topology": self.topology,
+            "migration_interval": self.migration_interval, "max_generations": self.max_generations,
+            "max_seconds": self.max_seconds, "seed": self.seed, "mutation_rate": mutation_rate,
+            "options": self.ga_options,
+        }
+        layout, size = _layout(self.n_islands, self.migrants, self.n_var * self.n_bit)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        start = time.perf_counter()
+        try:
+            barrier = multiprocessing.Barrier(self.n_islands)
+            processes = [multiprocessing.Process(target=_island, args=(i, settings, shm, layout, barrier))
+                         for i in range(self.n_islands)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            self.seconds = time.perf_counter() - start
+
+            buffers = _buffers(shm, layout)
+            status = buffers["status"].copy()
+            final_bits = buffers["final_bits"].copy()
+            del buffers
+        finally:
+            shm.close()
+            shm.unlink()
+
+        failed = [i for i, process in enumerate(processes) if process.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"Islands {failed} failed")
+
+        self.stop_reason = _stop_reason(status, settings)
+        self.islands = [{"fitness": float(f), "generations": int(g), "evaluations": int(e), "seconds": float(s),
+                         "stop_reason": _ISLAND_STOPS[int(r)]} for f, g, e, s, r in status]
+        best = int(np.argmax(status[:, 0]))
+        gains = decode_chromosomes(final_bits[best:best + 1], self.n_var, self.n_bit, self.ra, self.rb)[0]
+        self.best = {"gen": gains.tolist(), "fitness": float(status[best, 0]),
+                     "chromosome": final_bits[best].tolist(), "island": best}
+        return tuple(self.best["gen"])
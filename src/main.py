@@ -25,12 +25,11 @@ def compare_tuning():
     pid_ga = PIDController(kp_ga, ki_ga, kd_ga)
 
     # Ziegler-Nichols Tuning
-    kpu = 224  # Ultimate gain, obtained via Root Locus Calculation (Steady state oscilations)
-    kp_zn, ki_zn, kd_zn = ziegler_nichols_tuning(system, kpu)
+    kp_zn, ki_zn, kd_zn = ziegler_nichols_tuning(system)  # Ultimate gain and period found from the plant
     pid_zn = PIDController(kp_zn, ki_zn, kd_zn)
 
     # Get the step responses
-    t_ga, y_ga = plot_PID(system, pid_ga, 'GAresults.txt')
+    t_ga, y_ga = plot_PID(system, pid_ga, 'GAresults.txt', ga_tuner.analysis)  # already simulated by the report
     t_zn, y_zn = plot_PID(system, pid_zn, 'ZNresults.txt')
 
     # Plot results
@@ -0,0 +1,269 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Points of the standard frequency grid, and decades it extends beyond the slowest and fastest plant roots.
+# The margin leaves room above the plant for the crossovers pushed up by the derivative gain
+FREQUENCY_POINTS = 800
+FREQUENCY_DECADES = 3
+
+# Points and passes of the local refinement of the sensitivity peak, and bisection steps refining a crossover
+REFINE_POINTS = 32
+REFINE_PASSES = 2
+CROSSING_ITERATIONS = 30
+
+# Margin settings accepted in the fitness options
+MARGIN_OPTIONS = ("min_gain_margin", "min_phase_margin", "max_sensitivity", "margin_penalty")
+
+
+def frequency_grid(num, den):
+    """
+    Logarithmic grid spanning the plant poles and zeros with FREQUENCY_DECADES to spare on both sides.
+
+    Parameters:
+    num (array): Numerator coefficients of the plant, highest power first.
+    den (array): Denominator coefficients of the plant, highest power first.
+
+    Returns:
+    np.ndarray: FREQUENCY_POINTS frequencies in rad/s.
+    """
+    roots = np.abs(np.concatenate([np.roots(num), np.roots(den)]))
+    roots = roots[roots > 1e-12]
+    low, high = (roots.min(), roots.max()) if roots.size else (1.0, 1.0)
+    return np.logspace(np.log10(low) - FREQUENCY_DECADES, np.log10(high) + FREQUENCY_DECADES, FREQUENCY_POINTS)
+
+
+@lru_cache(maxsize=64)
+def plant_response(num, den):
+    """
+    Standard frequency grid of a plant and its frequency response, computed once per plant.
+
+    Parameters:
+    num (tuple): Numerator coefficients of the plant, highest power first.
+    den (tuple): Denominator coefficients of the plant, highest power first.
+
+    Returns:
+    tuple: Frequencies in rad/s and the complex G(jw) at each of them, both read-only.
+    """
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    omega = frequency_grid(num, den)
+    s = 1j * omega
+    response = np.polyval(num, s) / np.polyval(den, s)
+    omega.flags.writeable = False
+    response.flags.writeable = False
+    return omega, response
+
+
+def loop_response(frequencies, response, gains):
+    """
+    Open-loop frequency response L = G C of a plant with a batch of PID controllers.
+
+    Parameters:
+    frequencies (np.ndarray): (F,) frequencies in rad/s.
+    response (np.ndarray): (F,) plant frequency response G(jw).
+    gains (array): (N, 3) array of Kp, Ki, Kd values.
+
+    Returns:
+    np.ndarray: (N, F) complex L(jw).
+    """
+    gains = np.atleast_2d(np.asarray(gains, dtype=float))
+    s = 1j * np.asarray(frequencies, dtype=float)
+    pid = gains[:, [0]] + gains[:, [1]] / s + gains[:, [2]] * s
+    return pid * response
+
+
+def _crossings(value):
+    """
+    Rows, left grid indices and interpolation fractions of the sign changes of value along its last axis.
+    """
+    rows, index = np.nonzero(np.signbit(value[:, :-1]) != np.signbit(value[:, 1:]))
+    left = value[rows, index]
+    right = value[rows, index + 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(left != right, left / (left - right), 0.0)
+    return rows, index, fraction
+
+
+def _loop_at(omega, gains, num, den):
+    """
+    Loop response of each PID controller at its own frequencies, omega having one row per controller.
+    """
+    s = 1j * omega
+    kp, ki, kd = (gains[:, i].reshape((-1,) + (1,) * (s.ndim - 1)) for i in range(3))
+    return (kp + ki / s + kd * s) * np.polyval(num, s) / np.polyval(den, s)
+
+
+def _refine_crossings(frequencies, rows, index, gains, num, den, measure):
+    """
+    Loop response at the sign changes of measure(L) found between grid points, located by bisection in log
+    frequency on the exact plant response.
+    """
+    gains = gains[rows]
+    low = np.log(frequencies[index])
+    high = np.log(frequencies[index + 1])
+    value_low = measure(_loop_at(np.exp(low), gains, num, den))
+    for _ in range(CROSSING_ITERATIONS):
+        middle = 0.5 * (low + high)
+        value = measure(_loop_at(np.exp(middle), gains, num, den))
+        left = np.signbit(value) == np.signbit(value_low)
+        low = np.where(left, middle, low)
+        value_low = np.where(left, value, value_low)
+        high = np.where(left, high, middle)
+    return _loop_at(np.exp(0.5 * (low + high)), gains, num, den)
+
+
+def _refine_peak(frequencies, magnitude, gains, num, den):
+    """
+    Refine the peak of |S| of each loop by resampling the plant around its largest grid value.
+
+    Each pass samples REFINE_POINTS frequencies between the grid neighbours of the current peak, so the
+    bracket shrinks by a factor of about REFINE_POINTS / 2 per pass.
+    """
+    rows = np.arange(len(magnitude))
+    peak = magnitude.argmax(axis=1)
+    best = magnitude[rows, peak]
+    low = frequencies[np.maximum(peak - 1, 0)]
+    high = frequencies[np.minimum(peak + 1, len(frequencies) - 1)]
+    for _ in range(REFINE_PASSES):
+        omega = np.exp(np.linspace(np.log(low), np.log(high), REFINE_POINTS, axis=1))
+        values = 1 / np.abs(1 + _loop_at(omega, gains, num, den))
+        peak = np.nan_to_num(values, nan=-np.inf).argmax(axis=1)
+        best = np.fmax(best, values[rows, peak])
+        low = omega[rows, np.maximum(peak - 1, 0)]
+        high = omega[rows, np.minimum(peak + 1, REFINE_POINTS - 1)]
+    return best
+
+
+def _high_frequency_sensitivity(gains, num, den):
+    """
+    Limit of |S| as the frequency grows: 1 when the loop is strictly proper, 1 / |1 + L(inf)| when it is
+    biproper, and 0 when the derivative gain makes it improper.
+    """
+    num = np.trim_zeros(np.asarray(num, dtype=float), "f")
+    den = np.trim_zeros(np.asarray(den, dtype=float), "f")
+    derivative = gains[:, 2] != 0
+    # Relative degree of L = G C, the derivative term raising the controller degree by one
+    relative = len(den) - len(num) - derivative
+    direct = np.where(derivative, gains[:, 2], gains[:, 0]) * num[0] / den[0]
+    with np.errstate(divide="ignore"):
+        return np.select([relative > 0, relative == 0], [1.0, 1 / np.abs(1 + direct)], 0.0)
+
+
+def loop_margins(frequencies, response, gains, num=None, den=None):
+    """
+    Gain margin, phase margin and peak sensitivity of a batch of PID loops, from the plant frequency response.
+
+    The loop response of every controller is one element-wise product with the cached plant response, so the
+    whole batch takes a few array operations. The crossovers are located between grid points, by bisection on
+    the plant response when its coefficients are given, or else by interpolation.
+
+    Where the phase crosses -180 degrees more than once, the gain margin is the one closest to 1 in log scale,
+    like control.stability_margins: on a conditionally stable loop it may be below 1, the factor by which
+    lowering the gain destabilizes the loop. Where the gain crosses 1 more than once the smallest phase margin
+    is kept. Margins without a crossover on the grid are infinite.
+
+    The peak sensitivity is at least the limit of |S| at high frequency, 1 for strictly proper loops. Given the
+    plant coefficients, that limit is exact for every loop and the peak found on the grid is refined by
+    resampling the plant around it; without them the limit is taken as 1, and a sharp resonance between grid
+    points can be underestimated. The grid extends FREQUENCY_DECADES beyond the plant roots, so crossovers
+    pushed further out by very large gains are missed.
+
+    Parameters:
+    frequencies (np.ndarray): (F,) frequencies in rad/s, for example SystemDynamics.frequencies.
+    response (np.ndarray): (F,) plant frequency response, for example SystemDynamics.response.
+    gains (array): (N, 3) array of Kp, Ki, Kd values.
+    num (array): Numerator coefficients of the plant, to refine the crossovers and the sensitivity peak.
+        Default is None.
+    den (array): Denominator coefficients of the plant. Default is None.
+
+    Returns:
+    tuple: (N,) gain margins (as a ratio), phase margins (in degrees) and peak sensitivities Ms.
+    """
+    gains = np.atleast_2d(np.asarray(gains, dtype=float))
+    loop = loop_response(frequencies, response, gains)
+    n_pop = len(loop)
+    gain_margin = np.full(n_pop, np.inf)
+    phase_margin = np.full(n_pop, np.inf)
+
+    refine = num is not None and den is not None
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        magnitude = 1 / np.abs(1 + loop)
+        if refine and n_pop:
+            sensitivity = np.fmax(_refine_peak(frequencies, magnitude, gains, num, den),
+                                  _high_frequency_sensitivity(gains, num, den))
+        else:
+            sensitivity = np.fmax(np.max(magnitude, axis=1, initial=0.0), 1.0)
+
+        # Gain crossovers: |L| crosses 1, interpolated in log magnitude
+        rows, index, fraction = _crossings(np.log(np.abs(loop)))
+        if refine:
+            crossing = _refine_crossings(frequencies, rows, index, gains, num, den, lambda l: np.log(np.abs(l)))
+        else:
+            crossing = loop[rows, index] + fraction * (loop[rows, index + 1] - loop[rows, index])
+        np.minimum.at(phase_margin, rows, 180 - np.degrees(np.abs(np.angle(crossing))))
+        np.maximum.at(sensitivity, rows, 1 / np.abs(1 + crossing))
+
+        # Phase crossovers: L crosses the negative real axis
+        rows, index, fraction = _crossings(loop.imag)
+        if refine:
+            real = _refine_crossings(frequencies, rows, index, gains, num, den, np.imag).real
+        else:
+            real = loop.real[rows, index] + fraction * (loop.real[rows, index + 1] - loop.real[rows, index])
+        negative = real < 0
+        rows, margins = rows[negative], 1 / -real[negative]
+        distance = np.abs(np.log(margins))
+        closest = np.full(n_pop, np.inf)
+        np.minimum.at(closest, rows, distance)
+        chosen = distance == closest[rows]
+        gain_margin[rows[chosen]] = margins[chosen]
+        # A sharp resonance can fall between grid points, but the interpolated crossovers still bound its peak
+        np.maximum.at(sensitivity, rows, 1 / np.abs(1 - 1 / margins))
+
+    return gain_margin, phase_margin, sensitivity
+
+
+def margin_violation(gain_margin, phase_margin, sensitivity, min_gain_margin=None, min_phase_margin=None,
+                     max_sensitivity=None):
+    """
+    Relative shortfall of each loop against the margin limits, 0 where every limit is met.
+
+    Returns:
+    np.ndarray: Sum over the given limits of 1 - gm / min_gain_margin, 1 - pm / min_phase_margin and
+    ms / max_sensitivity - 1, each counted only when positive.
+    """
+    violation = np.zeros(len(sensitivity))
+    if min_gain_margin is not None:
+        violation += np.maximum(1 - gain_margin / min_gain_margin, 0)
+    if min_phase_margin is not None:
+        violation += np.maximum(1 - phase_margin / min_phase_margin, 0)
+    if max_sensitivity is not None:
+        violation += np.maximum(sensitivity / max_sensitivity - 1, 0)
+    return np.nan_to_num(violation, nan=np.inf)
+
+
+def margin_options(constraints):
+    """
+    Fitness options enforcing frequency domain margins.
+
+    Parameters:
+    constraints (dict): Any of min_gain_margin (ratio), min_phase_margin (degrees), max_sensitivity (Ms),
+        and margin_penalty. Without margin_penalty the limits are hard constraints: violating candidates get
+        UNSTABLE_FITNESS without simulation. With it, their fitness is divided by
+        1 + margin_penalty * violation, see margin_violation. margin_penalty alone is an error.
+
+    Returns:
+    dict: Keyword arguments for evaluate_population, empty without constraints.
+    """
+    if not constraints:
+        return {}
+    unknown = set(constraints) - set(MARGIN_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown margin settings: {sorted(unknown)}. Choose from {MARGIN_OPTIONS}")
+    options = {key: float(value) for key, value in constraints.items() if value is not None}
+    if any(value <= 0 for value in options.values()):
+        raise ValueError("Margin settings must be positive")
+    if "margin_penalty" in options and len(options) == 1:
+        raise ValueError("margin_penalty needs at least one of min_gain_margin, min_phase_margin or "
+                         "max_sensitivity")
+    return options
@@ -0,0 +1,155 @@
+import numpy as np
+
+
+def fittest_selection(population, n, rng=None):
+    """
+    Select the n fittest individuals, fittest first.
+
+    Parameters:
+    population (Population): The current population.
+    n (int): Number of parents to select.
+    rng (np.random.Generator): Unused, for a uniform operator signature.
+
+    Returns:
+    np.ndarray: Indices of the selected parents.
+    """
+    return population.best(n)
+
+
+def tournament_selection(population, n, rng, size=2):
+    """
+    Select n parents, each the winner of a tournament between randomly drawn individuals.
+
+    Parameters:
+    population (Population): The current population.
+    n (int): Number of parents to select.
+    rng (np.random.Generator): Random number generator.
+    size (int): Number of individuals per tournament. Default is 2.
+
+    Returns:
+    np.ndarray: Indices of the selected parents.
+    """
+    contestants = rng.integers(0, len(population), size=(n, size))
+    winners = np.argmax(population.fitness[contestants], axis=1)
+    return contestants[np.arange(n), winners]
+
+
+def roulette_selection(population, n, rng):
+    """
+    Select n parents with probability proportional to their fitness.
+
+    Parameters:
+    population (Population): The current population.
+    n (int): Number of parents to select.
+    rng (np.random.Generator): Random number generator.
+
+    Returns:
+    np.ndarray: Indices of the selected parents.
+    """
+    weights = np.clip(np.nan_to_num(population.fitness), 0, None)
+    total = weights.sum()
+    p = weights / total if total > 0 else None
+    return rng.choice(len(population), size=n, p=p)
+
+
+def point_crossover(bits, rng=None, point=None):
+    """
+    Single point crossover of consecutive pairs of chromosomes.
+
+    Rows 2i and 2i + 1 are the parents of children 2i and 2i + 1. Each child keeps its own parent's
+    bits after the crossover point and takes the other parent's bits before it.
+
+    Parameters:
+    bits (array): (2M, L) matrix of parent chromosomes.
+    rng (np.random.Generator): Unused, for a uniform operator signature.
+    point (int): Crossover point. Default is the middle of the chromosome.
+
+    Returns:
+    np.ndarray: (2M, L) matrix of children chromosomes.
+    """
+    length = bits.shape[1]
+    point = length // 2 if point is None else point
+    children = bits.copy()
+    children[0::2, :point] = bits[1::2, :point]
+    children[1::2, :point] = bits[0::2, :point]
+    return children
+
+
+def uniform_crossover(bits, rng):
+    """
+    Uniform crossover of consecutive pairs of chromosomes.
+
+    Each bit of child 2i comes from either parent with equal probability, and child 2i + 1 gets the bit
+    from the other parent.
+
+    Parameters:
+    bits (array): (2M, L) matrix of parent chromosomes.
+    rng (np.random.Generator): Random number generator.
+
+    Returns:
+    np.ndarray: (2M, L) matrix of children chromosomes.
+    """
+    first, second = bits[0::2], bits[1::2]
+    swap = rng.random(first.shape) < 0.5
+    children = np.empty_like(bits)
+    children[0::2] = np.where(swap, second, first)
+    children[1::2] = np.where(swap, first, second)
+    return children
+
+
+def k_point_crossover(bits, rng, k=2):
+    """
+    K point crossover of consecutive pairs of chromosomes.
+
+    Every pair gets its own k distinct random cut points, and the children swap parents on every
+    other segment between them.
+
+    Parameters:
+    bits (array): (2M, L) matrix of parent chromosomes.
+    rng (np.random.Generator): Random number generator.
+    k (int): Number of crossover points. Default is 2.
+
+    Returns:
+    np.ndarray: (2M, L) matrix of children chromosomes.
+    """
+    first, second = bits[0::2], bits[1::2]
+    pairs, length = first.shape
+    k = min(k, length - 1)
+    cuts = np.argsort(rng.random((pairs, length - 1)), axis=1)[:, :k] + 1
+
+    toggles = np.zeros((pairs, length), dtype=np.int8)
+    np.add.at(toggles, (np.arange(pairs)[:, None], cuts), 1)
+    swap = np.cumsum(toggles, axis=1) % 2 == 1
+
+    children = np.empty_like(bits)
+    children[0::2] = np.where(swap, second, first)
+    children[1::2] = np.where(swap, first, second)
+    return children
+
+
+def flip_mutation(bits, mutation_rate, rng):
+    """
+    Flip each bit of a chromosome matrix independently with the given probability.
+
+    Parameters:
+    bits (array): (N, L) matrix of chromosomes.
+    mutation_rate (float): Probability of flipping each bit.
+    rng (np.random.Generator): Random number generator.
+
+    Returns:
+    np.ndarray: (N, L) matrix of mutated chromosomes.
+    """
+    return bits ^ (rng.random(bits.shape) < mutation_rate).astype(np.uint8)
+
+
+SELECTIONS = {
+    "fittest": fittest_selection,
+    "tournament": tournament_selection,
+    "roulette": roulette_selection,
+}
+
+CROSSOVERS = {
+    "midpoint": point_crossover,
+    "uniform": uniform_crossover,
+    "k_point": k_point_crossover,
+}
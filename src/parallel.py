@@ -0,0 +1,98 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from calc_fitness import evaluate_population
+
+# Plant installed in each worker process by _init_worker
+_worker_plant = None
+
+
+def _init_worker(num, den, fitness_options):
+    """
+    Store the plant in the worker process once, so tasks only carry gains.
+    """
+    global _worker_plant
+    _worker_plant = (num, den, fitness_options)
+
+
+def _evaluate_chunk(gains):
+    """
+    Evaluate one chunk of gains against the plant installed by _init_worker.
+    """
+    num, den, fitness_options = _worker_plant
+    return evaluate_population(num, den, gains, **fitness_options)
+
+
+class ParallelEvaluator:
+    """
+    Evaluate populations of PID gains on a pool of worker processes.
+
+    The plant is sent to each worker once when the pool starts. Batches are split into contiguous
+    chunks and reassembled in order, and every candidate is scored independently of its chunk, so the
+    result is identical for any number of workers.
+
+    Attributes:
+    num (list): Numerator coefficients of the system transfer function.
+    den (list): Denominator coefficients of the system transfer function.
+    workers (int): Number of worker processes.
+    chunk_size (int): Number of candidates per submitted task, or None to size chunks automatically.
+    fitness_options (dict): Keyword arguments passed to evaluate_population.
+    """
+
+    def __init__(self, num, den, workers=None, chunk_size=None, **fitness_options):
+        """
+        Initialize the evaluator. The pool itself is started on first use.
+
+        Parameters:
+        num (list): Numerator coefficients of the system transfer function.
+        den (list): Denominator coefficients of the system transfer function.
+        workers (int): Number of worker processes. Default is the number of CPUs.
+        chunk_size (int): Number of candidates per submitted task. Default splits each batch into
+            four chunks per worker.
+        **fitness_options: Keyword arguments passed to evaluate_population, such as backend.
+        """
+        self.num = np.asarray(num, dtype=float)
+        self.den = np.asarray(den, dtype=float)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.fitness_options = fitness_options
+        self._pool = None
+
+    def _chunks(self, n):
+        size = self.chunk_size or max(1, -(-n // (4 * self.workers)))
+        return [slice(start, start + size) for start in range(0, n, size)]
+
+    def __call__(self, gains_matrix):
+        """
+        Evaluate a batch of PID gains.
+
+        Parameters:
+        gains_matrix (array): (N, 3) array of Kp, Ki, Kd values.
+
+        Returns:
+        np.ndarray: (N,) array of fitness values.
+        """
+        gains = np.atleast_2d(np.asarray(gains_matrix, dtype=float))
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self.num, self.den, self.fitness_options))
+
+        chunks = [gains[sl] for sl in self._chunks(len(gains))]
+        results = list(self._pool.map(_evaluate_chunk, chunks))
+        return np.concatenate(results) if results else np.zeros(0)
+
+    def close(self):
+        """
+        Shut down the worker processes.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
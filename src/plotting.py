@@ -1,10 +1,9 @@
 import os
 from matplotlib import pyplot as plt
-from control import TransferFunction
 import numpy as np
-import control
+from step_analysis import StepAnalysis
 
-def plot_PID(sis, pid, filename='pid_results.txt'):
+def plot_PID(sis, pid, filename='pid_results.txt', analysis=None):
     """
     Get the PID parameters from the best individual and display the step response.
 
@@ -12,6 +11,11 @@ def plot_PID(sis, pid, filename='pid_results.txt'):
     sis (SystemDynamics): The system dynamics object.
     pid (PIDController): The PID controller object.
     filename (str): The name of the file to save the results.
+    analysis (StepAnalysis): Step response of this controller already simulated, for example the
+        analysis of a tuner. Default is None, to simulate the loop.
+
+    Returns:
+    tuple: Time and output arrays of the step response.
     """
     # Ensure the results directory exists
     results_dir = '../results'
@@ -21,24 +25,21 @@ def plot_PID(sis, pid, filename='pid_results.txt'):
     # Full file path
     filepath = os.path.join(results_dir, filename)
     
-    tf_sys = sis.system
     kp, ki, kd = pid.kp, pid.ki, pid.kd
+    if analysis is None:
+        analysis = StepAnalysis.simulate(sis.closed_loop(kp, ki, kd))
 
-    tf_pid = pid.create_transfer_function()
-
-    tf_mul = tf_sys * tf_pid
-    tf_sys_pid = tf_mul.feedback()
-     
-    result = control.step_info(tf_sys_pid)
-    
     output = [
         "### Best of PID Parameters ###",
         f"---> KP: {kp} - KI: {ki} - KD: {kd} <---",
         "@@ Result:",
-        f"* Rise Time         : {result['RiseTime']}",
-        f"* Overshoot         : {result['Overshoot']}",
-        f"* SettlingTime      : {result['SettlingTime']}",
-        f"* SteadyState       : {result['SteadyStateValue']}"
+        f"* Rise Time         : {analysis.rise_time}",
+        f"* Overshoot         : {analysis.overshoot}",
+        f"* SettlingTime      : {analysis.settling_time}",
+        f"* SteadyState       : {analysis.steady_state}",
+        f"* IAE               : {analysis.iae}",
+        f"* ISE               : {analysis.ise}",
+        f"* ITAE              : {analysis.itae}"
     ]
     
     with open(filepath, 'w') as f:
@@ -48,5 +49,4 @@ def plot_PID(sis, pid, filename='pid_results.txt'):
     for line in output:
         print(line)
 
-    t, y = control.step_response(tf_sys_pid)
-    return t, y
\ No newline at end of file
+    return analysis.t, analysis.y
\ No newline at end of file
@@ -0,0 +1,224 @@
+import heapq
+
+import numpy as np
+
+from utils import generate_chromosomes, decode_chromosomes, pack_chromosomes
+
+
+class Population:
+    """
+    Array-backed population of binary encoded PID controllers.
+
+    Row i of every array describes individual i, so genetic operators work on the whole population
+    at once instead of looping over individuals and bits.
+
+    Attributes:
+    bits (np.ndarray): (N, n_var * n_bit) uint8 matrix of chromosomes.
+    gains (np.ndarray): (N, n_var) matrix of decoded genes.
+    fitness (np.ndarray): (N,) fitness values, NaN until evaluated.
+    """
+
+    def __init__(self, bits, gains, fitness=None):
+        """
+        Initialize the population from its arrays.
+
+        Parameters:
+        bits (array): (N, n_var * n_bit) matrix of chromosomes.
+        gains (array): (N, n_var) matrix of decoded genes.
+        fitness (array): (N,) fitness values. Default is NaN for every individual.
+        """
+        self.bits = np.asarray(bits, dtype=np.uint8)
+        self.gains = np.asarray(gains, dtype=float)
+        self.fitness = np.full(len(self.bits), np.nan) if fitness is None else np.asarray(fitness, dtype=float)
+        self._ranking = None
+
+    @classmethod
+    def random(cls, size, n_var, n_bit, ra, rb, rng=None):
+        """
+        Create a population of random chromosomes.
+
+        Parameters:
+        size (int): Number of individuals.
+        n_var (int): Number of variables (genes).
+        n_bit (int): Number of bits per variable.
+        ra (float): The lower bound of the range.
+        rb (float): The upper bound of the range.
+        rng (np.random.Generator): Random number generator.
+
+        Returns:
+        Population: The unevaluated population.
+        """
+        bits = generate_chromosomes(size, n_var, n_bit, rng)
+        return cls(bits, decode_chromosomes(bits, n_var, n_bit, ra, rb))
+
+    @classmethod
+    def from_bits(cls, bits, n_var, n_bit, ra, rb):
+        """
+        Create an unevaluated population from a matrix of chromosomes.
+
+        Parameters:
+        bits (array): (N, n_var * n_bit) matrix of chromosomes.
+        n_var (int): Number of variables (genes).
+        n_bit (int): Number of bits per variable.
+        ra (float): The lower bound of the range.
+        rb (float): The upper bound of the range.
+
+        Returns:
+        Population: The unevaluated population.
+        """
+        return cls(bits, decode_chromosomes(bits, n_var, n_bit, ra, rb))
+
+    @classmethod
+    def concatenate(cls, populations):
+        """
+        Stack several populations into a new one.
+
+        Parameters:
+        populations (list): The populations to stack.
+
+        Returns:
+        Population: The combined population.
+        """
+        return cls(np.concatenate([p.bits for p in populations]),
+                   np.concatenate([p.gains for p in populations]),
+                   np.concatenate([p.fitness for p in populations]))
+
+    def keys(self):
+        """
+        Pack every chromosome into an integer.
+
+        Returns:
+        list: One Python integer per individual.
+        """
+        return pack_chromosomes(self.bits)
+
+    def best(self, k=1):
+        """
+        Find the fittest individuals without sorting the population.
+
+        Parameters:
+        k (int): Number of individuals.
+
+        Returns:
+        np.ndarray: Indices of the k fittest individuals, fittest first.
+        """
+        return self._rank().best(k)
+
+    def worst(self, k=1):
+        """
+        Find the least fit individuals without sorting the population.
+
+        Parameters:
+        k (int): Number of individuals.
+
+        Returns:
+        np.ndarray: Indices of the k least fit individuals, least fit first.
+        """
+        return self._rank().worst(k)
+
+    def _rank(self):
+        # Built on first use, then kept up to date by __setitem__
+        if self._ranking is None:
+            self._ranking = FitnessRanking(self.fitness)
+        return self._ranking
+
+    def individual(self, index):
+        """
+        Return one individual in the dictionary form used for reporting.
+
+        Parameters:
+        index (int): Index of the individual.
+
+        Returns:
+        dict: The individual's genes, fitness and chromosome.
+        """
+        return {
+            "gen": self.gains[index].tolist(),
+            "fitness": float(self.fitness[index]),
+            "chromosome": self.bits[index].tolist()
+        }
+
+    def __getitem__(self, index):
+        return Population(self.bits[index], self.gains[index], self.fitness[index])
+
+    def __setitem__(self, index, other):
+        self.bits[index] = other.bits
+        self.gains[index] = other.gains
+        self.fitness[index] = other.fitness
+        if self._ranking is not None:
+            self._ranking.update(np.arange(len(self))[index])
+
+    def __len__(self):
+        return len(self.bits)
+
+
+class FitnessRanking:
+    """
+    Incremental index of the best and worst entries of a fitness array.
+
+    Keeps a max-heap and a min-heap of (fitness, index) entries. Updated entries are pushed again and
+    the outdated ones are skipped lazily, so finding or replacing k individuals costs O(k log n)
+    instead of a pass over the whole population. Ties are broken by lowest index, like np.argmax.
+
+    Attributes:
+    fitness (np.ndarray): The indexed fitness array.
+    """
+
+    def __init__(self, fitness):
+        """
+        Index a fitness array.
+
+        Parameters:
+        fitness (np.ndarray): The fitness array. Changes to it must be reported through update.
+        """
+        self.fitness = fitness
+        self._rebuild()
+
+    def _rebuild(self):
+        values = self.fitness.tolist()
+        self._version = [0] * len(values)
+        self._max_heap = [(-f, i, 0) for i, f in enumerate(values)]
+        self._min_heap = [(f, i, 0) for i, f in enumerate(values)]
+        heapq.heapify(self._max_heap)
+        heapq.heapify(self._min_heap)
+
+    def update(self, indices):
+        """
+        Re-index entries whose fitness changed.
+
+        Parameters:
+        indices (array): Indices of the changed entries.
+        """
+        for i in np.atleast_1d(indices).tolist():
+            self._version[i] += 1
+            version = self._version[i]
+            f = float(self.fitness[i])
+            heapq.heappush(self._max_heap, (-f, i, version))
+            heapq.heappush(self._min_heap, (f, i, version))
+
+        # Drop the outdated entries once they outnumber the live ones
+        if len(self._max_heap) > 2 * len(self._version) + 64:
+            self._rebuild()
+
+    def _top(self, heap, k):
+        found = []
+        while heap and len(found) < k:
+            entry = heapq.heappop(heap)
+            if entry[2] == self._version[entry[1]]:
+                found.append(entry)
+        for entry in found:
+            heapq.heappush(heap, entry)
+        return np.array([entry[1] for entry in found], dtype=int)
+
+    def best(self, k=1):
+        """
+        Indices of the k largest fitness values, largest first.
+        """
+        return self._top(self._max_heap, k)
+
+    def worst(self, k=1):
+        """
+        Indices of the k smallest fitness values, smallest first.
+        """
+        return self._top(self._min_heap, k)
+
@@ -0,0 +1,255 @@
+import json
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+import numpy as np
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (1e-5, 3e-5, 1e-4, 3e-4, 1e-3, 3e-3, 1e-2, 3e-2, 0.1, 0.3, 1.0, 3.0, 10.0)
+
+
+class _Phase:
+    """
+    Context manager timing one phase of a Profiler, excluding the time of the phases nested in it.
+    """
+
+    __slots__ = ("profiler", "name", "start", "nested")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.nested = 0.0
+        self.profiler._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = self.profiler._stack
+        stack.pop()
+        if stack:
+            stack[-1].nested += elapsed
+        seconds = self.profiler.seconds
+        seconds[self.name] = seconds.get(self.name, 0.0) + elapsed - self.nested
+        calls = self.profiler.calls
+        calls[self.name] = calls.get(self.name, 0) + 1
+        return False
+
+
+class Histogram:
+    """
+    Cumulative latency histogram with fixed bucket bounds, as exported by Prometheus.
+
+    Attributes:
+    bounds (tuple): Upper bound of each bucket, in seconds.
+    counts (list): Number of observations in each bucket, the last one for values above every bound.
+    sum (float): Sum of the observed values.
+    count (int): Number of observations.
+    """
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        """
+        Initialize an empty histogram.
+
+        Parameters:
+        bounds (tuple): Increasing bucket upper bounds. Default is LATENCY_BUCKETS.
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """
+        Add one observation.
+
+        Parameters:
+        value (float): The observed value.
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self):
+        """
+        Returns:
+        dict: Bucket bounds and counts, sum and count.
+        """
+        return {"bounds": list(self.bounds), "counts": list(self.counts), "sum": self.sum, "count": self.count}
+
+
+class Profiler:
+    """
+    Wall time per phase, event counters and latency histograms of a Genetic Algorithm run.
+
+    Phase times are exclusive: the time of a phase nested in another one, such as the simulation inside
+    an evaluation, is only counted once, so the phase times add up to the profiled wall time. A phase
+    costs two perf_counter calls, cheap enough to leave profiling on.
+
+    Attributes:
+    seconds (dict): Exclusive wall time of each phase.
+    calls (dict): Number of times each phase was entered.
+    counters (dict): Event counts, such as evaluations and failed simulations.
+    histograms (dict): Latency histograms by name.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        """
+        Initialize an empty profile.
+        """
+        self.seconds = {}
+        self.calls = {}
+        self.counters = {}
+        self.histograms = {}
+        self._stack = []
+
+    def phase(self, name):
+        """
+        Time a block of code as the given phase.
+
+        Parameters:
+        name (str): Phase name.
+
+        Returns:
+        context manager: Times the block on exit.
+        """
+        return _Phase(self, name)
+
+    def count(self, name, value=1):
+        """
+        Increment a counter.
+
+        Parameters:
+        name (str): Counter name.
+        value (int): Increment. Default is 1.
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        """
+        Add an observation to a latency histogram, creating it on first use.
+
+        Parameters:
+        name (str): Histogram name.
+        value (float): Observed latency in seconds.
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(value)
+
+    def record_simulations(self, fitness):
+        """
+        Count a batch of simulated candidates and those whose step response could not be analysed.
+
+        Parameters:
+        fitness (array): Fitness of the simulated candidates, 0 or non-finite for a failed simulation.
+        """
+        fitness = np.asarray(fitness, dtype=float)
+        self.count("simulations", fitness.size)
+        self.count("failed_simulations", int(np.count_nonzero(~(fitness > 0))))
+
+    def to_dict(self):
+        """
+        Returns:
+        dict: Phase times and calls, counters and histograms, ready for JSON serialization.
+        """
+        return {
+            "phases": {name: {"seconds": seconds, "calls": self.calls[name]} for name, seconds in self.seconds.items()},
+            "counters": dict(self.counters),
+            "histograms": {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+        }
+
+    def to_json(self, path=None):
+        """
+        Export the profile as JSON.
+
+        Parameters:
+        path (str): File to write. Default is None, to only return the text.
+
+        Returns:
+        str: The JSON text.
+        """
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def to_prometheus(self, path=None, prefix="ga", labels=None):
+        """
+        Export the profile in the Prometheus text exposition format, for example for the node exporter
+        textfile collector.
+
+        Parameters:
+        path (str): File to write. Default is None, to only return the text.
+        prefix (str): Prefix of every metric name. Default is "ga".
+        labels (dict): Labels added to every sample, such as the plant name. Default is None.
+
+        Returns:
+        str: The exposition text.
+        """
+        def sample(name, value, **extra):
+            merged = dict(labels or {}, **extra)
+            label_text = ",".join(f'{key}="{label}"' for key, label in merged.items())
+            return f"{prefix}_{name}{{{label_text}}} {value!r}" if label_text else f"{prefix}_{name} {value!r}"
+
+        lines = [f"# HELP {prefix}_phase_seconds_total Exclusive wall time spent in each phase.",
+                 f"# TYPE {prefix}_phase_seconds_total counter"]
+        lines += [sample("phase_seconds_total", seconds, phase=name) for name, seconds in self.seconds.items()]
+        lines += [f"# HELP {prefix}_phase_calls_total Number of times each phase was entered.",
+                  f"# TYPE {prefix}_phase_calls_total counter"]
+        lines += [sample("phase_calls_total", calls, phase=name) for name, calls in self.calls.items()]
+
+        for name, value in self.counters.items():
+            lines += [f"# TYPE {prefix}_{name}_total counter", sample(f"{name}_total", value)]
+
+        for name, histogram in self.histograms.items():
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            cumulative = np.cumsum(histogram.counts).tolist()
+            for bound, count in zip(histogram.bounds + ("+Inf",), cumulative):
+                lines.append(sample(f"{name}_bucket", count, le=bound))
+            lines += [sample(f"{name}_sum", histogram.sum), sample(f"{name}_count", histogram.count)]
+
+        text = "\n".join(lines) + "\n"
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def summary(self):
+        """
+        Returns:
+        str: One line with the share of the profiled time spent in each phase, largest first.
+        """
+        total = sum(self.seconds.values()) or 1.0
+        phases = sorted(self.seconds.items(), key=lambda item: -item[1])
+        return " - ".join(f"{name} {seconds:.3f} s ({seconds / total:.0%})" for name, seconds in phases)
+
+
+class NullProfiler:
+    """
+    Profiler that records nothing, used when profiling is disabled.
+    """
+
+    enabled = False
+
+    def phase(self, name):
+        return nullcontext()
+
+    def count(self, name, value=1):
+        pass
+
+    def observe(self, name, value):
+        pass
+
+    def record_simulations(self, fitness):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,120 @@
+import numpy as np
+
+from calc_fitness import fitness_upper_bound, FITNESS_BOUND_SLACK
+
+
+class FitnessScreen:
+    """
+    First stage of a two-stage fitness evaluation.
+
+    Before simulating a batch of candidates in full, a tuner asks the screen for a cheap upper bound on
+    their fitness, from a coarse simulation of the first part of each step response. Candidates whose
+    bound plus margin falls short of the fitness they must reach to enter the population keep the bound
+    as their fitness and are not simulated in full. The others go on to the full evaluation.
+
+    The bound holds up to FITNESS_BOUND_SLACK as long as the coarse grid catches every turn of the
+    response, see fitness_upper_bound. The screen checks this with two error counts: passed candidates
+    whose full fitness exceeds their bound by more than the slack, and audited candidates, a random share
+    of the rejected ones evaluated in full anyway, that would in fact have entered the population.
+
+    Attributes:
+    steps (int): Simulation steps of the coarse stage.
+    horizon (float): Fraction of the full simulation horizon covered by the coarse stage.
+    points_per_period (float): Minimum coarse samples per period of the fastest closed-loop mode.
+    margin (float): Fitness added to the bound before comparing it with the threshold.
+    audit_rate (float): Share of rejected candidates evaluated in full to measure the screen error.
+    """
+
+    def __init__(self, steps=100, horizon=0.25, points_per_period=8, margin=0.0, audit_rate=0.05):
+        """
+        Parameters:
+        steps (int): Simulation steps of the coarse stage. Default is 100.
+        horizon (float): Fraction of the full simulation horizon covered by the coarse stage. Default is 0.25.
+        points_per_period (float): Minimum coarse samples per period of the fastest closed-loop mode.
+            Default is 8.
+        margin (float): Fitness added to the bound before comparing it with the threshold; larger margins
+            reject fewer candidates and make fewer mistakes. Default is 0.
+        audit_rate (float): Share of rejected candidates evaluated in full anyway. Default is 0.05.
+        """
+        if margin < 0:
+            raise ValueError("The screening margin must be non-negative")
+        if not 0 <= audit_rate <= 1:
+            raise ValueError("The audit rate must be between 0 and 1")
+        self.steps = steps
+        self.horizon = horizon
+        self.points_per_period = points_per_period
+        self.margin = margin
+        self.audit_rate = audit_rate
+        self.screened = 0
+        self.rejected = 0
+        self.audited = 0
+        self.false_rejections = 0
+        self.passed = 0
+        self.bound_violations = 0
+
+    def bounds(self, num, den, gains):
+        """
+        Coarse upper bounds on the fitness of a batch of gains.
+
+        Parameters:
+        num (list): Numerator coefficients of the system transfer function.
+        den (list): Denominator coefficients of the system transfer function.
+        gains (np.ndarray): (N, 3) array of Kp, Ki, Kd values.
+
+        Returns:
+        np.ndarray: (N,) fitness bounds, inf where the loop is unstable.
+        """
+        return fitness_upper_bound(num, den, gains, self.steps, self.horizon, self.points_per_period)
+
+    def evaluate(self, num, den, gains, threshold, evaluate, rng):
+        """
+        Score a batch in two stages.
+
+        Parameters:
+        num (list): Numerator coefficients of the system transfer function.
+        den (list): Denominator coefficients of the system transfer function.
+        gains (np.ndarray): (N, 3) array of Kp, Ki, Kd values.
+        threshold (float or np.ndarray): Fitness each candidate must reach to enter the population.
+        evaluate (callable): Full evaluation, taking an (M, 3) array of gains and returning M fitness values.
+        rng (np.random.Generator): Random number generator choosing the audited candidates.
+
+        Returns:
+        tuple: (N,) fitness values, the bound for rejected candidates, and (N,) boolean array, True
+        where the fitness comes from the full evaluation.
+        """
+        bounds = self.bounds(num, den, gains)
+        threshold = np.broadcast_to(np.asarray(threshold, dtype=float), bounds.shape)
+        promising = bounds + self.margin >= threshold
+        audited = np.zeros_like(promising)
+        if not promising.all():
+            audited = ~promising & (rng.random(len(bounds)) < self.audit_rate)
+        full = promising | audited
+
+        fitness = bounds.copy()
+        if full.any():
+            fitness[full] = evaluate(gains[full])
+
+        self.screened += len(bounds)
+        self.rejected += int(np.count_nonzero(~promising))
+        self.audited += int(np.count_nonzero(audited))
+        self.false_rejections += int(np.count_nonzero(audited & (fitness >= threshold)))
+        self.passed += int(np.count_nonzero(promising & np.isfinite(bounds)))
+        self.bound_violations += int(np.count_nonzero(promising & (fitness > bounds + FITNESS_BOUND_SLACK)))
+        return fitness, full
+
+    def stats(self):
+        """
+        Returns:
+        dict: Screened, rejected and audited candidates, the share of audited candidates wrongly
+        rejected and the share of passed stable candidates whose full fitness exceeded their bound.
+        """
+        return {
+            "screened": self.screened,
+            "rejected": self.rejected,
+            "rejection_rate": self.rejected / self.screened if self.screened else 0.0,
+            "audited": self.audited,
+            "false_rejections": self.false_rejections,
+            "error_rate": self.false_rejections / self.audited if self.audited else 0.0,
+            "bound_violations": self.bound_violations,
+            "violation_rate": self.bound_violations / self.passed if self.passed else 0.0,
+        }
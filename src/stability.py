@@ -0,0 +1,51 @@
+import numpy as np
+
+# Fitness given to closed loops rejected by the stability screen
+UNSTABLE_FITNESS = 0.0
+
+
+def routh_stable(den_cl):
+    """
+    Batched Routh-Hurwitz test of closed-loop characteristic polynomials.
+
+    The Routh table of every polynomial is built at once, one row per iteration over the whole batch.
+    A polynomial is stable when every entry of the first column is nonzero and has the sign of the
+    leading coefficient; a zero pivot means a root on or to the right of the imaginary axis.
+
+    Parameters:
+    den_cl (array): (N, m) characteristic polynomial coefficients, highest power first.
+
+    Returns:
+    np.ndarray: (N,) boolean array, True for polynomials with all roots in the open left half plane.
+    """
+    den_cl = np.atleast_2d(np.asarray(den_cl, dtype=float))
+    n_pop, m = den_cl.shape
+    width = (m + 1) // 2
+
+    previous = np.zeros((n_pop, width + 1))
+    current = np.zeros((n_pop, width + 1))
+    previous[:, :(m + 1) // 2] = den_cl[:, 0::2]
+    current[:, :m // 2] = den_cl[:, 1::2]
+
+    lead = np.sign(den_cl[:, 0])
+    stable = (lead != 0) & np.isfinite(den_cl).all(axis=1)
+    if m > 1:
+        stable &= np.sign(current[:, 0]) == lead
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(m - 2):
+            pivot = current[:, 0]
+            stable &= pivot != 0
+            pivot = np.where(pivot != 0, pivot, 1.0)
+            following = np.zeros_like(current)
+            following[:, :-1] = (pivot[:, None] * previous[:, 1:] - previous[:, :1] * current[:, 1:]) / pivot[:, None]
+
+            # Rescale each row; the signs of the first column are all that matter
+            scale = np.abs(following).max(axis=1, keepdims=True)
+            following /= np.where(scale > 0, scale, 1.0)
+
+            previous, current = current, following
+            stable &= np.sign(current[:, 0]) == lead
+
+    return stable
+
@@ -0,0 +1,127 @@
+from functools import cached_property
+
+import control
+import numpy as np
+
+# Integral error criteria, by name
+CRITERIA = ("iae", "ise", "itae")
+
+# np.trapezoid replaces np.trapz from NumPy 2.0
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz
+
+
+class StepAnalysis:
+    """
+    Step response of a closed loop, simulated once and analysed on demand.
+
+    The trajectory is computed by control.step_response on the same time grid control.step_info would
+    choose, so the metrics are those step_info reports, without simulating the loop a second time. Each
+    metric is computed the first time it is read and then kept.
+
+    Attributes:
+    t (np.ndarray): Time samples.
+    y (np.ndarray): Output at each time sample.
+    final_value (float): Final value of the output, the DC gain of the loop.
+    reference (float): Amplitude of the step input.
+    """
+
+    def __init__(self, t, y, final_value, reference=1.0):
+        """
+        Parameters:
+        t (array): Time samples.
+        y (array): Output at each time sample.
+        final_value (float): Final value of the output.
+        reference (float): Amplitude of the step input. Default is 1.
+        """
+        self.t = np.asarray(t, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.final_value = final_value
+        self.reference = reference
+
+    @classmethod
+    def simulate(cls, loop, T=None):
+        """
+        Simulate the unit step response of a closed loop.
+
+        Parameters:
+        loop (TransferFunction): The closed loop, for example SystemDynamics.closed_loop(kp, ki, kd).
+        T (array): Time samples. Default is None, for the grid chosen by python-control.
+
+        Returns:
+        StepAnalysis: The analysis of the response.
+        """
+        t, y = control.step_response(loop, T)
+        return cls(t, np.squeeze(y), float(np.real(loop.dcgain())))
+
+    @cached_property
+    def info(self):
+        """
+        dict: The control.step_info metrics of the trajectory.
+        """
+        return control.step_info(self.y, T=self.t, yfinal=self.final_value)
+
+    @property
+    def rise_time(self):
+        return self.info["RiseTime"]
+
+    @property
+    def settling_time(self):
+        return self.info["SettlingTime"]
+
+    @property
+    def overshoot(self):
+        return self.info["Overshoot"]
+
+    @property
+    def steady_state(self):
+        return self.info["SteadyStateValue"]
+
+    @cached_property
+    def error(self):
+        """
+        np.ndarray: Tracking error, reference minus output, at each time sample.
+        """
+        return self.reference - self.y
+
+    @cached_property
+    def iae(self):
+        """
+        float: Integral of the absolute error.
+        """
+        return float(_trapezoid(np.abs(self.error), self.t))
+
+    @cached_property
+    def ise(self):
+        """
+        float: Integral of the squared error.
+        """
+        return float(_trapezoid(self.error**2, self.t))
+
+    @cached_property
+    def itae(self):
+        """
+        float: Integral of the time-weighted absolute error, which penalizes slowly decaying errors.
+        """
+        return float(_trapezoid(self.t * np.abs(self.error), self.t))
+
+    def criterion(self, name):
+        """
+        Value of an integral error criterion.
+
+        Parameters:
+        name (str): One of CRITERIA.
+
+        Returns:
+        float: The criterion.
+        """
+        if name not in CRITERIA:
+            raise ValueError(f"Unknown criterion: {name}. Choose from {CRITERIA}")
+        return getattr(self, name)
+
+    def to_dict(self):
+        """
+        Returns:
+        dict: Every metric and criterion, ready for JSON serialization.
+        """
+        return {"rise_time": self.rise_time, "settling_time": self.settling_time, "overshoot": self.overshoot,
+                "steady_state": self.steady_state, **{name: self.criterion(name) for name in CRITERIA}}
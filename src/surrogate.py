@@ -0,0 +1,209 @@
+from collections import deque
+
+import numpy as np
+from scipy.interpolate import RBFInterpolator
+from scipy.stats import spearmanr
+
+# Regressors a Surrogate can fit to its archive
+SURROGATE_MODELS = ("knn", "rbf")
+
+
+class Surrogate:
+    """
+    Cheap learned model of the fitness, used to pre-rank candidates before simulating them.
+
+    Every exactly evaluated candidate goes into a bounded archive of (gains, fitness) points. When asked to
+    choose among many proposed candidates, the surrogate predicts their fitness from the archive, by inverse
+    distance weighting of the nearest neighbours or by a local radial basis function interpolant, and only
+    the most promising ones are simulated. Gains are expected scaled to the unit cube, so every gain weighs
+    the same in the distances.
+
+    To measure its quality, the surrogate keeps the prediction it made for every candidate that was then
+    simulated, and reports the rank correlation between predicted and true fitness. Only the chosen
+    candidates are simulated, so the correlation is measured over the best predictions of each batch.
+
+    Attributes:
+    proposals (int): Batches of candidates proposed for each batch simulated.
+    neighbours (int): Archive points used by each prediction.
+    model (str): "knn" or "rbf".
+    min_archive (int): Archive size below which the surrogate is not used.
+    archive_size (int): Maximum number of archived points; the oldest are overwritten first.
+    proposed (int): Number of candidates proposed.
+    simulated (int): Number of proposed candidates chosen for simulation.
+    """
+
+    def __init__(self, proposals=16, neighbours=8, model="knn", min_archive=20, archive_size=10000,
+                 correlation_window=10000):
+        """
+        Parameters:
+        proposals (int): Batches of candidates proposed for each batch simulated, so proposals - 1 out of
+            proposals candidates are never simulated. Default is 16.
+        neighbours (int): Archive points used by each prediction. Default is 8.
+        model (str): "knn" for inverse distance weighting of the nearest neighbours, "rbf" for a thin plate
+            spline interpolating them. Default is "knn".
+        min_archive (int): Archive size below which every candidate is simulated. Default is 20.
+        archive_size (int): Maximum number of archived points. Default is 10000.
+        correlation_window (int): Number of recent (predicted, true) pairs the rank correlation covers.
+            Default is 10000.
+        """
+        if model not in SURROGATE_MODELS:
+            raise ValueError(f"Unknown surrogate model: {model}. Choose from {SURROGATE_MODELS}")
+        if proposals < 1:
+            raise ValueError("The surrogate needs at least one proposal per simulated batch")
+        if min_archive < neighbours:
+            raise ValueError("The archive must hold at least the neighbours of a prediction before use")
+        self.proposals = proposals
+        self.neighbours = neighbours
+        self.model = model
+        self.min_archive = min_archive
+        self.archive_size = archive_size
+        self.correlation_window = correlation_window
+        self.reset()
+
+    def reset(self):
+        """
+        Empty the archive and the statistics, for a new run.
+        """
+        self._points = None
+        self._fitness = np.empty(self.archive_size)
+        self._size = 0
+        self._next = 0
+        self._interpolator = None
+        self._pending = None
+        self._pairs = deque(maxlen=self.correlation_window)
+        self.proposed = 0
+        self.simulated = 0
+
+    @property
+    def ready(self):
+        """
+        bool: Whether the archive is large enough for predictions.
+        """
+        return self._size >= self.min_archive
+
+    def add(self, points, fitness):
+        """
+        Archive exactly evaluated candidates, and pair them with their predictions when they were chosen by select.
+
+        Parameters:
+        points (np.ndarray): (N, d) gains scaled to the unit cube.
+        fitness (np.ndarray): (N,) true fitness values.
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        fitness = np.asarray(fitness, dtype=float)
+        if self._pending is not None:
+            self._pairs.extend(zip(self._pending.tolist(), fitness.tolist()))
+            self._pending = None
+
+        if self._points is None:
+            self._points = np.empty((self.archive_size, points.shape[1]))
+        for point, value in zip(points, fitness):
+            # Genotypes seen before would make the interpolation singular and carry no information
+            if self._size and np.any(np.all(self._points[:self._size] == point, axis=1)):
+                continue
+            self._points[self._next] = point
+            self._fitness[self._next] = value
+            self._next = (self._next + 1) % self.archive_size
+            self._size = min(self._size + 1, self.archive_size)
+            self._interpolator = None
+
+    def predict(self, points):
+        """
+        Predicted fitness of candidates.
+
+        Parameters:
+        points (np.ndarray): (M, d) gains scaled to the unit cube.
+
+        Returns:
+        np.ndarray: (M,) predicted fitness values.
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        archive = self._points[:self._size]
+        values = self._fitness[:self._size]
+        k = min(self.neighbours, self._size)
+
+        if self.model == "rbf":
+            if self._interpolator is None:
+                self._interpolator = RBFInterpolator(archive, values, neighbors=k, kernel="thin_plate_spline")
+            return self._interpolator(points)
+
+        distances = np.linalg.norm(points[:, None, :] - archive[None, :, :], axis=2)
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        distances = np.take_along_axis(distances, nearest, axis=1)
+        weights = 1 / np.maximum(distances, 1e-12) ** 2
+        return (weights * values[nearest]).sum(axis=1) / weights.sum(axis=1)
+
+    def select(self, points, n):
+        """
+        Choose the candidates to simulate.
+
+        Parameters:
+        points (np.ndarray): (M, d) proposed gains scaled to the unit cube.
+        n (int): Number of candidates to simulate.
+
+        Returns:
+        np.ndarray: Indices of the n candidates with the highest predicted fitness, best first.
+        """
+        predicted = self.predict(points)
+        chosen = np.argsort(-predicted, kind="stable")[:n]
+        self._pending = predicted[chosen]
+        self.proposed += len(points)
+        self.simulated += len(chosen)
+        return chosen
+
+    def rank_correlation(self):
+        """
+        Returns:
+        float: Spearman correlation between predicted and true fitness of the simulated candidates, NaN
+        with fewer than three pairs or constant values.
+        """
+        if len(self._pairs) < 3:
+            return float("nan")
+        predicted, actual = np.array(self._pairs).T
+        if np.ptp(predicted) == 0 or np.ptp(actual) == 0:
+            return float("nan")
+        return float(spearmanr(predicted, actual).statistic)
+
+    def stats(self):
+        """
+        Returns:
+        dict: Proposed candidates, those simulated and screened out, the share screened out, the archive size
+        and the rank correlation of the predictions. Most screened out candidates would never have been bred
+        without the surrogate, so they are not simulations saved; benchmark.benchmark_surrogate measures
+        those by comparing simulations-to-target with and without a surrogate.
+        """
+        return {
+            "proposed": self.proposed,
+            "simulated": self.simulated,
+            "screened_out": self.proposed - self.simulated,
+            "screened_out_rate": (self.proposed - self.simulated) / self.proposed if self.proposed else 0.0,
+            "archive": self._size,
+            "rank_correlation": self.rank_correlation(),
+        }
+
+    def state(self):
+        """
+        Snapshot of the archive and statistics, for checkpoints.
+
+        Returns:
+        tuple: (scalars, arrays), a JSON-serializable dictionary and a dictionary of NumPy arrays.
+        """
+        scalars = {"size": self._size, "next": self._next, "proposed": self.proposed,
+                   "simulated": self.simulated, "pairs": list(self._pairs)}
+        points = self._points[:self._size] if self._points is not None else np.empty((0, 0))
+        return scalars, {"points": points, "fitness": self._fitness[:self._size]}
+
+    def restore(self, scalars, arrays):
+        """
+        Restore a snapshot taken by state.
+        """
+        self.reset()
+        self._size = scalars["size"]
+        self._next = scalars["next"]
+        self.proposed = scalars["proposed"]
+        self.simulated = scalars["simulated"]
+        self._pairs.extend(tuple(pair) for pair in scalars["pairs"])
+        if self._size:
+            self._points = np.empty((self.archive_size, arrays["points"].shape[1]))
+            self._points[:self._size] = arrays["points"]
+            self._fitness[:self._size] = arrays["fitness"]
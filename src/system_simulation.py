@@ -1,13 +1,90 @@
 import numpy as np
+import control
 from control import TransferFunction
 from pid_controller import PIDController
+from calc_fitness import _as_poly, closed_loop_polynomials
+from margins import plant_response, loop_margins
 
 
 class SystemDynamics:
     """
     A class to represent system dynamics
+
+    The plant is fixed while its controller is tuned, so everything that depends only on the plant is
+    computed once here and reused by every closed-loop evaluation.
+
+    Attributes:
+    system (TransferFunction): The plant.
+    num (np.ndarray): Numerator coefficients, highest power first, normalized to a monic denominator.
+    den (np.ndarray): Monic denominator coefficients, highest power first.
+    state_space (StateSpace): State-space realization of the plant.
+    frequencies (np.ndarray): Standard frequency grid in rad/s, logarithmically spaced.
+    response (np.ndarray): Complex frequency response G(jw) on the standard grid.
     """
 
     def __init__(self, num, den):
         self.system = TransferFunction(num, den)
-        
\ No newline at end of file
+        num = _as_poly(num)
+        den = _as_poly(den)
+        self.num = num / den[0]
+        self.den = den / den[0]
+        self.state_space = control.ss(self.system)
+        # Shared with evaluate_population, which finds the same grid from the same coefficients
+        self.frequencies, self.response = plant_response(tuple(self.num.tolist()), tuple(self.den.tolist()))
+
+    def frequency_response(self, omega):
+        """
+        Evaluate the plant frequency response.
+
+        Parameters:
+        omega (array): Frequencies in rad/s.
+
+        Returns:
+        np.ndarray: Complex G(jw) at each frequency.
+        """
+        s = 1j * np.asarray(omega, dtype=float)
+        return np.polyval(self.num, s) / np.polyval(self.den, s)
+
+    def margins(self, gains):
+        """
+        Gain margin, phase margin and peak sensitivity of the plant with a batch of PID controllers,
+        from the cached frequency response.
+
+        Parameters:
+        gains (array): (N, 3) array of Kp, Ki, Kd values.
+
+        Returns:
+        tuple: (N,) gain margins (ratio), phase margins (degrees) and peak sensitivities Ms.
+        """
+        return loop_margins(self.frequencies, self.response, gains, self.num, self.den)
+
+    def closed_loop_polynomials(self, gains):
+        """
+        Unity feedback closed-loop polynomials of the plant with a batch of PID controllers.
+
+        Parameters:
+        gains (array): (N, 3) array of Kp, Ki, Kd values.
+
+        Returns:
+        tuple: (N, m) closed-loop numerator and denominator coefficients, highest power first.
+        """
+        return closed_loop_polynomials(self.num, self.den, gains)
+
+    def closed_loop(self, kp, ki, kd):
+        """
+        Unity feedback loop of the plant with a PID controller, built by coefficient convolution.
+
+        Parameters:
+        kp (float): Proportional gain.
+        ki (float): Integral gain.
+        kd (float): Derivative gain.
+
+        Returns:
+        TransferFunction: The closed loop.
+        """
+        num_cl, den_cl = self.closed_loop_polynomials([[kp, ki, kd]])
+        num_cl, den_cl = num_cl[0], den_cl[0]
+        # Without integral action the controller pole at the origin cancels against its zero
+        while num_cl.size > 1 and num_cl[-1] == 0 and den_cl[-1] == 0:
+            num_cl, den_cl = num_cl[:-1], den_cl[:-1]
+        return TransferFunction(num_cl, den_cl)
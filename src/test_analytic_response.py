@@ -0,0 +1,16 @@
+from benchmark import check_analytic, TEST_PLANTS
+
+# Largest error of each metric against control.step_info, relative to max(|reference|, 1); the overshoot is
+# in percent, so its error is in percentage points
+MAX_ERROR = {"RiseTime": 0.05, "SteadyStateValue": 1e-9, "Overshoot": 0.5, "SettlingTime": 0.05}
+MEDIAN_ERROR = 1e-3
+
+
+def test_analytic_metrics_match_step_info():
+    rows = check_analytic(TEST_PLANTS, n_candidates=10, n_points=50001)
+
+    for row in rows:
+        assert row["stable"] > 0, row["plant"]
+        for metric, tolerance in MAX_ERROR.items():
+            assert row["max_error"][metric] <= tolerance, (row["plant"], metric, row["max_error"][metric])
+            assert row["median_error"][metric] <= MEDIAN_ERROR, (row["plant"], metric, row["median_error"][metric])
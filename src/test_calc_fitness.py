@@ -0,0 +1,40 @@
+import numpy as np
+
+from calc_fitness import evaluate_population, evaluate_fitness, evaluate_mutation_fitness, FITNESS_TOLERANCE
+from utils import decode_chromosomes
+
+num = [20]
+den = [1, 32, 140, 0]
+
+# Well damped stabilizing gains of the demo plant, including a point of the 5 bit GA grid
+GAINS = np.array([
+    [50, 10, 5],
+    [100, 20, 10],
+    [30, 5, 2],
+    [80, 50, 20],
+    [100 / 31 * 6, 100 / 31 * 9, 0],
+    [10, 1, 0],
+    [60, 30, 3],
+], dtype=float)
+
+
+def test_evaluate_population_matches_evaluate_fitness():
+    batched = evaluate_population(num, den, GAINS)
+    single = np.array([evaluate_fitness(num, den, gains) for gains in GAINS])
+    np.testing.assert_allclose(batched, single, atol=FITNESS_TOLERANCE)
+
+
+def test_evaluate_population_does_not_depend_on_the_batch():
+    batched = evaluate_population(num, den, GAINS)
+    alone = np.array([evaluate_population(num, den, [gains])[0] for gains in GAINS])
+    np.testing.assert_allclose(batched, alone)
+
+
+def test_mutation_fitness_decodes_like_the_genetic_algorithm():
+    chromosome = [0, 0, 1, 1, 0, 0, 1, 0, 0, 1, 1, 1, 1, 1, 1]
+    fitness, gen = evaluate_mutation_fitness({"chromosome": chromosome}, num, den, 3, 5, 0, 100)
+
+    expected = decode_chromosomes([chromosome], 3, 5, 100, 0)[0]
+    np.testing.assert_allclose(gen, expected)
+    np.testing.assert_allclose(gen, [100 / 31 * 6, 100 / 31 * 9, 100])
+    assert fitness == evaluate_fitness(num, den, expected)
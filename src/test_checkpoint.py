@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from genetic_algorithm import GeneticAlgorithm
+from system_simulation import SystemDynamics
+
+system = SystemDynamics([20], [1, 32, 140, 0])
+
+
+def make_ga(**options):
+    return GeneticAlgorithm(system, 3, 5, 100, 0, 10, 1000, seed=7, observers=[], **options)
+
+
+def test_resumed_run_reproduces_the_uninterrupted_one(tmp_path):
+    path = str(tmp_path / "run.npz")
+    reference = make_ga(max_generations=30)
+    expected = reference()
+
+    first = make_ga(max_generations=12, checkpoint_path=path)
+    first()
+    assert first.stop_reason == "generations"
+
+    resumed = make_ga(max_generations=30, checkpoint_path=path)
+    assert resumed() == expected
+    assert resumed.generation == reference.generation
+    assert resumed.evaluations == reference.evaluations
+    np.testing.assert_array_equal(resumed.history.values(), reference.history.values())
+
+
+def test_exhausted_budget_stops_without_evolving(tmp_path):
+    path = str(tmp_path / "run.npz")
+    make_ga(max_generations=5, checkpoint_path=path)()
+
+    resumed = make_ga(max_generations=5, checkpoint_path=path)
+    resumed()
+    assert resumed.stop_reason == "generations"
+    assert resumed.generation == 5
+
+
+def test_checkpoint_of_another_configuration_is_rejected(tmp_path):
+    path = str(tmp_path / "run.npz")
+    make_ga(max_generations=3, checkpoint_path=path)()
+
+    other = GeneticAlgorithm(system, 3, 6, 100, 0, 10, 1000, seed=7, observers=[], max_generations=6,
+                             checkpoint_path=path)
+    with pytest.raises(ValueError, match="different plant or configuration"):
+        other()
@@ -0,0 +1,89 @@
+import json
+
+from events import ConsoleObserver, JsonlTraceObserver, Observer
+from genetic_algorithm import GeneticAlgorithm
+from system_simulation import SystemDynamics
+
+system = SystemDynamics([20], [1, 32, 140, 0])
+
+
+class Recorder(Observer):
+    def __init__(self):
+        self.events = []
+
+    def on_start(self, ga):
+        self.events.append(("start", None, None))
+
+    def on_generation(self, ga, generation, best):
+        self.events.append(("generation", generation, best["fitness"]))
+
+    def on_improvement(self, ga, generation, best):
+        self.events.append(("improvement", generation, best["fitness"]))
+
+    def on_finish(self, ga, best):
+        self.events.append(("finish", None, best["fitness"]))
+
+
+def run(observers, generations=12):
+    ga = GeneticAlgorithm(system, 3, 10, 0, 100, 10, 1000, seed=0, observers=observers,
+                          max_generations=generations)
+    ga()
+    return ga
+
+
+def test_events_arrive_in_order():
+    recorder = Recorder()
+    ga = run([recorder])
+
+    events = recorder.events
+    assert events[0][0] == "start"
+    assert events[-1] == ("finish", None, ga.history.last["fitness"])
+    generations = [generation for event, generation, _ in events if event == "generation"]
+    assert generations == list(range(12))
+
+    best = -1
+    for previous, (event, generation, fitness) in zip(events, events[1:]):
+        if event == "improvement":
+            # An improvement follows the generation event that raised the best fitness
+            assert previous[:2] == ("generation", generation)
+            assert fitness > best
+            best = fitness
+
+
+def test_console_observer_is_rate_limited(capsys):
+    best = {"gen": (1.0, 2.0, 3.0), "fitness": 50.0}
+    limited = ConsoleObserver(interval=3600)
+    for generation in range(5):
+        limited.on_generation(None, generation, best)
+    assert capsys.readouterr().out.count("* Generation") == 1
+
+    every = ConsoleObserver(interval=0)
+    for generation in range(5):
+        every.on_generation(None, generation, best)
+    assert capsys.readouterr().out.count("* Generation") == 5
+
+
+def test_silent_run_prints_nothing(capsys):
+    run([])
+    assert capsys.readouterr().out == ""
+
+
+def test_jsonl_trace_records(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    recorder = Recorder()
+    ga = run([JsonlTraceObserver(str(path), buffer_size=3, every=4), recorder])
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    expected = [(event, generation) for event, generation, _ in recorder.events
+                if event == "improvement" or event == "generation" and generation % 4 == 0]
+    assert [(record["event"], record["generation"]) for record in records[:-1]] == expected
+
+    finish = records[-1]
+    last = ga.history.last
+    assert finish["event"] == "finish"
+    assert finish["generation"] == 11
+    assert (finish["kp"], finish["ki"], finish["kd"], finish["fitness"]) == (last["kp"], last["ki"], last["kd"],
+                                                                             last["fitness"])
+    assert all(set(record) == {"event", "seconds", "generation", "kp", "ki", "kd", "fitness"} for record in records)
+    seconds = [record["seconds"] for record in records]
+    assert seconds == sorted(seconds)
@@ -0,0 +1,37 @@
+from fitness_cache import FitnessCache
+from genetic_algorithm import GeneticAlgorithm
+from system_simulation import SystemDynamics
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = FitnessCache(maxsize=2)
+    cache.put("a", 1.0)
+    cache.put("b", 2.0)
+    assert cache.get("a") == 1.0
+    cache.put("c", 3.0)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1.0
+    assert cache.get("c") == 3.0
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = FitnessCache(maxsize=0)
+    cache.put("a", 1.0)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_shared_cache_does_not_change_the_result():
+    system = SystemDynamics([20], [1, 32, 140, 0])
+    cache = FitnessCache()
+    options = dict(seed=3, observers=[], max_generations=20, cache=cache)
+
+    first = GeneticAlgorithm(system, 3, 5, 100, 0, 10, 90, **options)()
+    misses = cache.misses
+    second = GeneticAlgorithm(system, 3, 5, 100, 0, 10, 90, **options)()
+
+    assert first == second
+    assert cache.misses == misses
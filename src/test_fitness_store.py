@@ -0,0 +1,80 @@
+import multiprocessing
+import os
+
+import numpy as np
+
+import fitness_store
+from fitness_store import FitnessStore
+from genetic_algorithm import GeneticAlgorithm
+from system_simulation import SystemDynamics
+
+PLANT = ([20], [1, 32, 140, 0])
+
+
+def open_store(directory, **options):
+    return FitnessStore(str(directory), *PLANT, 3, 4, 0, 100, options)
+
+
+def test_values_persist_across_instances(tmp_path):
+    store = open_store(tmp_path)
+    assert store.stats() == {"hits": 0, "misses": 0, "filled": 0, "size": 2**12}
+    store.store([3, 7], [10.0, 20.0])
+    store.flush()
+
+    reopened = open_store(tmp_path)
+    assert reopened.path == store.path
+    np.testing.assert_array_equal(reopened.lookup([3, 7, 8]), [10.0, 20.0, np.nan])
+    assert (reopened.hits, reopened.misses) == (2, 1)
+    assert open_store(tmp_path, criterion="iae").path != store.path
+
+
+def test_reused_table_answers_a_repeated_run(tmp_path):
+    def run():
+        ga = GeneticAlgorithm(SystemDynamics(*PLANT), 3, 6, 0, 100, 10, 1000, seed=0, observers=[],
+                              max_generations=5, store_dir=str(tmp_path))
+        return ga(), ga.store.stats()
+
+    first, first_stats = run()
+    second, second_stats = run()
+    assert second == first
+    assert second_stats["misses"] == 0
+    assert second_stats["filled"] == first_stats["filled"]
+
+
+def test_losing_a_creation_race_opens_the_published_table(tmp_path, monkeypatch):
+    winner = open_store(tmp_path)
+    winner.store([5], [42.0])
+    winner.flush()
+
+    # The second process checked for the table before the first one published it
+    monkeypatch.setattr(fitness_store.os.path, "exists", lambda path: False)
+    loser = open_store(tmp_path)
+    monkeypatch.undo()
+
+    assert loser.lookup([5])[0] == 42.0
+    loser.store([6], [43.0])
+    loser.flush()
+    assert winner.lookup([6])[0] == 43.0
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(winner.path),
+                                                   os.path.basename(winner.path)[:-4] + ".json"])
+
+
+def fill(directory, key, barrier):
+    barrier.wait()
+    store = open_store(directory)
+    store.store([key], [float(key)])
+    store.flush()
+
+
+def test_concurrent_creation_keeps_every_value(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(4)
+    processes = [context.Process(target=fill, args=(str(tmp_path), key, barrier)) for key in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+    np.testing.assert_array_equal(open_store(tmp_path).lookup(range(4)), [0.0, 1.0, 2.0, 3.0])
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".npy")]) == 1
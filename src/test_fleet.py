@@ -0,0 +1,60 @@
+import json
+
+from fleet import read_plants, run_fleet
+
+PLANTS = [
+    {"name": "motor", "num": [20], "den": [1, 32, 140, 0]},
+    {"name": "first_order", "num": [1], "den": [1, 1]},
+    # An empty gene range makes the Genetic Algorithm raise
+    {"name": "broken", "num": [5], "den": [1, 6, 11, 6], "ra": 5, "rb": 5},
+    {"name": "third_order", "num": [5], "den": [1, 6, 11, 6]},
+]
+
+CONFIG = {"population_size": 10, "max_generations": 5}
+
+
+def write_plants(tmp_path):
+    path = tmp_path / "plants.jsonl"
+    path.write_text("".join(json.dumps(plant) + "\n" for plant in PLANTS))
+    return str(path)
+
+
+def test_csv_and_jsonl_give_the_same_plants(tmp_path):
+    csv_path = tmp_path / "plants.csv"
+    csv_path.write_text("name,num,den,kpu\nmotor,20,1 32 140 0,224\nfirst_order,1,1 1,\n")
+
+    plants = list(read_plants(str(csv_path)))
+    assert plants == [
+        {"index": 0, "name": "motor", "num": [20.0], "den": [1.0, 32.0, 140.0, 0.0], "kpu": 224.0},
+        {"index": 1, "name": "first_order", "num": [1.0], "den": [1.0, 1.0]},
+    ]
+    assert [plant["name"] for plant in read_plants(write_plants(tmp_path))] == [plant["name"] for plant in PLANTS]
+
+
+def test_every_plant_yields_a_result_in_order(tmp_path):
+    output = tmp_path / "results.jsonl"
+    assert run_fleet(write_plants(tmp_path), str(output), workers=1, config=CONFIG) == len(PLANTS)
+
+    # One worker finishes the plants in the order they were read
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [result["index"] for result in results] == list(range(len(PLANTS)))
+    assert [result["name"] for result in results] == [plant["name"] for plant in PLANTS]
+
+    motor, first_order, broken, third_order = results
+    assert motor["ga"]["generations"] == 5 and motor["zn"] is not None
+    assert first_order["zn"] is None and "Ziegler-Nichols" in first_order["zn_error"]
+    assert "gene range" in broken["error"] and "ga" not in broken
+    assert third_order["ga"]["stop_reason"] in ("target", "generations")
+
+
+def test_results_do_not_depend_on_the_workers(tmp_path):
+    plants = write_plants(tmp_path)
+    serial, pooled = tmp_path / "serial.jsonl", tmp_path / "pooled.jsonl"
+    run_fleet(plants, str(serial), workers=1, config=CONFIG)
+    run_fleet(plants, str(pooled), workers=2, config=CONFIG)
+
+    def gains(path):
+        results = sorted((json.loads(line) for line in path.read_text().splitlines()), key=lambda r: r["index"])
+        return [(result.get("ga"), result.get("zn")) for result in results]
+
+    assert gains(serial) == gains(pooled)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from genetic_algorithm import GeneticAlgorithm
+from history import History
+from system_simulation import SystemDynamics
+
+
+def fill(history, n):
+    for generation in range(n):
+        history.append(generation, 2 * generation, 3 * generation, -generation)
+
+
+def test_directory_keeps_every_generation(tmp_path):
+    history = History(chunk_size=8, max_points=4, directory=str(tmp_path))
+    fill(history, 30)
+
+    values = history.values()
+    assert values.shape == (30, 4)
+    np.testing.assert_array_equal(values[:, 0], np.arange(30))
+    np.testing.assert_array_equal(History.load(str(tmp_path)), values)
+
+
+def test_downsampled_stream_is_bounded():
+    history = History(chunk_size=8, max_points=4)
+    fill(history, 30)
+
+    stream = history.downsampled()
+    assert len(stream["generation"]) <= 4
+    assert stream["generation"][-1] == 29
+    np.testing.assert_array_equal(stream["min"][:, 0], np.arange(len(stream["generation"])) * history.stride)
+    np.testing.assert_array_equal(stream["max"][:, 0], stream["generation"])
+    np.testing.assert_array_equal(stream["last"][:, 0], stream["generation"])
+
+
+def test_values_without_directory_ask_for_one():
+    history = History(chunk_size=8)
+    fill(history, 9)
+
+    assert not history.complete
+    with pytest.raises(ValueError, match="directory"):
+        history.values()
+
+
+def test_gain_lists_fall_back_to_the_downsampled_stream():
+    system = SystemDynamics([20], [1, 32, 140, 0])
+    ga = GeneticAlgorithm(system, 3, 5, 100, 0, 10, 1000, seed=0, observers=[], max_generations=20,
+                          history=History(chunk_size=8, max_points=4))
+    ga()
+
+    assert len(ga.fitness_list) == len(ga.history.downsampled()["generation"])
+    assert ga.fitness_list[-1] == ga.history.last["fitness"]
+
+
+def run(directory, generations, **options):
+    ga = GeneticAlgorithm(SystemDynamics([20], [1, 32, 140, 0]), 3, 5, 100, 0, 10, 1000, seed=0, observers=[],
+                          max_generations=generations, history=History(chunk_size=8, directory=directory),
+                          **options)
+    ga()
+    return ga
+
+
+def test_fresh_run_replaces_the_chunks_of_an_earlier_one(tmp_path):
+    directory = str(tmp_path / "history")
+    run(directory, 30)
+    fresh = run(directory, 12)
+
+    assert History.load(directory).shape == (12, 4)
+    np.testing.assert_array_equal(History.load(directory), fresh.history.values())
+
+
+def test_resumed_run_keeps_its_chunks(tmp_path):
+    directory = str(tmp_path / "history")
+    checkpoint = str(tmp_path / "run.npz")
+    reference = run(str(tmp_path / "reference"), 30)
+
+    run(directory, 12, checkpoint_path=checkpoint)
+    resumed = run(directory, 30, checkpoint_path=checkpoint)
+    np.testing.assert_array_equal(History.load(directory), reference.history.values())
+    np.testing.assert_array_equal(resumed.history.values(), reference.history.values())
@@ -0,0 +1,34 @@
+from islands import IslandModel, migration_sources
+from system_simulation import SystemDynamics
+
+system = SystemDynamics([20], [1, 32, 140, 0])
+
+
+def make_model(**options):
+    return IslandModel(system, 2, 3, 5, 100, 0, 10, 1000, migration_interval=5, seed=0, **options)
+
+
+def test_migration_sources():
+    assert migration_sources(0, 4, "ring") == [3]
+    assert migration_sources(2, 4, "full") == [0, 1, 3]
+    assert migration_sources(0, 1, "full") == []
+
+
+def test_run_is_reproducible():
+    first = make_model(max_generations=15)
+    second = make_model(max_generations=15)
+
+    assert first() == second()
+    assert first.stop_reason == "generations"
+    assert [island["generations"] for island in first.islands] == [15, 15]
+
+
+def test_island_budgets_stop_the_run():
+    model = make_model(max_generations=10000, max_evaluations=30)
+    model()
+
+    assert model.stop_reason == "evaluations"
+    for island in model.islands:
+        assert island["stop_reason"] == "evaluations"
+        # Steady state islands evaluate the initial population then two children per generation
+        assert island["generations"] == (30 - 10) // 2
@@ -1,21 +1,63 @@
+import numpy as np
+import pytest
+
+import ziegler_nichols
 from system_simulation import SystemDynamics
-from pid_controller import PIDController
-from ziegler_nichols import * 
-from plotting import plot_PID
-import matplotlib.pyplot as plt
+from ziegler_nichols import (find_ultimate_gain, find_ultimate_gains, ultimate_gain, ultimate_gains,
+                             ziegler_nichols_batch, ziegler_nichols_tuning)
 
 num = [20]
 den = [1, 32, 140, 0]
 system = SystemDynamics(num, den)
 
-kpu = 224  # Ultimate gain, obtained via Root Locus Calculation
+# Characteristic polynomial s^3 + 32 s^2 + 140 s + 20 Ku: marginally stable at Ku = 32 * 140 / 20,
+# oscillating at w = sqrt(140)
+KU = 224.0
+TU = 2 * np.pi / np.sqrt(140)
+
+
+def test_ultimate_gain_of_the_demo_plant():
+    assert ultimate_gain(num, den) == pytest.approx(KU, rel=1e-9)
+
+    kpu, Tu = find_ultimate_gain(system)
+    assert kpu == pytest.approx(KU, rel=1e-6)
+    assert Tu == pytest.approx(TU, rel=1e-6)
+    assert Tu == pytest.approx(0.531, abs=1e-3)
+
+
+def test_plant_stable_for_every_gain_has_no_ultimate_gain():
+    assert ultimate_gain([1], [1, 1]) is None
+    with pytest.raises(ValueError, match="Ziegler-Nichols"):
+        ziegler_nichols_tuning(SystemDynamics([1], [1, 1]))
+
+
+def test_routh_bisection_fallback_matches_the_phase_crossover(monkeypatch):
+    # 5 / ((s + 1)(s + 2)(s + 3)) oscillates at 5 Ku = 60
+    systems = [system, SystemDynamics([5], [1, 6, 11, 6]), SystemDynamics([1], [1, 1])]
+    crossover = find_ultimate_gains(systems)
+
+    monkeypatch.setattr(ziegler_nichols, "phase_crossover", lambda system: None)
+    fallback = find_ultimate_gains(systems)
+
+    np.testing.assert_allclose(fallback[0], crossover[0], rtol=1e-6)
+    np.testing.assert_allclose(fallback[1], crossover[1], rtol=1e-6)
+    np.testing.assert_allclose(fallback[0][:2], [KU, 12.0], rtol=1e-6)
+    assert np.isnan(fallback[0][2]) and np.isnan(fallback[1][2])
+
+
+def test_batch_matches_per_plant_calls():
+    plants = [(num, den), ([5], [1, 6, 11, 6]), ([1], [1, 3, 3, 1]), ([1], [1, 1]), ([2, 1], [1, 4, 6, 4, 1])]
+    systems = [SystemDynamics(*plant) for plant in plants]
 
-t, y = find_kpu_response(system, kpu)
+    gains = ultimate_gains(plants)
+    for (plant_num, plant_den), gain in zip(plants, gains):
+        single = ultimate_gain(plant_num, plant_den)
+        assert np.isnan(gain) if single is None else gain == single
 
-#plot the results   
-plt.plot(t, y)
-plt.title('PID Controller Tuning')
-plt.xlabel('Time')
-plt.ylabel('Response')
-plt.grid(True)
-plt.show()
+    for system_, tuned in zip(systems, ziegler_nichols_batch(systems)):
+        if tuned is None:
+            with pytest.raises(ValueError):
+                ziegler_nichols_tuning(system_)
+        else:
+            assert tuned == pytest.approx(ziegler_nichols_tuning(system_))
+    assert ziegler_nichols_batch(systems)[3] is None
@@ -0,0 +1,58 @@
+import control
+import numpy as np
+import pytest
+
+from margins import margin_options
+from system_simulation import SystemDynamics
+
+PLANTS = [([5], [1, 2, 5]), ([20], [1, 32, 140, 0]), ([1], [1, 3, 3, 1]), ([1, 1], [1, 2, 5])]
+
+
+def closed_loop_stable(num, den, kp, ki, kd):
+    characteristic = np.polyadd(np.polymul(den, [1, 0]), np.polymul(num, [kd, kp, ki]))
+    return np.all(np.roots(characteristic).real < 0)
+
+
+def dense_peak_sensitivity(num, den, kp, ki, kd):
+    s = 1j * np.logspace(-5, 6, 200001)
+    loop = (kp + ki / s + kd * s) * np.polyval(num, s) / np.polyval(den, s)
+    return np.max(1 / np.abs(1 + loop))
+
+
+@pytest.mark.parametrize("num, den", PLANTS)
+def test_margins_match_a_dense_grid_and_python_control(num, den):
+    system = SystemDynamics(num, den)
+    gains = np.random.default_rng(0).uniform(0, 20, (40, 3))
+    gain_margin, phase_margin, sensitivity = system.margins(gains)
+
+    checked = 0
+    for i, (kp, ki, kd) in enumerate(gains):
+        if not closed_loop_stable(num, den, kp, ki, kd):
+            continue
+        checked += 1
+        # Loops of relative degree 0, |S| tending to 1 / |1 + kd b0|, are the only ones that may stay below 1
+        strictly_proper = len(den) - len(num) > (kd != 0)
+        expected = dense_peak_sensitivity(num, den, kp, ki, kd)
+        assert sensitivity[i] == pytest.approx(max(expected, 1.0) if strictly_proper else expected, rel=1e-3)
+
+        loop = control.tf(np.polymul(num, [kd, kp, ki]), np.polymul(den, [1, 0]))
+        expected_gm, expected_pm, _, _, _, _ = control.stability_margins(loop)
+        assert gain_margin[i] == pytest.approx(expected_gm, rel=1e-3)
+        if np.isfinite(expected_pm):
+            assert phase_margin[i] == pytest.approx(abs(expected_pm), rel=1e-3)
+    assert checked
+
+
+def test_sensitivity_peak_of_a_damped_plant_is_one():
+    # |S| rises towards 1 at high frequency on 5 / (s^2 + 2 s + 5) with a mild controller
+    _, _, sensitivity = SystemDynamics([5], [1, 2, 5]).margins([[0.5, 0.1, 0.0]])
+    assert sensitivity[0] == pytest.approx(max(1.0, dense_peak_sensitivity([5], [1, 2, 5], 0.5, 0.1, 0.0)))
+
+
+def test_margin_penalty_needs_a_limit():
+    assert margin_options({"min_phase_margin": 45, "margin_penalty": 2}) == {"min_phase_margin": 45.0,
+                                                                             "margin_penalty": 2.0}
+    with pytest.raises(ValueError, match="margin_penalty"):
+        margin_options({"margin_penalty": 2})
+    with pytest.raises(ValueError, match="margin_penalty"):
+        margin_options({"margin_penalty": 2, "max_sensitivity": None})
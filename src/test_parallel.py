@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from calc_fitness import evaluate_population
+from genetic_algorithm import GeneticAlgorithm
+from parallel import ParallelEvaluator
+from system_simulation import SystemDynamics
+
+num = [20]
+den = [1, 32, 140, 0]
+
+
+@pytest.mark.parametrize("chunk_size", [None, 7])
+def test_parallel_matches_serial(chunk_size):
+    gains = np.random.default_rng(0).uniform(0, 100, (200, 3))
+    with ParallelEvaluator(num, den, 2, chunk_size=chunk_size, prescreen=True) as evaluator:
+        parallel = evaluator(gains)
+        assert evaluator(gains[:0]).shape == (0,)
+
+    assert np.array_equal(parallel, evaluate_population(num, den, gains, prescreen=True))
+
+
+def test_worker_count_does_not_change_the_run():
+    def run(workers):
+        ga = GeneticAlgorithm(SystemDynamics(num, den), 3, 5, 100, 0, 20, 1000, seed=0, observers=[],
+                              mode="generational", max_generations=3, workers=workers, parallel_threshold=1)
+        return ga(), ga.history.values()
+
+    serial_gains, serial_history = run(1)
+    pooled_gains, pooled_history = run(2)
+    assert pooled_gains == serial_gains
+    np.testing.assert_array_equal(pooled_history, serial_history)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from benchmark import TEST_PLANTS
+from calc_fitness import evaluate_population, fitness_upper_bound, FITNESS_BOUND_SLACK
+from screening import FitnessScreen
+
+
+@pytest.mark.parametrize("num, den, max_gain", TEST_PLANTS)
+def test_bound_covers_the_full_fitness(num, den, max_gain):
+    gains = np.random.default_rng(0).uniform(0, max_gain, (300, 3))
+    bound = fitness_upper_bound(num, den, gains)
+    fitness = evaluate_population(num, den, gains)
+
+    stable = np.isfinite(bound)
+    assert stable.any()
+    assert np.all(fitness[stable] <= bound[stable] + FITNESS_BOUND_SLACK)
+
+
+def test_fully_audited_screen_rejects_nothing_it_should_keep():
+    num, den, max_gain = TEST_PLANTS[0]
+    gains = np.random.default_rng(1).uniform(0, max_gain, (200, 3))
+
+    def evaluate(batch):
+        return evaluate_population(num, den, batch)
+
+    screen = FitnessScreen(audit_rate=1.0)
+    threshold = np.median(evaluate_population(num, den, gains))
+    _, full = screen.evaluate(num, den, gains, threshold, evaluate, np.random.default_rng(0))
+
+    assert full.all()
+    stats = screen.stats()
+    assert stats["audited"] == stats["rejected"] > 0
+    assert stats["false_rejections"] == 0
+    assert stats["bound_violations"] == 0
+
+
+def test_reported_misses_match_the_audits():
+    gains = np.random.default_rng(2).uniform(0, 5, (400, 3))
+    bounds = np.random.default_rng(3).uniform(0, 100, 400)
+    # A stand-in full evaluation exceeding the bound of a known share of the candidates
+    truth = bounds + np.where(np.arange(400) % 4 == 0, 30.0, -1.0)
+
+    class KnownBounds(FitnessScreen):
+        def bounds(self, num, den, gains):
+            return bounds
+
+    def evaluate(batch):
+        return truth[np.flatnonzero((gains[:, None] == batch[None]).all(axis=2).any(axis=1))]
+
+    screen = KnownBounds(audit_rate=0.5)
+    threshold = 60.0
+    fitness, full = screen.evaluate([1], [1, 1], gains, threshold, evaluate, np.random.default_rng(0))
+
+    rejected = bounds < threshold
+    audited = rejected & full
+    missed = audited & (truth >= threshold)
+    stats = screen.stats()
+    assert stats["rejected"] == np.count_nonzero(rejected)
+    assert stats["audited"] == np.count_nonzero(audited) > 0
+    assert stats["false_rejections"] == np.count_nonzero(missed) > 0
+    assert stats["error_rate"] == pytest.approx(np.count_nonzero(missed) / np.count_nonzero(audited))
+    assert stats["bound_violations"] == np.count_nonzero(~rejected & (truth > bounds))
+    np.testing.assert_array_equal(fitness[full], truth[full])
+    np.testing.assert_array_equal(fitness[~full], bounds[~full])
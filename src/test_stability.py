@@ -0,0 +1,38 @@
+import numpy as np
+
+from calc_fitness import evaluate_population, stability_mask
+from stability import routh_stable, UNSTABLE_FITNESS
+
+num = [20]
+den = [1, 32, 140, 0]
+
+
+def test_routh_stable_matches_the_roots():
+    rng = np.random.default_rng(0)
+    polynomials = np.column_stack([np.ones(500), rng.uniform(-2, 10, (500, 4))])
+    expected = [np.all(np.roots(p).real < 0) for p in polynomials]
+    np.testing.assert_array_equal(routh_stable(polynomials), expected)
+
+
+def test_roots_on_the_imaginary_axis_are_unstable():
+    # s^2 + 1 and s (s + 1)
+    assert not routh_stable([[1, 0, 1]]).any()
+    assert not routh_stable([[1, 1, 0]]).any()
+    assert routh_stable([[1, 2, 1]]).all()
+
+
+def test_stability_mask_matches_the_closed_loop_poles():
+    gains = np.random.default_rng(1).uniform(0, 100, (200, 3))
+    expected = [np.all(np.roots(np.polyadd(np.polymul(den, [1, 0]), np.polymul(num, [kd, kp, ki]))).real < 0)
+                for kp, ki, kd in gains]
+    np.testing.assert_array_equal(stability_mask(num, den, gains), expected)
+
+
+def test_prescreen_only_changes_unstable_candidates():
+    gains = np.random.default_rng(2).uniform(0, 100, (100, 3))
+    stable = stability_mask(num, den, gains)
+    screened = evaluate_population(num, den, gains, prescreen=True)
+
+    assert (~stable).any()
+    np.testing.assert_array_equal(screened[~stable], UNSTABLE_FITNESS)
+    np.testing.assert_allclose(screened[stable], evaluate_population(num, den, gains[stable]))
@@ -0,0 +1,25 @@
+import control
+import pytest
+
+from step_analysis import StepAnalysis
+
+
+def test_integral_criteria_of_a_first_order_loop():
+    # Error exp(-t): IAE = 1, ISE = 1/2, ITAE = 1
+    analysis = StepAnalysis.simulate(control.tf([1], [1, 1]))
+
+    assert analysis.iae == pytest.approx(1, rel=1e-2)
+    assert analysis.ise == pytest.approx(0.5, rel=1e-2)
+    assert analysis.itae == pytest.approx(1, rel=2e-2)
+    assert analysis.criterion("iae") == analysis.iae
+
+
+def test_metrics_match_step_info():
+    loop = control.tf([20 * 5, 20 * 50, 20 * 10], [1, 32, 140 + 100, 1000, 200])
+    analysis = StepAnalysis.simulate(loop)
+    info = control.step_info(loop)
+
+    assert analysis.rise_time == pytest.approx(info["RiseTime"])
+    assert analysis.overshoot == pytest.approx(info["Overshoot"])
+    assert analysis.settling_time == pytest.approx(info["SettlingTime"])
+    assert analysis.steady_state == pytest.approx(info["SteadyStateValue"])
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from benchmark import benchmark_surrogate
+from genetic_algorithm import GeneticAlgorithm
+from surrogate import Surrogate
+from system_simulation import SystemDynamics
+
+
+def test_knn_prediction_interpolates_the_archive():
+    surrogate = Surrogate(proposals=4, neighbours=2, min_archive=2)
+    surrogate.add([[0.0, 0.0], [1.0, 1.0]], [0.0, 10.0])
+
+    assert surrogate.ready
+    np.testing.assert_allclose(surrogate.predict([[0.0, 0.0], [0.5, 0.5], [1.0, 1.0]]), [0.0, 5.0, 10.0],
+                               atol=1e-9)
+
+
+def test_select_counts_screened_out_candidates():
+    surrogate = Surrogate(proposals=4, neighbours=2, min_archive=2)
+    surrogate.add([[0.0], [1.0]], [0.0, 10.0])
+    chosen = surrogate.select(np.array([[0.1], [0.9], [0.5], [0.2]]), 2)
+
+    assert chosen.tolist() == [1, 2]
+    stats = surrogate.stats()
+    assert stats["proposed"] == 4
+    assert stats["simulated"] == 2
+    assert stats["screened_out"] == 2
+    assert "saved" not in stats
+
+
+def test_benchmark_saved_is_relative_to_the_plain_run():
+    rows = benchmark_surrogate([20], [1, 32, 140, 0], models=("none", "knn"), proposals=4, seeds=range(2),
+                               population_size=10, target=1000, max_evaluations=100)
+
+    none, knn = rows
+    assert none["saved"] == 0
+    assert knn["saved"] == none["simulations"] - knn["simulations"]
+
+
+def test_empty_gene_range_is_rejected():
+    with pytest.raises(ValueError, match="gene range"):
+        GeneticAlgorithm(SystemDynamics([20], [1, 32, 140, 0]), 3, 5, 10, 10, 10, surrogate=Surrogate())
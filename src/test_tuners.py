@@ -0,0 +1,34 @@
+import pytest
+
+from system_simulation import SystemDynamics
+from tuners import CMAES, DifferentialEvolution, RealCodedTuner, Tuner
+
+system = SystemDynamics([20], [1, 32, 140, 0])
+
+
+def test_interfaces_are_abstract():
+    with pytest.raises(TypeError):
+        Tuner()
+    with pytest.raises(TypeError):
+        RealCodedTuner(system, 3, 100, 0, 8)
+
+
+@pytest.mark.parametrize("tuner_class", [DifferentialEvolution, CMAES])
+def test_tuner_stays_in_bounds_and_is_reproducible(tuner_class):
+    first = tuner_class(system, 3, 100, 0, 8, 1000, seed=0, observers=[], max_generations=5)
+    second = tuner_class(system, 3, 100, 0, 8, 1000, seed=0, observers=[], max_generations=5)
+
+    gains = first()
+    assert gains == second()
+    assert all(0 <= gain <= 100 for gain in gains)
+    assert first.stop_reason == "generations"
+    assert first.evaluations == 5 * 8
+    assert first.history.last["fitness"] == first.history.values("fitness").max()
+
+
+def test_worker_pool_does_not_change_the_result():
+    serial = DifferentialEvolution(system, 3, 100, 0, 8, 1000, seed=1, observers=[], max_generations=3)
+    pooled = DifferentialEvolution(system, 3, 100, 0, 8, 1000, seed=1, observers=[], max_generations=3, workers=2,
+                                   parallel_threshold=1)
+    assert serial() == pooled()
+    assert pooled._evaluator is None
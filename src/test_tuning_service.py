@@ -0,0 +1,50 @@
+import asyncio
+
+from tuning_client import TuningClient
+from tuning_service import Job, TuningService
+
+PLANT = {"name": "demo", "num": [20], "den": [1, 32, 140, 0], "kpu": 224.0}
+CONFIG = {"population_size": 10, "minimum_target": 1000, "max_generations": 40}
+
+
+def test_events_arrive_before_the_job_finishes():
+    async def scenario():
+        service = TuningService(port=0, workers=1)
+        await service.start()
+        try:
+            client = TuningClient(f"http://127.0.0.1:{service.port}")
+            loop = asyncio.get_running_loop()
+            submitted = await loop.run_in_executor(None, client.submit, PLANT["num"], PLANT["den"],
+                                                   PLANT["kpu"], CONFIG, 0, PLANT["name"])
+            events = await loop.run_in_executor(None, lambda: list(client.events(submitted["id"])))
+            status = await loop.run_in_executor(None, client.status, submitted["id"])
+            again = await loop.run_in_executor(None, client.submit, PLANT["num"], PLANT["den"],
+                                               PLANT["kpu"], CONFIG, 0, PLANT["name"])
+            return submitted, events, status, again
+        finally:
+            await service.stop()
+
+    submitted, events, status, again = asyncio.run(scenario())
+
+    names = [event["event"] for event in events]
+    assert not submitted["cached"]
+    assert names[0] == "running"
+    assert names[-1] == "done"
+    assert names.count("done") == 1
+    assert "improvement" in names
+    assert status["status"] == "done"
+    assert status["events"] == len(events)
+    assert status["result"]["ga"]["generations"] == CONFIG["max_generations"]
+    assert again["cached"] and again["id"] == submitted["id"] and again["status"] == "done"
+
+
+def test_late_running_event_keeps_the_job_finished():
+    async def scenario():
+        job = Job("1", "key", PLANT, CONFIG)
+        await job.finish({"ga": None})
+        await job.add_event({"event": "running"})
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == "done"
+    assert job.finished()
@@ -0,0 +1,54 @@
+import numpy as np
+
+from calc_fitness import evaluate_population
+from stability import UNSTABLE_FITNESS
+from uncertainty import perturbed_plants, scenario_options
+
+num = [20]
+den = [1, 32, 140, 0]
+
+
+def test_scenarios_are_reproducible():
+    first = perturbed_plants(num, den, spread=0.2, n_scenarios=10, seed=1)
+    assert first == perturbed_plants(num, den, spread=0.2, n_scenarios=10, seed=1)
+    assert first != perturbed_plants(num, den, spread=0.2, n_scenarios=10, seed=2)
+    assert len(first) == 10
+
+    # The integrator and the order are kept, and the velocity gain stays within the spread
+    for p_num, p_den in first:
+        assert len(p_den) == len(den) and p_den[-1] == 0
+        assert 0.8 * 20 / 140 <= p_num[-1] / p_den[-2] <= 1.2 * 20 / 140
+
+    # A gain factor and two real poles away from the origin give 2 ** 3 corners
+    assert len(perturbed_plants(num, den, spread=0.2, method="corners")) == 8
+
+
+def test_aggregates_bound_the_nominal_fitness():
+    scenarios = perturbed_plants(num, den, spread=0.2, n_scenarios=8, seed=0)
+    gains = np.random.default_rng(0).uniform(0, 50, (40, 3))
+
+    nominal = evaluate_population(num, den, gains, prescreen=True)
+    worst = evaluate_population(num, den, gains, **scenario_options(scenarios, "worst"))
+    mean = evaluate_population(num, den, gains, **scenario_options(scenarios, "mean"))
+    per_plant = np.array([nominal] + [evaluate_population(*plant, gains, prescreen=True) for plant in scenarios])
+
+    assert np.all(worst <= mean)
+    assert np.all(worst <= nominal)
+    np.testing.assert_allclose(worst, per_plant.min(axis=0))
+    np.testing.assert_allclose(mean, per_plant.mean(axis=0))
+
+
+def test_unstable_scenario_gives_the_unstable_fitness():
+    # Ku is 224 on the nominal plant; Kp = 160 is stable there but not on the corner with the larger gain
+    # and the slower poles
+    scenarios = perturbed_plants(num, den, spread=0.2, method="corners")
+    gains = [[160.0, 1.0, 0.0], [20.0, 1.0, 0.0]]
+
+    nominal = evaluate_population(num, den, gains, prescreen=True)
+    worst = evaluate_population(num, den, gains, **scenario_options(scenarios, "worst"))
+    mean = evaluate_population(num, den, gains, **scenario_options(scenarios, "mean"))
+
+    assert nominal[0] > UNSTABLE_FITNESS
+    assert worst[0] == UNSTABLE_FITNESS
+    assert UNSTABLE_FITNESS < mean[0] < nominal[0]
+    assert worst[1] > UNSTABLE_FITNESS
@@ -0,0 +1,529 @@
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from calc_fitness import evaluate_population, stability_mask
+from events import ConsoleObserver
+from history import History
+from parallel import ParallelEvaluator
+from profiling import Profiler, NULL_PROFILER
+from stability import UNSTABLE_FITNESS
+from step_analysis import StepAnalysis
+from uncertainty import scenario_options
+from margins import margin_options
+
+
+class Tuner(ABC):
+    """
+    Interface shared by the PID tuners: calling a tuner runs it until the best fitness exceeds the target
+    or a budget runs out, and returns the best (Kp, Ki, Kd).
+
+    The base class holds what every tuner reports in the same way: the budgets and their stop reason,
+    the observers receiving the progress events, the History of the best individual of each generation
+    and the Profiler. It also scores batches of gains, with the stability screen and the worker pool
+    configured by the subclass through num, den, fitness_options, stability_screen, workers and
+    parallel_threshold.
+
+    Attributes:
+    system (SystemDynamics): The system to be controlled.
+    target (float): Minimum fitness target for termination.
+    history (History): Best gains and fitness of every generation.
+    observers (list): Receivers of the start, generation, improvement and finish events.
+    profiler (Profiler): Phase times and counters of the run, or a NullProfiler.
+    generation (int): Number of generations evolved.
+    evaluations (int): Number of individuals evaluated.
+    stop_reason (str): Why the last run stopped: "target", "generations", "evaluations", "time" or "stagnation".
+    """
+
+    # Statistics shown by ConsoleObserver; tuners without a cache, table, surrogate or stability screen keep these
+    cache = None
+    store = None
+    screen = None
+    surrogate = None
+    stability_screen = False
+    unstable_skipped = 0
+    precomputed = 0
+    _analysis = None
+    _evaluator = None
+
+    def _init_tuner(self, minimum_target, observers, history, profile, profiler, max_generations,
+                    max_evaluations, max_seconds, stagnation):
+        """
+        Set the reporting and budget attributes shared by every tuner.
+        """
+        self.target = minimum_target
+        self.observers = list(observers) if observers is not None else [ConsoleObserver()]
+        self.history = history if history is not None else History()
+        self.profiler = profiler if profiler is not None else (Profiler() if profile else NULL_PROFILER)
+        self.max_generations = max_generations
+        self.max_evaluations = max_evaluations
+        self.max_seconds = max_seconds
+        self.stagnation = stagnation
+        self._reset_run()
+
+    def _reset_run(self):
+        """
+        Clear the counters of a previous run.
+        """
+        self.generation = 0
+        self.evaluations = 0
+        self.stop_reason = None
+        self._best_fitness = -np.inf
+        self._stagnant = 0
+        self._elapsed = 0.0
+        self._started = None
+
+    @abstractmethod
+    def __call__(self, *args, **kwargs):
+        """
+        Run the tuner until the target is reached or a budget runs out.
+
+        Returns:
+        tuple: Kp, Ki and Kd of the best candidate found.
+        """
+
+    def _evaluate_gains(self, gains):
+        """
+        Score a batch of gains, rejecting unstable loops first when the stability screen is enabled.
+        """
+        if not self.stability_screen:
+            return self._simulate_gains(gains)
+
+        stable = stability_mask(self.num, self.den, gains)
+        self.unstable_skipped += int(np.count_nonzero(~stable))
+        self.profiler.count("unstable_skipped", int(np.count_nonzero(~stable)))
+        fitness = np.full(len(gains), UNSTABLE_FITNESS)
+        if stable.any():
+            fitness[stable] = self._simulate_gains(gains[stable])
+        return fitness
+
+    def _simulate_gains(self, gains):
+        """
+        Simulate a batch of gains, on the worker pool when it is enabled and the batch is large enough.
+        """
+        if self.workers == 1 or len(gains) < self.parallel_threshold:
+            return evaluate_population(self.num, self.den, gains, profiler=self.profiler, **self.fitness_options)
+
+        if self._evaluator is None:
+            self._evaluator = ParallelEvaluator(self.num, self.den, self.workers, **self.fitness_options)
+        with self.profiler.phase("simulation"):
+            fitness = self._evaluator(gains)
+        self.profiler.record_simulations(fitness)
+        return fitness
+
+    def close(self):
+        """
+        Shut down the fitness worker pool, if one was started.
+        """
+        if self._evaluator is not None:
+            self._evaluator.close()
+            self._evaluator = None
+
+    @property
+    def analysis(self):
+        """
+        StepAnalysis: Step response of the best gains of the last run, simulated on first access and
+        shared by every report, or None before a run.
+        """
+        last = self.history.last
+        if last is None:
+            return None
+        gains = (last["kp"], last["ki"], last["kd"])
+        if self._analysis is None or self._analysis[0] != gains:
+            self._analysis = (gains, StepAnalysis.simulate(self.system.closed_loop(*gains)))
+        return self._analysis[1]
+
+    def _record_best(self, fitness):
+        """
+        Track the generations without improvement of the best fitness.
+
+        Returns:
+        bool: Whether the best fitness improved.
+        """
+        if fitness > self._best_fitness:
+            self._best_fitness = fitness
+            self._stagnant = 0
+            return True
+        self._stagnant += 1
+        return False
+
+    def _stop_reason(self, fitness, generations):
+        """
+        Check the target and the budgets.
+
+        Parameters:
+        fitness (float): The best fitness.
+        generations (int): Number of generations completed.
+
+        Returns:
+        str: The reason to stop, or None to continue.
+        """
+        if fitness > self.target:
+            return "target"
+        if self.max_generations is not None and generations >= self.max_generations:
+            return "generations"
+        if self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            return "evaluations"
+        if self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+            return "time"
+        if self.stagnation is not None and self._stagnant >= self.stagnation:
+            return "stagnation"
+        return None
+
+    def elapsed(self):
+        """
+        Returns:
+        float: Wall-clock seconds spent evolving, including the sessions before a resume.
+        """
+        if self._started is None:
+            return self._elapsed
+        return self._elapsed + time.perf_counter() - self._started
+
+    def _report(self, generation, best):
+        """
+        Send the generation and improvement events and record the best individual in the history.
+        """
+        for observer in self.observers:
+            observer.on_generation(self, generation, best)
+        if self._stagnant == 0:
+            for observer in self.observers:
+                observer.on_improvement(self, generation, best)
+
+        # Store the generation and the parameters
+        self.history.append(best["gen"][0], best["gen"][1], best["gen"][2], best["fitness"])
+
+
+class RealCodedTuner(Tuner):
+    """
+    Base of the tuners searching the gains as real numbers, one whole generation at a time.
+
+    Subclasses implement ask, proposing the next generation as an array of gains, and tell, receiving
+    its fitness. Gains are searched in the box [min(ra, rb), max(ra, rb)] of the GeneticAlgorithm, without
+    the resolution limit of the binary encoding.
+
+    Attributes:
+    num (list): Numerator coefficients of the system transfer function.
+    den (list): Denominator coefficients of the system transfer function.
+    n_var (int): Number of gains.
+    lower (float): Lower bound of every gain.
+    upper (float): Upper bound of every gain.
+    population_size (int): Number of candidates per generation.
+    rng (np.random.Generator): Random number generator.
+    """
+
+    def __init__(self, system, n_var, ra, rb, population_size, minimum_target=75, seed=None, workers=1,
+                 parallel_threshold=64, fitness_backend="simulation", stability_screen=True, scenarios=None,
+                 aggregate="worst", margins=None, screen=None, observers=None,
+                 history=None, profile=False, profiler=None, max_generations=None, max_evaluations=None,
+                 max_seconds=None, stagnation=None):
+        """
+        Parameters:
+        system (SystemDynamics): The system to be controlled.
+        n_var (int): Number of gains.
+        ra (float): One bound of the gain range.
+        rb (float): The other bound of the gain range.
+        population_size (int): Number of candidates per generation.
+        minimum_target (float): Minimum fitness target for termination. Default is 75.
+        seed (int): Seed for the random number generator. Default is None.
+        workers (int): Number of worker processes for fitness evaluation, see GeneticAlgorithm. Default is 1.
+        parallel_threshold (int): Smallest batch sent to the worker pool. Default is 64.
+        fitness_backend (str): Step response metrics backend, "simulation" or "analytic". Default is "simulation".
+        stability_screen (bool): Give unstable candidates UNSTABLE_FITNESS without simulating them. Default is True.
+        scenarios (sequence): Perturbed plants scored with the nominal one, see GeneticAlgorithm. Default is None.
+        aggregate (str): "worst" or "mean" fitness over the plants. Default is "worst".
+        margins (dict): Gain margin, phase margin and Ms limits, see GeneticAlgorithm. Default is None.
+        screen (FitnessScreen): Coarse first stage of the evaluation, used by tuners that know the fitness
+            a candidate must reach to be kept. Default is None.
+        observers (list): Progress observers, see GeneticAlgorithm. Default is a ConsoleObserver.
+        history (History): Recorder of the best individual of each generation. Default is a new History.
+        profile (bool): Record phase times and counters in self.profiler. Default is False.
+        profiler (Profiler): Existing profiler to record into. Enables profiling when given.
+        max_generations (int): Generation budget. Default is None.
+        max_evaluations (int): Evaluation budget. Default is None.
+        max_seconds (float): Time budget. Default is None.
+        stagnation (int): Stop after this many generations without improvement. Default is None.
+        """
+        self.system = system
+        self.num = system.num
+        self.den = system.den
+        self.n_var = n_var
+        self.lower = float(min(ra, rb))
+        self.upper = float(max(ra, rb))
+        self.population_size = population_size
+        self.rng = np.random.default_rng(seed)
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self.fitness_options = {"backend": fitness_backend, **scenario_options(scenarios, aggregate),
+                                **margin_options(margins)}
+        self.stability_screen = stability_screen
+        self.unstable_skipped = 0
+        self.screen = screen
+        self._evaluator = None
+        self._init_tuner(minimum_target, observers, history, profile, profiler, max_generations,
+                         max_evaluations, max_seconds, stagnation)
+
+    @abstractmethod
+    def ask(self):
+        """
+        Propose the next generation.
+
+        Returns:
+        np.ndarray: (N, n_var) array of gains within the bounds.
+        """
+
+    @abstractmethod
+    def tell(self, gains, fitness):
+        """
+        Update the search with the fitness of the generation returned by ask.
+
+        Parameters:
+        gains (np.ndarray): (N, n_var) gains returned by ask.
+        fitness (np.ndarray): (N,) fitness of each candidate.
+        """
+
+    def threshold(self):
+        """
+        Fitness each candidate of the next generation must reach to be kept, for the screen.
+
+        Returns:
+        float or np.ndarray: The threshold, or None when every candidate matters.
+        """
+        return None
+
+    def evaluate(self, gains, threshold=None):
+        """
+        Score a batch of gains in one bulk evaluation.
+
+        Parameters:
+        gains (np.ndarray): (N, n_var) array of gains.
+        threshold (float or np.ndarray): Fitness each candidate must reach to be kept, used by the screen.
+            Default is None, to evaluate every candidate in full.
+
+        Returns:
+        np.ndarray: (N,) fitness values, the coarse bound for candidates rejected by the screen.
+        """
+        self.evaluations += len(gains)
+        self.profiler.count("evaluations", len(gains))
+        with self.profiler.phase("evaluation"):
+            if self.screen is not None and threshold is not None:
+                fitness, exact = self.screen.evaluate(self.num, self.den, gains, threshold, self._evaluate_gains,
+                                                      self.rng)
+                self.profiler.count("screen_rejected", int(np.count_nonzero(~exact)))
+                return fitness
+            return self._evaluate_gains(gains)
+
+    def __call__(self):
+        """
+        Run the tuner until the target is reached or a budget runs out.
+
+        Returns:
+        tuple: Kp, Ki and Kd of the best candidate found.
+        """
+        try:
+            best = self._run()
+        finally:
+            self.close()
+
+        self.history.flush()
+        for observer in self.observers:
+            observer.on_finish(self, best)
+        return tuple(best["gen"])
+
+    def _run(self):
+        self._reset_run()
+        self.history.reset()
+        self.unstable_skipped = 0
+        self._started = time.perf_counter()
+        for observer in self.observers:
+            observer.on_start(self)
+
+        best = None
+        while self.stop_reason is None:
+            start = time.perf_counter()
+            with self.profiler.phase("proposal"):
+                gains = self.ask()
+            fitness = self.evaluate(gains, self.threshold())
+            with self.profiler.phase("update"):
+                self.tell(gains, fitness)
+
+            i = int(np.argmax(fitness))
+            if best is None or fitness[i] > best["fitness"]:
+                best = {"gen": gains[i].tolist(), "fitness": float(fitness[i]), "chromosome": None}
+
+            with self.profiler.phase("report"):
+                self._record_best(best["fitness"])
+                self.stop_reason = self._stop_reason(best["fitness"], self.generation + 1)
+                self._report(self.generation, best)
+            self.generation += 1
+
+            self.profiler.observe("generation_seconds", time.perf_counter() - start)
+            self.profiler.count("generations")
+
+        return best
+
+    def _uniform(self, size):
+        """
+        Uniform random gains within the bounds.
+        """
+        return self.rng.uniform(self.lower, self.upper, (size, self.n_var))
+
+
+class DifferentialEvolution(RealCodedTuner):
+    """
+    Differential evolution (DE/rand/1/bin) over real-valued gains.
+
+    Each generation, every member of the population gets a trial vector built from three other random
+    members, x_r1 + F (x_r2 - x_r3), mixed with its own coordinates by binomial crossover; the trial
+    replaces the member when it is at least as fit. The whole trial population is proposed and scored
+    as one array.
+
+    Attributes:
+    differential_weight (float): Scale F of the difference vector.
+    crossover_rate (float): Probability CR of taking each coordinate from the mutant.
+    """
+
+    def __init__(self, system, n_var, ra, rb, population_size, minimum_target=75, differential_weight=0.7,
+                 crossover_rate=0.9, **options):
+        """
+        Parameters:
+        system (SystemDynamics): The system to be controlled.
+        n_var (int): Number of gains.
+        ra (float): One bound of the gain range.
+        rb (float): The other bound of the gain range.
+        population_size (int): Population size, at least 4.
+        minimum_target (float): Minimum fitness target for termination. Default is 75.
+        differential_weight (float): Scale F of the difference vector. Default is 0.7.
+        crossover_rate (float): Crossover probability CR. Default is 0.9.
+        **options: Further RealCodedTuner arguments.
+        """
+        if population_size < 4:
+            raise ValueError("Differential evolution needs a population of at least 4")
+        super().__init__(system, n_var, ra, rb, population_size, minimum_target, **options)
+        self.differential_weight = differential_weight
+        self.crossover_rate = crossover_rate
+
+    def _reset_run(self):
+        super()._reset_run()
+        self.population = None
+        self.fitness = None
+
+    def ask(self):
+        if self.population is None:
+            return self._uniform(self.population_size)
+
+        n, d = self.population.shape
+        # Three distinct partners per member, none of them the member itself
+        keys = self.rng.random((n, n))
+        keys[np.arange(n), np.arange(n)] = np.inf
+        r1, r2, r3 = np.argpartition(keys, 3, axis=1)[:, :3].T
+
+        mutant = self.population[r1] + self.differential_weight * (self.population[r2] - self.population[r3])
+        cross = self.rng.random((n, d)) < self.crossover_rate
+        cross[np.arange(n), self.rng.integers(0, d, n)] = True
+        trial = np.where(cross, mutant, self.population)
+        return np.clip(trial, self.lower, self.upper)
+
+    def threshold(self):
+        # A trial vector only matters if it is at least as fit as the member it competes with
+        return self.fitness
+
+    def tell(self, gains, fitness):
+        if self.population is None:
+            self.population = gains.copy()
+            self.fitness = np.asarray(fitness, dtype=float).copy()
+            return
+        better = fitness >= self.fitness
+        self.population[better] = gains[better]
+        self.fitness[better] = fitness[better]
+
+
+class CMAES(RealCodedTuner):
+    """
+    Covariance matrix adaptation evolution strategy over real-valued gains.
+
+    Candidates are drawn from a multivariate normal distribution in coordinates normalized to [0, 1];
+    the mean moves towards the weighted fittest half of each generation, while the step size and the
+    covariance matrix adapt to the successful steps (cumulative step-size adaptation with rank-one and
+    rank-mu covariance updates). Candidates outside the bounds are clipped onto them.
+
+    Attributes:
+    sigma (float): Current step size, in normalized coordinates.
+    mean (np.ndarray): Current mean, in normalized coordinates.
+    """
+
+    def __init__(self, system, n_var, ra, rb, population_size, minimum_target=75, sigma=0.3, **options):
+        """
+        Parameters:
+        system (SystemDynamics): The system to be controlled.
+        n_var (int): Number of gains.
+        ra (float): One bound of the gain range.
+        rb (float): The other bound of the gain range.
+        population_size (int): Number of candidates per generation (lambda), at least 2.
+        minimum_target (float): Minimum fitness target for termination. Default is 75.
+        sigma (float): Initial step size as a fraction of the gain range. Default is 0.3.
+        **options: Further RealCodedTuner arguments.
+        """
+        if population_size < 2:
+            raise ValueError("CMA-ES needs at least 2 candidates per generation")
+        self.sigma0 = sigma
+        super().__init__(system, n_var, ra, rb, population_size, minimum_target, **options)
+
+        n = n_var
+        mu = population_size // 2
+        weights = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+        self.weights = weights / weights.sum()
+        self.mu_eff = 1 / np.sum(self.weights**2)
+        self.c_sigma = (self.mu_eff + 2) / (n + self.mu_eff + 5)
+        self.d_sigma = 1 + 2 * max(0, np.sqrt((self.mu_eff - 1) / (n + 1)) - 1) + self.c_sigma
+        self.c_c = (4 + self.mu_eff / n) / (n + 4 + 2 * self.mu_eff / n)
+        self.c_1 = 2 / ((n + 1.3)**2 + self.mu_eff)
+        self.c_mu = min(1 - self.c_1, 2 * (self.mu_eff - 2 + 1 / self.mu_eff) / ((n + 2)**2 + self.mu_eff))
+        self.chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n**2))
+
+    def _reset_run(self):
+        super()._reset_run()
+        n = self.n_var
+        self.mean = self.rng.random(n)
+        self.sigma = self.sigma0
+        self.cov = np.eye(n)
+        self.p_sigma = np.zeros(n)
+        self.p_c = np.zeros(n)
+        self._steps = None
+
+    def ask(self):
+        eigenvalues, basis = np.linalg.eigh(self.cov)
+        self._sqrt_cov = basis * np.sqrt(np.maximum(eigenvalues, 1e-20))
+        self._inv_sqrt_cov = (basis / np.sqrt(np.maximum(eigenvalues, 1e-20))) @ basis.T
+
+        z = self.rng.standard_normal((self.population_size, self.n_var))
+        x = np.clip(self.mean + self.sigma * z @ self._sqrt_cov.T, 0.0, 1.0)
+        self._steps = (x - self.mean) / self.sigma
+        return self.lower + (self.upper - self.lower) * x
+
+    def tell(self, gains, fitness):
+        n = self.n_var
+        order = np.argsort(-np.asarray(fitness), kind="stable")[:len(self.weights)]
+        step = self.weights @ self._steps[order]
+        self.mean = self.mean + self.sigma * step
+
+        self.p_sigma = (1 - self.c_sigma) * self.p_sigma + \
+            np.sqrt(self.c_sigma * (2 - self.c_sigma) * self.mu_eff) * self._inv_sqrt_cov @ step
+        norm = np.linalg.norm(self.p_sigma)
+        # Heaviside h_sigma: the rank-one path only grows while the step size is not increasing quickly
+        h_sigma = norm / np.sqrt(1 - (1 - self.c_sigma)**(2 * (self.generation + 1))) < (1.4 + 2 / (n + 1)) * self.chi_n
+        self.p_c = (1 - self.c_c) * self.p_c + h_sigma * np.sqrt(self.c_c * (2 - self.c_c) * self.mu_eff) * step
+
+        selected = self._steps[order]
+        rank_mu = (selected * self.weights[:, None]).T @ selected
+        self.cov = (1 - self.c_1 - self.c_mu) * self.cov + \
+            self.c_1 * (np.outer(self.p_c, self.p_c) + (1 - h_sigma) * self.c_c * (2 - self.c_c) * self.cov) + \
+            self.c_mu * rank_mu
+        self.sigma *= np.exp((self.c_sigma / self.d_sigma) * (norm / self.chi_n - 1))
+        self.sigma = min(self.sigma, 1.0)
+
+
+TUNERS = {
+    "de": DifferentialEvolution,
+    "cmaes": CMAES,
+}
@@ -0,0 +1,82 @@
+import json
+import urllib.request
+
+# Only the standard library is imported, so tools calling the service do not load python-control
+
+
+class TuningClient:
+    """
+    Client of the local tuning service.
+
+    Attributes:
+    url (str): Base URL of the service.
+    """
+
+    def __init__(self, url="http://127.0.0.1:8765"):
+        """
+        Parameters:
+        url (str): Base URL of the service. Default is http://127.0.0.1:8765.
+        """
+        self.url = url.rstrip("/")
+
+    def _request(self, path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode()
+        request = urllib.request.Request(self.url + path, data=data, headers={"Content-Type": "application/json"})
+        return urllib.request.urlopen(request)
+
+    def submit(self, num, den, kpu=None, config=None, seed=0, name="plant"):
+        """
+        Submit a tuning job.
+
+        Parameters:
+        num (list): Numerator coefficients of the plant.
+        den (list): Denominator coefficients of the plant.
+        kpu (float): Ultimate gain for Ziegler-Nichols. Default is None, to find it from the plant.
+        config (dict): Genetic Algorithm settings, see fleet.DEFAULT_CONFIG. Default is None.
+        seed (int): Seed of the Genetic Algorithm. Default is 0.
+        name (str): Name of the plant. Default is "plant".
+
+        Returns:
+        dict: The job, with its "id", "status" and whether it was "cached".
+        """
+        plant = {"name": name, "num": list(num), "den": list(den), "kpu": kpu}
+        with self._request("/jobs", {"plant": plant, "config": config or {}, "seed": seed}) as response:
+            return json.load(response)
+
+    def status(self, job_id):
+        """
+        Returns:
+        dict: Status of a job, with its result once done.
+        """
+        with self._request(f"/jobs/{job_id}") as response:
+            return json.load(response)
+
+    def events(self, job_id):
+        """
+        Stream the progress events of a job until it finishes.
+
+        Yields:
+        dict: One event: "running", "generation", "improvement", then "done" or "failed".
+        """
+        with self._request(f"/jobs/{job_id}/events") as response:
+            for line in response:
+                yield json.loads(line)
+
+    def result(self, job_id):
+        """
+        Wait for a job to finish.
+
+        Returns:
+        dict: The final status of the job, with its result or error.
+        """
+        for _ in self.events(job_id):
+            pass
+        return self.status(job_id)
+
+    def health(self):
+        """
+        Returns:
+        dict: Service statistics.
+        """
+        with self._request("/health") as response:
+            return json.load(response)
@@ -0,0 +1,365 @@
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+
+from events import Observer
+from fleet import resolve_config, tune_plant
+
+# Seconds between two generation events streamed from a running job; improvements are always streamed
+PROGRESS_INTERVAL = 0.5
+
+# Queue receiving the progress events of the worker processes, set by _init_worker
+_events = None
+
+
+def _init_worker(events):
+    global _events
+    _events = events
+
+
+class _QueueObserver(Observer):
+    """
+    Forwards the progress of a job running in a worker process to the service, rate limiting generations.
+    """
+
+    def __init__(self, job_id, interval=PROGRESS_INTERVAL):
+        self.job_id = job_id
+        self.interval = interval
+        self._last = None
+
+    def _send(self, event, generation, best):
+        kp, ki, kd = (float(gain) for gain in best["gen"])
+        _events.put((self.job_id, {"event": event, "generation": generation, "kp": kp, "ki": ki, "kd": kd,
+                                   "fitness": float(best["fitness"])}))
+
+    def on_start(self, ga):
+        _events.put((self.job_id, {"event": "running"}))
+
+    def on_generation(self, ga, generation, best):
+        now = time.monotonic()
+        if self._last is None or now - self._last >= self.interval:
+            self._last = now
+            self._send("generation", generation, best)
+
+    def on_improvement(self, ga, generation, best):
+        self._send("improvement", generation, best)
+
+
+def _run_job(job_id, plant, config):
+    """
+    Tune one plant in a worker process, streaming its progress to the service.
+
+    The last item sent for the job, whether it succeeds or fails, is (job_id, None): the queue keeps the
+    order of the items sent by one process, so the service knows every progress event has arrived.
+    """
+    try:
+        return tune_plant(plant, config, observers=[_QueueObserver(job_id)])
+    finally:
+        _events.put((job_id, None))
+
+
+def job_key(plant, config, seed):
+    """
+    Cache key of a tuning request: identical plants, settings and seeds give identical results.
+
+    Parameters:
+    plant (dict): Plant definition with "num", "den" and optionally "kpu".
+    config (dict): Genetic Algorithm settings.
+    seed (int): Seed of the Genetic Algorithm.
+
+    Returns:
+    str: Hex digest of the canonical request.
+    """
+    settings = resolve_config(plant, dict(config or {}, seed=seed))
+    request = {"num": [float(c) for c in plant["num"]], "den": [float(c) for c in plant["den"]],
+               "kpu": plant.get("kpu"), "settings": settings}
+    return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+
+class Job:
+    """
+    A tuning request and its progress.
+
+    Attributes:
+    id (str): Job identifier.
+    key (str): Cache key of the request.
+    status (str): "queued", "running", "done" or "failed".
+    events (list): Progress events received so far.
+    result (dict): Tuning result once done.
+    error (str): Error message if the job failed.
+    """
+
+    def __init__(self, job_id, key, plant, config):
+        self.id = job_id
+        self.key = key
+        self.plant = plant
+        self.config = config
+        self.status = "queued"
+        self.events = []
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.changed = asyncio.Condition()
+        self.drained = asyncio.Event()
+
+    async def add_event(self, event):
+        # Only finish moves a job to a finished status, and nothing moves it out
+        if event["event"] == "running" and not self.finished():
+            self.status = "running"
+        self.events.append(event)
+        async with self.changed:
+            self.changed.notify_all()
+
+    async def finish(self, result=None, error=None):
+        """
+        Record the outcome of the job and send the final "done" or "failed" event.
+
+        Parameters:
+        result (dict): Tuning result. Default is None.
+        error (str): Error message, marking the job as failed. Default is None.
+        """
+        self.result = result
+        self.error = error
+        self.status = "failed" if error is not None else "done"
+        await self.add_event({"event": self.status})
+
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def to_dict(self):
+        return {"id": self.id, "status": self.status, "name": self.plant["name"], "result": self.result,
+                "error": self.error, "events": len(self.events)}
+
+
+class TuningService:
+    """
+    Local HTTP/JSON service tuning PID controllers on a process pool.
+
+    Endpoints:
+    POST /jobs               Submit {"plant": {"num", "den", "kpu", "name"}, "config": {...}, "seed": 0}.
+                             Identical requests share one job, so a repeated request returns the cached
+                             result, or joins the job still running.
+    GET  /jobs/<id>          Status and, once done, the result of a job.
+    GET  /jobs/<id>/events   Progress events as JSON lines, streamed until the job finishes.
+    GET  /jobs               Every known job.
+    GET  /health             Queue and cache statistics.
+
+    Attributes:
+    host (str): Address to listen on.
+    port (int): Port to listen on; 0 picks a free one, readable from port after start.
+    workers (int): Number of worker processes.
+    cache_size (int): Maximum number of finished jobs kept.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, workers=None, cache_size=1024):
+        """
+        Parameters:
+        host (str): Address to listen on. Default is 127.0.0.1.
+        port (int): Port to listen on, 0 for a free one. Default is 8765.
+        workers (int): Number of worker processes. Default is the CPU count.
+        cache_size (int): Maximum number of finished jobs kept, the oldest being dropped first. Default is 1024.
+        """
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.jobs = {}
+        self._by_key = OrderedDict()
+        self._ids = itertools.count(1)
+        self.hits = 0
+        self._server = None
+        self._pool = None
+        self._events = None
+        self._reader = None
+
+    async def start(self):
+        """
+        Start the worker pool and listen for requests.
+        """
+        self._events = multiprocessing.Queue()
+        self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self._events,))
+        self._reader = asyncio.create_task(self._read_events())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """
+        Stop listening and shut down the worker pool.
+        """
+        self._server.close()
+        await self._server.wait_closed()
+        self._events.put(None)
+        await self._reader
+        self._pool.shutdown(cancel_futures=True)
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Tuning service listening on http://{self.host}:{self.port}")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _read_events(self):
+        """
+        Move progress events from the worker queue to their jobs, and mark the jobs whose last event arrived.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await loop.run_in_executor(None, self._events.get)
+            if item is None:
+                return
+            job_id, event = item
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+            if event is None:
+                job.drained.set()
+            else:
+                await job.add_event(event)
+
+    def submit(self, plant, config=None, seed=0):
+        """
+        Queue a tuning job, or return the job of an identical earlier request.
+
+        Parameters:
+        plant (dict): Plant definition with "num", "den" and optionally "kpu" and "name".
+        config (dict): Genetic Algorithm settings, see fleet.DEFAULT_CONFIG.
+        seed (int): Seed of the Genetic Algorithm.
+
+        Returns:
+        tuple: The Job and whether it was found in the cache.
+        """
+        plant = {"index": 0, "name": plant.get("name", "plant"), "num": list(plant["num"]),
+                 "den": list(plant["den"]), **({"kpu": float(plant["kpu"])} if plant.get("kpu") is not None else {})}
+        config = dict(config or {}, seed=int(seed))
+        key = job_key(plant, config, seed)
+
+        job_id = self._by_key.get(key)
+        if job_id is not None and self.jobs[job_id].status != "failed":
+            self._by_key.move_to_end(key)
+            self.hits += 1
+            return self.jobs[job_id], True
+
+        job = Job(str(next(self._ids)), key, plant, config)
+        self.jobs[job.id] = job
+        self._by_key[key] = job.id
+        self._evict()
+        asyncio.create_task(self._execute(job))
+        return job, False
+
+    def _evict(self):
+        finished = [key for key, job_id in self._by_key.items() if self.jobs[job_id].finished()]
+        for key in finished[:max(len(self._by_key) - self.cache_size, 0)]:
+            del self.jobs[self._by_key.pop(key)]
+
+    async def _execute(self, job):
+        """
+        Run a job on the pool and finish it once its progress events have all been received.
+        """
+        loop = asyncio.get_running_loop()
+        result, error = None, None
+        try:
+            result = await loop.run_in_executor(self._pool, _run_job, job.id, job.plant, job.config)
+        except BrokenExecutor as e:
+            # The worker died without sending the end of the job, so nothing more will arrive
+            error = repr(e)
+            job.drained.set()
+        except Exception as e:
+            error = repr(e)
+        await job.drained.wait()
+        await job.finish(result, error)
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode().split()
+            if len(request_line) < 2:
+                return
+            method, path = request_line[0], request_line[1]
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode().strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            await self._route(method, path.rstrip("/"), body, writer)
+        except (ValueError, KeyError, TypeError) as e:
+            await self._respond(writer, 400, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body, writer):
+        parts = path.strip("/").split("/")
+        if method == "POST" and parts == ["jobs"]:
+            request = json.loads(body or b"{}")
+            job, cached = self.submit(request["plant"], request.get("config"), request.get("seed", 0))
+            await self._respond(writer, 200 if cached else 202, dict(job.to_dict(), cached=cached))
+        elif method == "GET" and parts == ["jobs"]:
+            await self._respond(writer, 200, [job.to_dict() for job in self.jobs.values()])
+        elif method == "GET" and len(parts) == 2 and parts[0] == "jobs" and parts[1] in self.jobs:
+            await self._respond(writer, 200, self.jobs[parts[1]].to_dict())
+        elif method == "GET" and len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events" \
+                and parts[1] in self.jobs:
+            await self._stream(self.jobs[parts[1]], writer)
+        elif method == "GET" and parts == ["health"]:
+            await self._respond(writer, 200, {
+                "workers": self.workers,
+                "jobs": len(self.jobs),
+                "active": sum(not job.finished() for job in self.jobs.values()),
+                "cache_hits": self.hits,
+            })
+        else:
+            await self._respond(writer, 404, {"error": f"No route for {method} {path}"})
+
+    @staticmethod
+    async def _respond(writer, status, payload):
+        body = json.dumps(payload).encode()
+        reason = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    @staticmethod
+    async def _stream(job, writer):
+        """
+        Send the events of a job as JSON lines, from the first one until the job finishes.
+        """
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+        sent = 0
+        while True:
+            async with job.changed:
+                await job.changed.wait_for(lambda: len(job.events) > sent or job.finished())
+            events = job.events[sent:]
+            sent += len(events)
+            writer.write(b"".join(json.dumps(event).encode() + b"\n" for event in events))
+            await writer.drain()
+            if job.finished() and sent == len(job.events):
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local PID tuning service.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on.")
+    parser.add_argument("--workers", type=int, help="Number of worker processes. Default is the CPU count.")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(TuningService(args.host, args.port, args.workers).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import itertools
+
+import numpy as np
+
+from calc_fitness import _as_poly, AGGREGATES
+
+SCENARIO_METHODS = ("monte_carlo", "corners")
+
+
+def _modes(roots):
+    """
+    Group the roots of a polynomial into modes scaled together: every real root alone, every complex
+    root with its conjugate, so perturbed polynomials keep real coefficients.
+
+    Returns:
+    np.ndarray: Mode index of each root, -1 for roots at the origin, which have no time constant.
+    """
+    modes = np.full(len(roots), -1)
+    count = 0
+    for i, root in enumerate(roots):
+        if abs(root) < 1e-12 or modes[i] >= 0:
+            continue
+        modes[i] = count
+        if abs(root.imag) > 1e-12:
+            partners = [j for j in range(i + 1, len(roots))
+                        if modes[j] < 0 and abs(roots[j] - np.conj(root)) <= 1e-9 * max(abs(root), 1.0)]
+            if partners:
+                modes[partners[0]] = count
+        count += 1
+    return modes
+
+
+def _scaled(roots, modes, factors):
+    """
+    Roots with the time constant of each mode multiplied by its factor, which divides the root.
+    """
+    scale = np.ones(len(roots))
+    scale[modes >= 0] = factors[modes[modes >= 0]]
+    return roots / scale
+
+
+def perturbed_plants(num, den, spread=0.2, n_scenarios=50, method="monte_carlo", seed=None):
+    """
+    Plants around a nominal one, with the static gain and every time constant varied by up to spread.
+
+    The poles and zeros away from the origin are grouped into modes (a real root, or a complex pair) and
+    the time constant of each mode is scaled independently, as is the gain, so integrators and the
+    order of the plant are kept.
+
+    Parameters:
+    num (list): Numerator coefficients of the nominal transfer function.
+    den (list): Denominator coefficients of the nominal transfer function.
+    spread (float): Relative variation of the gain and time constants. Default is 0.2, for +-20 %.
+    n_scenarios (int): Number of Monte Carlo plants. Ignored by the corners method. Default is 50.
+    method (str): "monte_carlo" draws every factor uniformly in [1 - spread, 1 + spread]; "corners" takes
+        every combination of the extreme factors, 2 ** (modes + 1) plants. Default is "monte_carlo".
+    seed (int): Seed of the Monte Carlo draws. Default is None.
+
+    Returns:
+    tuple: Perturbed plants as (num, den) tuples of coefficients, hashable so they can be part of the
+    fitness options.
+    """
+    if method not in SCENARIO_METHODS:
+        raise ValueError(f"Unknown scenario method: {method}. Choose from {SCENARIO_METHODS}")
+    num = _as_poly(num)
+    den = _as_poly(den)
+    num_roots = np.roots(num)
+    den_roots = np.roots(den)
+    num_modes = _modes(num_roots)
+    den_modes = _modes(den_roots)
+    n_num = num_modes.max(initial=-1) + 1
+    n_factors = 1 + n_num + den_modes.max(initial=-1) + 1
+
+    if method == "corners":
+        factors = np.array(list(itertools.product((1 - spread, 1 + spread), repeat=n_factors)))
+    else:
+        factors = np.random.default_rng(seed).uniform(1 - spread, 1 + spread, (n_scenarios, n_factors))
+
+    # The static gain, or the velocity gain of plants with an integrator, follows the gain factor
+    reference = _static_gain(num, den)
+    plants = []
+    for gain, *modes in factors:
+        modes = np.array(modes)
+        p_num = np.real(np.atleast_1d(np.poly(_scaled(num_roots, num_modes, modes[:n_num]))))
+        p_den = np.real(np.atleast_1d(np.poly(_scaled(den_roots, den_modes, modes[n_num:]))))
+        p_num *= gain * reference / _static_gain(p_num, p_den)
+        plants.append((tuple(p_num.tolist()), tuple(p_den.tolist())))
+    return tuple(plants)
+
+
+def _static_gain(num, den):
+    """
+    Ratio of the lowest order nonzero coefficients, the static gain of a plant without poles or zeros at
+    the origin, and its velocity or acceleration gain otherwise.
+    """
+    return num[np.flatnonzero(num)[-1]] / den[np.flatnonzero(den)[-1]]
+
+
+def scenario_options(scenarios, aggregate="worst"):
+    """
+    Fitness options scoring every controller over a set of perturbed plants.
+
+    Parameters:
+    scenarios (sequence): Perturbed plants as (num, den) pairs, or None.
+    aggregate (str): "worst" or "mean", see evaluate_population. Default is "worst".
+
+    Returns:
+    dict: Keyword arguments for evaluate_population, empty without scenarios. The plants are converted to
+    tuples of floats, so the options can key the fitness cache and be written to a fitness store.
+    """
+    if not scenarios:
+        return {}
+    if aggregate not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate: {aggregate}. Choose from {AGGREGATES}")
+    plants = tuple((tuple(_as_poly(num).tolist()), tuple(_as_poly(den).tolist())) for num, den in scenarios)
+    return {"scenarios": plants, "aggregate": aggregate}
@@ -1,5 +1,4 @@
 import numpy as np
-from random import random
 
 def generate_chromosome(n_var, n_bit):
     """
@@ -12,14 +11,7 @@ def generate_chromosome(n_var, n_bit):
     Returns:
     list: A list representing the chromosome, where each element is either 0 or 1.
     """
-    gene_size = n_var * n_bit
-    chromosome = []
-    for _ in range(gene_size):
-        if random() > 0.5:
-            chromosome.append(1)
-        else:
-            chromosome.append(0)
-    return chromosome
+    return (np.random.random(n_var * n_bit) > 0.5).astype(int).tolist()
 
 def generate_gen(n_var, n_bit, ra, rb):
     """
@@ -36,14 +28,88 @@ def generate_gen(n_var, n_bit, ra, rb):
         - list: A list of genes, each mapped to the range [ra, rb].
         - list: The chromosome used to generate the genes.
     """
-    gen = []
     chromosome = generate_chromosome(n_var, n_bit)
-    for i in range(1, n_var+1):
-        kr = chromosome[n_bit * (i - 1): n_bit * i]
-        for j in range(1, n_bit+1):
-            kr[j - 1] = kr[j-1] * (2**(n_bit - j))
-        x = np.sum(kr)
-        x = x/((2**n_bit) -1)
-        gen.append(rb + (ra - rb) * x)
+    gen = decode_chromosome(chromosome, n_var, n_bit, ra, rb)
     
-    return gen, chromosome
\ No newline at end of file
+    return gen, chromosome
+
+def generate_chromosomes(size, n_var, n_bit, rng=None):
+    """
+    Generate a whole population of random chromosomes at once.
+
+    Parameters:
+    size (int): Number of chromosomes.
+    n_var (int): Number of variables (genes) in each chromosome.
+    n_bit (int): Number of bits per variable.
+    rng (np.random.Generator): Random number generator. Default is a freshly seeded one.
+
+    Returns:
+    np.ndarray: (size, n_var * n_bit) uint8 matrix of bits.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    return rng.integers(0, 2, size=(size, n_var * n_bit), dtype=np.uint8)
+
+def decode_chromosomes(bits, n_var, n_bit, ra, rb):
+    """
+    Map a matrix of chromosomes to their genes, using the same encoding as generate_gen.
+
+    Parameters:
+    bits (array): (N, n_var * n_bit) matrix of bits.
+    n_var (int): Number of variables (genes).
+    n_bit (int): Number of bits per variable.
+    ra (float): The lower bound of the range.
+    rb (float): The upper bound of the range.
+
+    Returns:
+    np.ndarray: (N, n_var) matrix of genes, each mapped to the range [ra, rb].
+    """
+    bits = np.asarray(bits).reshape(-1, n_var, n_bit)
+    weights = 2.0 ** np.arange(n_bit - 1, -1, -1)
+    x = bits @ weights / ((2**n_bit) - 1)
+    return rb + (ra - rb) * x
+
+def decode_chromosome(chromosome, n_var, n_bit, ra, rb):
+    """
+    Map a chromosome back to its genes, using the same encoding as generate_gen.
+
+    Parameters:
+    chromosome (list): A list of binary values.
+    n_var (int): Number of variables (genes).
+    n_bit (int): Number of bits per variable.
+    ra (float): The lower bound of the range.
+    rb (float): The upper bound of the range.
+
+    Returns:
+    list: A list of genes, each mapped to the range [ra, rb].
+    """
+    return decode_chromosomes(chromosome, n_var, n_bit, ra, rb)[0].tolist()
+
+def pack_chromosomes(bits):
+    """
+    Pack each row of a bit matrix into a single integer, most significant bit first.
+
+    Parameters:
+    bits (array): (N, L) matrix of bits.
+
+    Returns:
+    list: N Python integers.
+    """
+    bits = np.atleast_2d(np.asarray(bits, dtype=np.uint8))
+    length = bits.shape[1]
+    if length <= 63:
+        return (bits.astype(np.int64) @ (np.int64(1) << np.arange(length - 1, -1, -1, dtype=np.int64))).tolist()
+
+    pad = -length % 8
+    return [int.from_bytes(row.tobytes(), "big") >> pad for row in np.packbits(bits, axis=1)]
+
+def pack_chromosome(chromosome):
+    """
+    Pack a chromosome into a single integer, most significant bit first.
+
+    Parameters:
+    chromosome (list): A list of binary values.
+
+    Returns:
+    int: The integer whose binary representation is the chromosome.
+    """
+    return pack_chromosomes([chromosome])[0]
@@ -1,7 +1,8 @@
 import numpy as np
-from control import TransferFunction
+from scipy.optimize import brentq
 import control
 import matplotlib.pyplot as plt
+from stability import routh_stable
 
 def find_kpu_response(system, kpu):
     """
@@ -10,10 +11,7 @@ def find_kpu_response(system, kpu):
     :param kpu: Proportional gain value.
     :return: Time array and output response array.
     """
-    tf_sys = system.system
-    tf_pid = TransferFunction(np.array([kpu]), [1])
-    tf_mul = tf_sys * tf_pid
-    tf_sys_pid = tf_mul.feedback()
+    tf_sys_pid = system.closed_loop(kpu, 0, 0)
 
     t, y = control.step_response(tf_sys_pid)
     return t, y
@@ -33,19 +31,142 @@ def calculate_oscillation_period(t, y):
     Tu = 2*np.mean(np.diff(t[zero_crossings]))
     return Tu
 
-def ziegler_nichols_tuning(system, kpu):
+def _gain_polynomials(num, den):
     """
-    Ziegler-Nichols tuning method to determine PID parameters.
+    Numerator padded to the length of the denominator, so den + k * num is the characteristic
+    polynomial of the loop closed with a proportional gain k.
+    """
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    return np.pad(num, (len(den) - len(num), 0)), den
+
+def ultimate_gain(num, den, upper=1e6, iterations=60):
+    """
+    Find the proportional gain at which the unity feedback loop becomes marginally stable, by bisection
+    on the Routh-Hurwitz test.
+    :param num: Numerator coefficients of the system transfer function.
+    :param den: Denominator coefficients of the system transfer function.
+    :param upper: Largest gain searched.
+    :param iterations: Bisection iterations.
+    :return: The ultimate gain, or None if the loop is stable for every gain up to upper.
+    """
+    gain = ultimate_gains([(num, den)], upper, iterations)[0]
+    return None if np.isnan(gain) else float(gain)
+
+def ultimate_gains(plants, upper=1e6, iterations=60):
+    """
+    Batched version of ultimate_gain: plants of the same order are bisected together, one Routh-Hurwitz
+    test of the whole group per iteration.
+    :param plants: List of (num, den) coefficient pairs.
+    :param upper: Largest gain searched.
+    :param iterations: Bisection iterations.
+    :return: Array of ultimate gains, NaN where the loop is stable for every gain up to upper or
+        unstable from the start.
+    """
+    pairs = [_gain_polynomials(num, den) for num, den in plants]
+    gains = np.full(len(pairs), np.nan)
+    for order in {len(den) for _, den in pairs}:
+        rows = [i for i, (_, den) in enumerate(pairs) if len(den) == order]
+        num = np.array([pairs[i][0] for i in rows])
+        den = np.array([pairs[i][1] for i in rows])
+
+        def stable(gain):
+            return routh_stable(den + gain[:, None] * num)
+
+        # Only loops stable for small gains and unstable at the upper bound have an ultimate gain
+        lo = np.full(len(rows), upper * 2.0**-iterations)
+        hi = np.full(len(rows), float(upper))
+        valid = stable(lo) & ~stable(hi)
+        for _ in range(iterations):
+            mid = 0.5 * (lo + hi)
+            below = stable(mid)
+            lo = np.where(below, mid, lo)
+            hi = np.where(below, hi, mid)
+        gains[rows] = np.where(valid, hi, np.nan)
+    return gains
+
+def oscillation_frequency(system, kpu):
+    """
+    Frequency of the oscillation of the loop closed with a proportional gain, from its least damped poles.
     :param system: SystemDynamics object of the system.
-    :param initial_Kp: Initial value of Kp to start the search.
-    :param step_Kp: Increment step for Kp.
-    :param max_Kp: Maximum value of Kp to search.
-    :param threshold: Threshold for detecting divergence.
-    :return: Tuple of PID parameters (Kp, Ki, Kd).
+    :param kpu: Proportional gain value, normally the ultimate gain.
+    :return: Angular frequency in rad/s.
+    """
+    num, den = _gain_polynomials(system.num, system.den)
+    poles = np.roots(den + kpu * num)
+    omega = abs(poles[np.argmax(poles.real)].imag)
+    if omega <= 1e-9:
+        raise ValueError("The loop does not oscillate at this gain; Ziegler-Nichols does not apply.")
+    return omega
+
+def phase_crossover(system):
+    """
+    Ultimate gain and frequency from the phase crossover of the plant frequency response, where
+    G(jw) crosses the negative real axis. The crossings are located on the cached frequency grid of
+    the system and refined by root finding on Im G(jw). The smallest crossing gain at which the loop
+    actually goes from stable to unstable is kept.
+    :param system: SystemDynamics object of the system.
+    :return: Tuple (Ku, wu), or None when no crossing destabilizes the loop.
+    """
+    response = system.response
+    omega = system.frequencies
+    imag = response.imag
+    brackets = np.flatnonzero((np.sign(imag[:-1]) != np.sign(imag[1:])) & (response.real[:-1] < 0))
+
+    crossings = []
+    for k in brackets:
+        wc = brentq(lambda w: system.frequency_response(w).imag, omega[k], omega[k + 1])
+        gain = -1 / system.frequency_response(wc).real
+        if gain > 0:
+            crossings.append((gain, wc))
+
+    num, den = _gain_polynomials(system.num, system.den)
+    for gain, wc in sorted(crossings):
+        below, above = routh_stable(np.array([den + gain * (1 - 1e-6) * num, den + gain * (1 + 1e-6) * num]))
+        if below and not above:
+            return gain, wc
+    return None
+
+def find_ultimate_gains(systems):
+    """
+    Ultimate gain Ku and oscillation period Tu of many plants, without time-domain simulation.
+    The phase crossover of each cached frequency response is tried first; plants it does not settle
+    are solved together by Routh-Hurwitz bisection, with Tu from the least damped closed-loop poles.
+    :param systems: List of SystemDynamics objects.
+    :return: Arrays of Ku and Tu, NaN for plants without an ultimate gain.
+    """
+    ku = np.full(len(systems), np.nan)
+    tu = np.full(len(systems), np.nan)
+    rest = []
+    for i, system in enumerate(systems):
+        crossover = phase_crossover(system)
+        if crossover is None:
+            rest.append(i)
+        else:
+            ku[i], tu[i] = crossover[0], 2 * np.pi / crossover[1]
+
+    if rest:
+        ku[rest] = ultimate_gains([(systems[i].num, systems[i].den) for i in rest])
+        for i in rest:
+            if not np.isnan(ku[i]):
+                try:
+                    tu[i] = 2 * np.pi / oscillation_frequency(systems[i], ku[i])
+                except ValueError:
+                    ku[i] = np.nan
+    return ku, tu
+
+def find_ultimate_gain(system):
+    """
+    Ultimate gain Ku and oscillation period Tu of a plant, see find_ultimate_gains.
+    :param system: SystemDynamics object of the system.
+    :return: Tuple (Ku, Tu).
     """
-    t, y = find_kpu_response(system, kpu)
-    Tu = calculate_oscillation_period(t, y)
-    
+    ku, tu = find_ultimate_gains([system])
+    if np.isnan(ku[0]):
+        raise ValueError("No proportional gain makes the loop oscillate; Ziegler-Nichols does not apply.")
+    return float(ku[0]), float(tu[0])
+
+def _zn_gains(kpu, Tu):
     # Calculate PID parameters based on Ziegler-Nichols method
     Kp = 0.6 * kpu
     Ti = 0.5 * Tu
@@ -54,3 +175,26 @@ def ziegler_nichols_tuning(system, kpu):
     Kd = Kp * Td
 
     return Kp, Ki, Kd
+
+def ziegler_nichols_tuning(system, kpu=None):
+    """
+    Ziegler-Nichols tuning method to determine PID parameters.
+    :param system: SystemDynamics object of the system.
+    :param kpu: Ultimate gain. Default is None, to find it with find_ultimate_gain.
+    :return: Tuple of PID parameters (Kp, Ki, Kd).
+    """
+    if kpu is None:
+        kpu, Tu = find_ultimate_gain(system)
+    else:
+        Tu = 2 * np.pi / oscillation_frequency(system, kpu)
+
+    return _zn_gains(kpu, Tu)
+
+def ziegler_nichols_batch(systems):
+    """
+    Ziegler-Nichols tuning of many plants at once, see find_ultimate_gains.
+    :param systems: List of SystemDynamics objects.
+    :return: List of (Kp, Ki, Kd) tuples, None for plants without an ultimate gain.
+    """
+    ku, tu = find_ultimate_gains(systems)
+    return [None if np.isnan(k) else _zn_gains(float(k), float(t)) for k, t in zip(ku, tu)]